@@ -108,7 +108,7 @@ def main():
         converter = convert_benchmarks[item](item_path)
         convert_time = time.time() - start_time
         print(f"{item} convert ran in {convert_time}")
-        converter.write_JSON(f"{item}_benchmark")
+        converter.save(f"{item}_benchmark", binary=False)
         write_time = time.time() - start_time - convert_time
         print(f"{item} write ran in {write_time}")
 
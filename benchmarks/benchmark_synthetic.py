@@ -0,0 +1,676 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark SimulariumIO on synthetic data, without downloading anything.
+
+For each input format and each size (timesteps x agents x subpoints),
+synthetic data is generated, then each stage is timed separately:
+parse, filter, type mapping, validation, JSON write, binary write,
+binary read, and a FileConverter round trip.
+Each case runs in a new process so the peak RSS recorded for it
+isn't inflated by earlier cases.
+
+Results are saved as JSON to plot scaling curves, and can be compared
+against a previous results file to catch regressions, e.g.
+
+    python benchmark_synthetic.py --sizes 10x100x10 100x1000x10 \
+        --output results.json --baseline previous_results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+import simulariumio
+from simulariumio import (
+    DISPLAY_TYPE,
+    AgentData,
+    DisplayData,
+    FileConverter,
+    InputFileData,
+    JsonWriter,
+    BinaryWriter,
+    MetaData,
+    TrajectoryConverter,
+    TrajectoryData,
+)
+from simulariumio.constants import VALIDATION, VIZ_TYPE
+from simulariumio.cytosim import CytosimConverter, CytosimData, CytosimObjectInfo
+from simulariumio.filters import EveryNthTimestepFilter, TranslateFilter
+from simulariumio.medyan import MedyanConverter, MedyanData
+from simulariumio.readers import SimulariumBinaryReader
+from simulariumio.smoldyn import SmoldynConverter, SmoldynData
+from simulariumio.springsalad import SpringsaladConverter, SpringsaladData
+from simulariumio.writers.writer import Writer
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak RSS won't be recorded
+    resource = None
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)4s: %(module)s:%(lineno)4s %(asctime)s] %(message)s",
+)
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+FORMATS = ["trajectory", "cytosim", "smoldyn", "springsalad", "medyan"]
+STAGES = [
+    "parse",
+    "filter",
+    "type_mapping",
+    "validation",
+    "json_write",
+    "binary_write",
+    "binary_read",
+    "file_converter_round_trip",
+]
+DEFAULT_SIZES = ["10x100x10", "100x100x10", "100x1000x10"]
+N_TYPES = 10
+RESULTS_VERSION = 1
+
+###############################################################################
+# Args
+
+
+class Args(argparse.Namespace):
+    def __init__(self):
+        self.__parse()
+
+    def __parse(self):
+        p = argparse.ArgumentParser(
+            prog="benchmark_synthetic",
+            description=(
+                "Time each stage of converting synthetic data with SimulariumIO "
+                "and record peak memory use"
+            ),
+        )
+        p.add_argument(
+            "--sizes",
+            nargs="+",
+            default=DEFAULT_SIZES,
+            help=(
+                "sizes to benchmark as TIMESTEPSxAGENTSxSUBPOINTS, "
+                "subpoints is the number of points per fiber, 0 for no fibers"
+            ),
+        )
+        p.add_argument(
+            "--formats",
+            nargs="+",
+            choices=FORMATS,
+            default=FORMATS,
+            help="input formats to generate and benchmark",
+        )
+        p.add_argument(
+            "--stages",
+            nargs="+",
+            choices=STAGES,
+            default=STAGES,
+            help="stages to time, skipping e.g. json_write for large sizes",
+        )
+        p.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="number of times to run each case, the fastest run is kept",
+        )
+        p.add_argument(
+            "--validation",
+            choices=VALIDATION.LEVELS,
+            default=VALIDATION.FAST,
+            help="validation level for the validation and write stages",
+        )
+        p.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="workers for the write stages",
+        )
+        p.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help=(
+                "also record the peak memory allocated during each stage "
+                "with tracemalloc, which slows down the stages"
+            ),
+        )
+        p.add_argument(
+            "--in-process",
+            action="store_true",
+            help="run every case in this process instead of a new one for each",
+        )
+        p.add_argument(
+            "--workdir",
+            default=None,
+            help="where to write the synthetic and output files, default is a temp dir",
+        )
+        p.add_argument(
+            "--output",
+            default="benchmark_results.json",
+            help="where to save the results as JSON",
+        )
+        p.add_argument(
+            "--baseline",
+            default=None,
+            help="a previous results file to compare the stage times to",
+        )
+        p.add_argument(
+            "--tolerance",
+            type=float,
+            default=1.5,
+            help=(
+                "a stage is a regression if it is this many times slower "
+                "than in the baseline"
+            ),
+        )
+        p.add_argument(
+            "--verbose",
+            action="store_true",
+            help="show the output from SimulariumIO while running",
+        )
+        p.parse_args(namespace=self)
+
+
+###############################################################################
+# Synthetic data
+
+
+def parse_size(size: str) -> Tuple[int, int, int]:
+    """
+    Parse a size like "100x1000x10" into
+    (timesteps, agents, subpoints per fiber)
+    """
+    try:
+        n_timesteps, n_agents, n_subpoints = (int(value) for value in size.split("x"))
+    except ValueError:
+        raise ValueError(
+            f"Size should be TIMESTEPSxAGENTSxSUBPOINTS, e.g. 10x100x10, got {size}"
+        )
+    if n_timesteps < 2 or n_agents < 2 or n_subpoints < 0:
+        raise ValueError(f"Size needs at least 2 timesteps and 2 agents, got {size}")
+    return n_timesteps, n_agents, n_subpoints
+
+
+def _fiber_count(n_agents: int, n_subpoints: int) -> int:
+    """
+    Half the agents are fibers if there are subpoints
+    """
+    return n_agents // 2 if n_subpoints > 0 else 0
+
+
+def synthetic_trajectory_data(
+    n_timesteps: int, n_agents: int, n_subpoints: int, seed: int = 0
+) -> TrajectoryData:
+    """
+    Generate TrajectoryData with spheres and fibers moving randomly
+    """
+    rng = np.random.default_rng(seed)
+    n_fibers = _fiber_count(n_agents, n_subpoints)
+    viz_types = np.full((n_timesteps, n_agents), VIZ_TYPE.DEFAULT)
+    viz_types[:, :n_fibers] = VIZ_TYPE.FIBER
+    subpoints_shape = (n_timesteps, n_agents, 3 * max(n_subpoints, 1))
+    n_subpoints_array = np.zeros((n_timesteps, n_agents))
+    n_subpoints_array[:, :n_fibers] = 3 * n_subpoints
+    subpoints = np.zeros(subpoints_shape)
+    if n_fibers > 0:
+        subpoints[:, :n_fibers] = rng.uniform(
+            -100.0, 100.0, (n_timesteps, n_fibers, 3 * n_subpoints)
+        )
+    # fibers and spheres of each type have separate display data
+    sphere_names = [f"sphere{type_index}" for type_index in range(N_TYPES)]
+    fiber_names = [f"fiber{type_index}" for type_index in range(N_TYPES)]
+    display_data = {
+        type_name: DisplayData(name=type_name, display_type=display_type)
+        for type_names, display_type in [
+            (sphere_names, DISPLAY_TYPE.SPHERE),
+            (fiber_names, DISPLAY_TYPE.FIBER),
+        ]
+        for type_name in type_names
+    }
+    frame_types = [
+        (fiber_names if agent_index < n_fibers else sphere_names)[agent_index % N_TYPES]
+        for agent_index in range(n_agents)
+    ]
+    types = [list(frame_types) for _ in range(n_timesteps)]
+    return TrajectoryData(
+        meta_data=MetaData(box_size=np.array([200.0, 200.0, 200.0])),
+        agent_data=AgentData(
+            times=np.arange(n_timesteps, dtype=float),
+            n_agents=np.full(n_timesteps, n_agents),
+            viz_types=viz_types,
+            unique_ids=np.tile(np.arange(n_agents, dtype=float), (n_timesteps, 1)),
+            types=types,
+            positions=rng.uniform(-100.0, 100.0, (n_timesteps, n_agents, 3)),
+            radii=rng.uniform(0.5, 2.0, (n_timesteps, n_agents)),
+            rotations=rng.uniform(0.0, 360.0, (n_timesteps, n_agents, 3)),
+            n_subpoints=n_subpoints_array,
+            subpoints=subpoints,
+            display_data=display_data,
+        ),
+    )
+
+
+def _points(rng: np.random.Generator, n_points: int) -> np.ndarray:
+    """
+    Get random 3D points
+    """
+    return rng.uniform(-10.0, 10.0, (n_points, 3))
+
+
+def write_synthetic_cytosim(
+    path: str, n_timesteps: int, n_agents: int, n_subpoints: int, seed: int = 0
+) -> str:
+    """
+    Write a synthetic Cytosim fiber_points.txt, all agents are fibers
+    """
+    rng = np.random.default_rng(seed)
+    n_points = max(n_subpoints, 2)
+    file_path = os.path.join(path, "fiber_points.txt")
+    with open(file_path, "w") as cytosim_file:
+        for time_index in range(n_timesteps):
+            cytosim_file.write(
+                f"% frame   {time_index}\n% time {0.05 * time_index:.3f}\n"
+                "% report fiber:point\n"
+                "% identity      posX      posY      posZ curvature\n"
+            )
+            for agent_index in range(n_agents):
+                uid = agent_index + 1
+                cytosim_file.write(
+                    f"%   fiber f{agent_index % 3 + 1}:{uid:04d}  0.1000\n"
+                )
+                for point in _points(rng, n_points):
+                    cytosim_file.write(
+                        f"{uid:10d} {point[0]:+9.4f} {point[1]:+9.4f} "
+                        f"{point[2]:+9.4f}    0.0000\n"
+                    )
+            cytosim_file.write("% end\n\n")
+    return file_path
+
+
+def write_synthetic_smoldyn(
+    path: str, n_timesteps: int, n_agents: int, n_subpoints: int, seed: int = 0
+) -> str:
+    """
+    Write a synthetic Smoldyn output file, agents don't have subpoints
+    """
+    rng = np.random.default_rng(seed)
+    file_path = os.path.join(path, "smoldyn.txt")
+    with open(file_path, "w") as smoldyn_file:
+        for time_index in range(n_timesteps):
+            smoldyn_file.write(f"{0.01 * time_index} 0\n")
+            for agent_index, point in enumerate(_points(rng, n_agents)):
+                smoldyn_file.write(
+                    f"type{agent_index % N_TYPES}(solution) "
+                    f"{point[0]} {point[1]} {point[2]} {agent_index}\n"
+                )
+    return file_path
+
+
+def write_synthetic_springsalad(
+    path: str, n_timesteps: int, n_agents: int, n_subpoints: int, seed: int = 0
+) -> str:
+    """
+    Write a synthetic SpringSaLaD viewer file,
+    if there are subpoints, agents are linked in pairs
+    """
+    rng = np.random.default_rng(seed)
+    colors = ["GREEN", "RED", "GRAY", "BLUE", "ORANGE"]
+    file_path = os.path.join(path, "springsalad.txt")
+    with open(file_path, "w") as springsalad_file:
+        springsalad_file.write(
+            "TotalTime\t1.0\ndtimage\t0.1\nxsize\t50.0\nysize\t50.0\n"
+            "z_outside\t10.0\nz_inside\t40.0\n\n"
+        )
+        for time_index in range(n_timesteps):
+            springsalad_file.write(
+                f"SCENE\nSceneNumber\t{time_index}\tCurrentTime\t{0.1 * time_index}\n"
+            )
+            for agent_index, point in enumerate(_points(rng, n_agents)):
+                springsalad_file.write(
+                    f"ID\t{100000000 + agent_index}\t2.0\t"
+                    f"{colors[agent_index % len(colors)]}\t"
+                    f"{point[0]:.6f}\t{point[1]:.6f}\t{point[2]:.6f}\n"
+                )
+            if n_subpoints > 0:
+                for agent_index in range(0, n_agents - 1, 2):
+                    springsalad_file.write(
+                        f"Link\t{100000000 + agent_index}\t:\t"
+                        f"{100000000 + agent_index + 1}\n"
+                    )
+            springsalad_file.write("\n")
+    return file_path
+
+
+def write_synthetic_medyan(
+    path: str, n_timesteps: int, n_agents: int, n_subpoints: int, seed: int = 0
+) -> str:
+    """
+    Write a synthetic MEDYAN snapshot.traj, all agents are filaments
+    """
+    rng = np.random.default_rng(seed)
+    n_points = max(n_subpoints, 2)
+    file_path = os.path.join(path, "snapshot.traj")
+    with open(file_path, "w") as medyan_file:
+        for time_index in range(n_timesteps):
+            medyan_file.write(f"{time_index} {float(time_index)} {n_agents} 0 0 0 0\n")
+            for agent_index in range(n_agents):
+                medyan_file.write(
+                    f"FILAMENT {agent_index} {agent_index % 3} {n_points} 0 0\n"
+                )
+                medyan_file.write(
+                    " ".join(f"{value:.6f}" for value in _points(rng, n_points).flat)
+                    + "\n"
+                )
+            medyan_file.write("\n")
+    return file_path
+
+
+def parse_synthetic_file(input_format: str, file_path: str) -> TrajectoryConverter:
+    """
+    Load a synthetic file with the converter for its format
+    """
+    input_file = InputFileData(file_path=file_path)
+    if input_format == "cytosim":
+        return CytosimConverter(
+            CytosimData(
+                object_info={"fibers": CytosimObjectInfo(cytosim_file=input_file)}
+            )
+        )
+    if input_format == "smoldyn":
+        return SmoldynConverter(SmoldynData(smoldyn_file=input_file))
+    if input_format == "springsalad":
+        return SpringsaladConverter(SpringsaladData(sim_view_txt_file=input_file))
+    if input_format == "medyan":
+        return MedyanConverter(MedyanData(snapshot_file=input_file))
+    raise ValueError(f"Unknown format {input_format}")
+
+
+SYNTHETIC_FILE_WRITERS: Dict[str, Callable[..., str]] = {
+    "cytosim": write_synthetic_cytosim,
+    "smoldyn": write_synthetic_smoldyn,
+    "springsalad": write_synthetic_springsalad,
+    "medyan": write_synthetic_medyan,
+}
+
+###############################################################################
+# Timing
+
+
+def peak_rss_bytes() -> int:
+    """
+    Get the peak resident set size of this process so far,
+    or None if it isn't available on this platform
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return int(peak_rss if sys.platform == "darwin" else 1024 * peak_rss)
+
+
+def time_stage(
+    stage: str,
+    function: Callable[[], Any],
+    trace_memory: bool,
+    verbose: bool,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run one stage and measure its time and memory
+    """
+    if trace_memory:
+        tracemalloc.start()
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        start_time = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start_time
+    record = {
+        "stage": stage,
+        "seconds": seconds,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    if trace_memory:
+        record["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, record
+
+
+def run_case(
+    input_format: str,
+    size: str,
+    stages: List[str],
+    validation: str,
+    workers: int,
+    trace_memory: bool,
+    workdir: str,
+    verbose: bool,
+) -> Dict[str, Any]:
+    """
+    Generate the synthetic data for one format and size,
+    then time each stage
+    """
+    n_timesteps, n_agents, n_subpoints = parse_size(size)
+    case_dir = os.path.join(workdir, f"{input_format}_{size}")
+    os.makedirs(case_dir, exist_ok=True)
+    file_path = None
+    input_n_bytes = None
+    if input_format in SYNTHETIC_FILE_WRITERS:
+        file_path = SYNTHETIC_FILE_WRITERS[input_format](
+            case_dir, n_timesteps, n_agents, n_subpoints
+        )
+        input_n_bytes = os.path.getsize(file_path)
+    else:
+        trajectory_data = synthetic_trajectory_data(n_timesteps, n_agents, n_subpoints)
+    # parsing is always needed for the other stages
+    if file_path is not None:
+        converter, parse_record = time_stage(
+            "parse",
+            lambda: parse_synthetic_file(input_format, file_path),
+            trace_memory,
+            verbose,
+        )
+    else:
+        converter, parse_record = time_stage(
+            "parse",
+            lambda: TrajectoryConverter(trajectory_data),
+            trace_memory,
+            verbose,
+        )
+    records = [parse_record] if "parse" in stages else []
+    output_path = os.path.join(case_dir, "output")
+    stage_functions = {
+        "filter": lambda: converter.filter_data(
+            [
+                EveryNthTimestepFilter(n=2),
+                TranslateFilter(default_translation=np.array([1.0, 1.0, 1.0])),
+            ],
+            copy_on_write=True,
+        ),
+        "type_mapping": lambda: converter._data.agent_data.get_type_ids_and_mapping(),
+        "validation": lambda: Writer._validate(converter._data, True, validation),
+        "json_write": lambda: JsonWriter.save(
+            converter._data, output_path, True, workers=workers, validation=validation
+        ),
+        "binary_write": lambda: BinaryWriter.save(
+            converter._data, output_path, True, workers=workers, validation=validation
+        ),
+        "binary_read": lambda: SimulariumBinaryReader.load_binary(
+            InputFileData(file_path=f"{output_path}.simularium")
+        ),
+        "file_converter_round_trip": lambda: FileConverter(
+            InputFileData(file_path=f"{output_path}.simularium")
+        ).save(f"{output_path}_round_trip", workers=workers, validation=validation),
+    }
+    output_n_bytes = {}
+    for stage in stages:
+        if stage == "parse":
+            continue
+        if stage in ["binary_read", "file_converter_round_trip"] and not (
+            os.path.isfile(f"{output_path}.simularium") and "binary_write" in stages
+        ):
+            # needs a single binary file from the binary_write stage
+            log.warning(f"Skipping {stage} for {input_format} {size}")
+            continue
+        _, record = time_stage(stage, stage_functions[stage], trace_memory, verbose)
+        records.append(record)
+        if stage in ["json_write", "binary_write"]:
+            output_n_bytes[stage] = os.path.getsize(f"{output_path}.simularium")
+        if stage == "json_write":
+            os.remove(f"{output_path}.simularium")
+    return {
+        "format": input_format,
+        "size": size,
+        "n_timesteps": n_timesteps,
+        "n_agents": n_agents,
+        "n_subpoints": n_subpoints,
+        "input_n_bytes": input_n_bytes,
+        "output_n_bytes": output_n_bytes,
+        "stages": records,
+    }
+
+
+def _fastest(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine repeated runs of a case, keeping each stage's fastest time
+    and the largest memory use
+    """
+    result = runs[0]
+    for run in runs[1:]:
+        for record, other in zip(result["stages"], run["stages"]):
+            record["seconds"] = min(record["seconds"], other["seconds"])
+            for key in ["peak_rss_bytes", "peak_traced_bytes"]:
+                if record.get(key) is not None and other.get(key) is not None:
+                    record[key] = max(record[key], other[key])
+    return result
+
+
+def compare_to_baseline(
+    results: List[Dict[str, Any]], baseline_path: str, tolerance: float
+) -> List[str]:
+    """
+    Get a message for each stage that is slower than
+    tolerance times its time in the baseline results
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_seconds = {
+        (case["format"], case["size"], record["stage"]): record["seconds"]
+        for case in baseline["results"]
+        for record in case["stages"]
+    }
+    regressions = []
+    for case in results:
+        for record in case["stages"]:
+            key = (case["format"], case["size"], record["stage"])
+            if key not in baseline_seconds:
+                continue
+            if record["seconds"] > tolerance * baseline_seconds[key]:
+                regressions.append(
+                    f"{' '.join(key)}: {record['seconds']:.3f}s, "
+                    f"was {baseline_seconds[key]:.3f}s"
+                )
+    return regressions
+
+
+def machine_info() -> Dict[str, Any]:
+    """
+    Describe the machine and versions the benchmark ran with
+    """
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "simulariumio": simulariumio.__version__,
+    }
+
+
+def main():
+    args = Args()
+    # check the sizes before running anything
+    for size in args.sizes:
+        parse_size(size)
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir
+        if workdir is None:
+            workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        results = []
+        for size in args.sizes:
+            for input_format in args.formats:
+                case_args = (
+                    input_format,
+                    size,
+                    args.stages,
+                    args.validation,
+                    args.workers,
+                    args.trace_memory,
+                    workdir,
+                    args.verbose,
+                )
+                runs = []
+                for _ in range(args.repeat):
+                    if args.in_process:
+                        runs.append(run_case(*case_args))
+                        continue
+                    # a new process for each run so peak RSS is only for this case
+                    with ProcessPoolExecutor(
+                        max_workers=1, mp_context=get_context("spawn")
+                    ) as executor:
+                        runs.append(executor.submit(run_case, *case_args).result())
+                case = _fastest(runs)
+                results.append(case)
+                for record in case["stages"]:
+                    peak_rss = record["peak_rss_bytes"]
+                    log.info(
+                        f"{input_format:>12} {size:>14} {record['stage']:>26} "
+                        f"{record['seconds']:9.3f}s"
+                        + (f" {peak_rss / 1e6:9.1f} MB" if peak_rss else "")
+                    )
+    with open(args.output, "w") as output_file:
+        json.dump(
+            {
+                "version": RESULTS_VERSION,
+                "machine": machine_info(),
+                "settings": {
+                    "validation": args.validation,
+                    "workers": args.workers,
+                    "repeat": args.repeat,
+                    "trace_memory": args.trace_memory,
+                    "in_process": args.in_process,
+                },
+                "results": results,
+            },
+            output_file,
+            indent=2,
+        )
+    log.info(f"Saved results to {args.output}")
+    if args.baseline is not None:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            log.error(f"Regression {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
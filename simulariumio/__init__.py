@@ -26,5 +26,6 @@ from .data_objects import (  # noqa: F401
 # DO NOT ISORT DISPLAY_TYPE, CAUSES CIRCULAR DEP
 from .constants import DISPLAY_TYPE  # noqa: F401
 from .file_converter import FileConverter  # noqa: F401
+from .instrumentation import Instrumentation, StageMetrics  # noqa: F401
 from .trajectory_converter import TrajectoryConverter  # noqa: F401
-from .writers import BinaryWriter, JsonWriter  # noqa: F401
+from .writers import BinaryWriter, BinaryWriterSession, JsonWriter  # noqa: F401
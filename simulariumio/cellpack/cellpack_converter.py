@@ -12,6 +12,7 @@ from cellpack import RecipeLoader
 from ..constants import DISPLAY_TYPE, VIZ_TYPE, VALUES_PER_3D_POINT
 from ..data_objects.camera_data import CameraData
 from ..trajectory_converter import TrajectoryConverter
+from ..instrumentation import instrument_stage
 from ..data_objects import TrajectoryData, AgentData, DimensionData
 from ..data_objects import MetaData, DisplayData
 from ..exceptions import InputDataError
@@ -62,7 +63,7 @@ class CellpackConverter(TrajectoryConverter):
             Default: 10
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
     def _get_box_center(recipe_data):
@@ -282,9 +283,12 @@ class CellpackConverter(TrajectoryConverter):
         handedness: HAND_TYPE,
         geometry_url: str,
         display_data,
+        dtype: np.dtype = np.float64,
     ) -> AgentData:
-        dimensions = CellpackConverter._parse_dimensions(all_ingredients)
-        spatial_data = AgentData.from_dimensions(dimensions)
+        with instrument_stage("dimension_prescan") as stage:
+            dimensions = CellpackConverter._parse_dimensions(all_ingredients)
+            stage.n_frames = dimensions.total_steps
+        spatial_data = AgentData.from_dimensions(dimensions, dtype=dtype)
         display_data = {} if display_data is None else display_data
         agent_id_counter = 0
 
@@ -392,6 +396,7 @@ class CellpackConverter(TrajectoryConverter):
             input_data.handedness,
             input_data.geometry_url,
             input_data.display_data,
+            input_data.dtype,
         )
         # parse
         box_size = np.array(CellpackConverter._get_boxsize(recipe_data))
@@ -5,6 +5,8 @@ from enum import Enum
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import MetaData, UnitData, DisplayData, InputFileData
 from ..constants import DISPLAY_TYPE
 
@@ -31,6 +33,7 @@ class CellpackData:
     plots: List[Dict[str, Any]]
     handedness: HAND_TYPE
     geometry_url: str
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -44,6 +47,7 @@ class CellpackData:
         plots: List[Dict[str, Any]] = None,
         handedness: HAND_TYPE = HAND_TYPE.RIGHT,
         geometry_url: str = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -87,6 +91,11 @@ class CellpackData:
         geometry_url: str (optional)
             The base URL for all geometry files
             Default: https://raw.githubusercontent.com/mesoscope/cellPACK_data/master/cellPACK_database_1.1.0/geometries/  # noqa: E501
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.results_file = results_file
         self.recipe_file_path = recipe_file_path
@@ -100,3 +109,4 @@ class CellpackData:
         self.plots = plots if plots is not None else []
         self.handedness = handedness
         self.geometry_url = geometry_url
+        self.dtype = dtype
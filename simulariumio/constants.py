@@ -96,6 +96,17 @@ class CURRENT_VERSION:
 DEFAULT_BOX_SIZE = 100.0 * np.ones(3)
 
 
+class VALIDATION:
+    """
+    How much to check the data before saving
+    """
+
+    FULL: str = "full"  # also check agent IDs are unique in each frame
+    FAST: str = "fast"  # check agent ID size and subpoints match display types
+    OFF: str = "off"
+    LEVELS: List[str] = [FULL, FAST, OFF]
+
+
 class BINARY_BLOCK_TYPE(Enum):
     """
     The types of data saved in a block
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import Any, Dict, List, Tuple, Callable
+from typing import Dict, List, Set, Tuple, Callable
 import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
+from ..frame_index import parse_frames
 from ..data_objects import (
     TrajectoryData,
     AgentData,
@@ -24,6 +25,11 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# each frame starts at a line like "% frame 1"
+FRAME_START_PATTERN = rb"\n(?=%(?![^\n]*report)[^\n]*frame)"
+
+###############################################################################
+
 
 class CytosimConverter(TrajectoryConverter):
     def __init__(
@@ -31,6 +37,7 @@ class CytosimConverter(TrajectoryConverter):
         input_data: CytosimData,
         progress_callback: Callable[[float], None] = None,
         callback_interval: float = 10,
+        workers: int = 1,
     ):
         """
         This object reads simulation trajectory outputs
@@ -52,9 +59,15 @@ class CytosimConverter(TrajectoryConverter):
             If a progress_callback was provided, the period between updates
             to be sent to the callback, in seconds
             Default: 10
+        workers : int (optional)
+            How many processes to parse the frames in,
+            with more than one the file is indexed first
+            and each process reads and parses batches of frames
+            Default: 1
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self.workers = workers
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
     def _ignore_line(line: str) -> bool:
@@ -63,59 +76,6 @@ class CytosimConverter(TrajectoryConverter):
         """
         return len(line) < 1 or line[0:7] == "warning" or "report" in line
 
-    @staticmethod
-    def _parse_object_dimensions(
-        data_lines: List[str],
-        is_fiber: bool,
-    ) -> DimensionData:
-        """
-        Parse a Cytosim output file containing objects
-        (fibers, solids, singles, or couples) to get the number
-        of subpoints per agent per timestep
-        """
-        result = DimensionData(0, 0)
-        agents = 0
-        subpoints = 0
-        for line in data_lines:
-            if CytosimConverter._ignore_line(line):
-                continue
-            if line[0] == "%":
-                if "frame" in line:
-                    if agents > result.max_agents:
-                        result.max_agents = agents
-                    agents = 0
-                    result.total_steps += 1
-                elif "fiber" in line:
-                    if subpoints > result.max_subpoints:
-                        result.max_subpoints = subpoints
-                    subpoints = 0
-                    agents += 1
-                continue
-            if is_fiber:
-                subpoints += SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
-            else:
-                agents += 1
-        if agents > result.max_agents:
-            result.max_agents = agents
-        if subpoints > result.max_subpoints:
-            result.max_subpoints = subpoints
-        return result
-
-    @staticmethod
-    def _parse_dimensions(cytosim_data: Dict[str, List[str]]) -> DimensionData:
-        """
-        Parse Cytosim output files to get the total steps,
-        maximum agents per timestep, and maximum subpoints per agent
-        """
-        result = DimensionData(0, 0)
-        for object_type in cytosim_data:
-            object_dimensions = CytosimConverter._parse_object_dimensions(
-                cytosim_data[object_type],
-                "fiber" in object_type,
-            )
-            result = result.add(object_dimensions)
-        return result
-
     @staticmethod
     def _get_display_type_name_from_raw(raw_tid, object_type, display_data):
         """
@@ -136,186 +96,254 @@ class CytosimConverter(TrajectoryConverter):
         return type_name
 
     @staticmethod
-    def _parse_object(
+    def _parse_rows(rows: List[str], columns: List[int]) -> np.ndarray:
+        """
+        Parse the values in the given columns of rows of data
+        from Cytosim all at once, falling back to parsing each row
+        if some values have extra characters (e.g. "+" or ",")
+        """
+        if len(rows) < 1:
+            return np.zeros((0, len(columns)))
+        try:
+            return np.loadtxt(rows, usecols=columns, ndmin=2, comments=None)
+        except ValueError:
+            result = np.zeros((len(rows), len(columns)))
+            for row_index, row in enumerate(rows):
+                values = row.split()
+                result[row_index] = [
+                    float(values[column].strip("+,")) for column in columns
+                ]
+            return result
+
+    @staticmethod
+    def _parse_frame(
+        lines: List[str], context: Tuple[bool, List[int], float]
+    ) -> Tuple[float, List[int], List[int], np.ndarray, np.ndarray]:
+        """
+        Parse the lines of one frame of a Cytosim output file
+        containing objects (fibers, solids, singles, or couples),
+        context is whether the objects are fibers, the position indices,
+        and the scale factor.
+        Return the time (or None if there isn't one),
+        and the raw type IDs, raw unique IDs, and positions for each object,
+        for fibers the positions are the points and the number of points
+        for each fiber is also returned
+        """
+        is_fiber, position_indices, scale_factor = context
+        time = None
+        in_frame = False
+        rows = []
+        fibers = []
+        # most lines are rows of data, find the others first
+        # (lines starting with "%" and the ones _ignore_line would ignore)
+        other_line_indices = [
+            index
+            for index, line in enumerate(lines)
+            if not line or line[0] == "%" or line[0:7] == "warning" or "report" in line
+        ]
+        previous_index = -1
+        for index in other_line_indices + [len(lines)]:
+            data_rows = lines[previous_index + 1 : index]
+            previous_index = index
+            if data_rows:
+                if not in_frame:
+                    raise InputDataError(f"data before the first frame: {data_rows[0]}")
+                if is_fiber:
+                    # fiber points
+                    if len(fibers) < 1:
+                        raise InputDataError(
+                            f"fiber point before any fiber: {data_rows[0]}"
+                        )
+                    fibers[-1][2] += len(data_rows)
+                rows += data_rows
+            if index >= len(lines) or CytosimConverter._ignore_line(lines[index]):
+                continue
+            line = lines[index]
+            if "frame" in line:
+                # start of frame
+                in_frame = True
+            elif "time" in line:
+                # time metadata
+                time = float(line.split()[2])
+            elif is_fiber:
+                columns = line.split()
+                if len(columns) > 2 and "fiber" in columns[1]:
+                    # start of fiber object
+                    fiber_info = columns[2].split(":")
+                    fibers.append([int(fiber_info[0][1:]), int(fiber_info[1]), 0])
+        if is_fiber:
+            return (
+                time,
+                [fiber[0] for fiber in fibers],
+                [fiber[1] for fiber in fibers],
+                scale_factor * CytosimConverter._parse_rows(rows, [1, 2, 3]),
+                np.array([fiber[2] for fiber in fibers], dtype=int),
+            )
+        values = CytosimConverter._parse_rows(rows, [0, 1] + list(position_indices))
+        return (
+            time,
+            values[:, 0].astype(int).tolist(),
+            values[:, 1].astype(int).tolist(),
+            scale_factor * values[:, 2:],
+            None,
+        )
+
+    @staticmethod
+    def _add_objects(
         object_type: str,
-        data_columns: List[str],
+        frame: Tuple[float, List[int], List[int], np.ndarray, np.ndarray],
         time_index: int,
         scale_factor: float,
         object_info: CytosimObjectInfo,
-        result: AgentData,
+        agent_data: AgentData,
         uids: Dict[int, int],
-        used_unique_IDs: List[int],
-    ) -> Tuple[AgentData, Dict[int, int], List[int]]:
+        used_unique_IDs: Set[int],
+    ):
         """
-        Parse an object from Cytosim
+        Add the objects parsed from one frame of a Cytosim output file
+        to the agent data, after the agents already at this time index
         """
-        agent_index = int(result.n_agents[time_index])
-        # viz type and raw IDs
+        time, raw_tids, raw_uids, positions, n_points = frame
+        agent_data._grow_to_fit(time_index + 1, 0)
+        if time is not None:
+            agent_data.times[time_index] = time
+        n_objects = len(raw_uids)
+        if n_objects < 1:
+            return
+        agent_start = int(agent_data.n_agents[time_index])
+        agent_end = agent_start + n_objects
+        agent_data._grow_to_fit(time_index + 1, agent_end)
+        agents = slice(agent_start, agent_end)
+        # viz type and position
         if "fiber" in object_type:
-            result.viz_types[time_index][agent_index] = VIZ_TYPE.FIBER
-            fiber_info = data_columns[2].split(":")
-            raw_uid = int(fiber_info[1])
-            raw_tid = int(fiber_info[0][1:])
-        else:
-            result.viz_types[time_index][agent_index] = VIZ_TYPE.DEFAULT
-            raw_uid = int(data_columns[1].strip("+,"))
-            raw_tid = int(data_columns[0].strip("+,"))
-        # unique instance ID
-        if raw_uid not in uids:
-            uid = raw_uid
-            while uid in used_unique_IDs:
-                uid += 1
-            uids[raw_uid] = uid
-            used_unique_IDs.append(uid)
-        result.unique_ids[time_index][agent_index] = uids[raw_uid]
-        # type name
-        result.types[time_index].append(
-            CytosimConverter._get_display_type_name_from_raw(
-                raw_tid, object_type, object_info.display_data
+            agent_data.viz_types[time_index, agents] = VIZ_TYPE.FIBER
+            agent_data.set_frame_subpoints(
+                time_index,
+                agent_start,
+                SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) * n_points,
+                positions.flatten(),
             )
+        else:
+            agent_data.viz_types[time_index, agents] = VIZ_TYPE.DEFAULT
+            agent_data.positions[time_index, agents] = positions
+        # unique instance IDs
+        unique_ids = []
+        for raw_uid in raw_uids:
+            if raw_uid not in uids:
+                uid = raw_uid
+                while uid in used_unique_IDs:
+                    uid += 1
+                uids[raw_uid] = uid
+                used_unique_IDs.add(uid)
+            unique_ids.append(uids[raw_uid])
+        agent_data.unique_ids[time_index, agents] = unique_ids
+        # type and radius for each raw type ID, in the order they appear
+        raw_type_ids, first_indices, raw_type_indices = np.unique(
+            raw_tids, return_index=True, return_inverse=True
         )
-        # radius
-        result.radii[time_index][agent_index] = scale_factor * (
-            float(object_info.display_data[raw_tid].radius)
-            if raw_tid in object_info.display_data
-            and object_info.display_data[raw_tid].radius is not None
-            else 1.0
-        )
-        return (result, uids, used_unique_IDs)
+        type_ids = np.zeros(raw_type_ids.shape[0], dtype=int)
+        radii = np.ones(raw_type_ids.shape[0])
+        for index in np.argsort(first_indices):
+            raw_tid = int(raw_type_ids[index])
+            type_ids[index] = agent_data.get_type_id(
+                CytosimConverter._get_display_type_name_from_raw(
+                    raw_tid, object_type, object_info.display_data
+                )
+            )
+            if (
+                raw_tid in object_info.display_data
+                and object_info.display_data[raw_tid].radius is not None
+            ):
+                radii[index] = float(object_info.display_data[raw_tid].radius)
+        agent_data.type_ids[time_index, agents] = type_ids[raw_type_indices]
+        agent_data.radii[time_index, agents] = scale_factor * radii[raw_type_indices]
+        agent_data.n_agents[time_index] = agent_end
 
     def _parse_objects(
         self,
         object_type: str,
-        data_lines: List[str],
         scale_factor: float,
         object_info: CytosimObjectInfo,
-        result: AgentData,
-        used_unique_IDs: List[int],
-        overall_line: int,
-        total_lines: int,
-    ) -> Tuple[Dict[str, Any], List[int], int]:
+        agent_data: AgentData,
+        used_unique_IDs: Set[int],
+        progress_start: float,
+        progress_end: float,
+    ) -> int:
         """
         Parse a Cytosim output file containing objects
-        (fibers, solids, singles, or couples) to get agents
+        (fibers, solids, singles, or couples) to get agents,
+        the rows of each frame are parsed together,
+        in parallel if there is more than one worker.
+        Return the number of timesteps
         """
-        time_index = -1
+        frames = parse_frames(
+            object_info.cytosim_file,
+            FRAME_START_PATTERN,
+            CytosimConverter._parse_frame,
+            ("fiber" in object_type, list(object_info.position_indices), scale_factor),
+            workers=self.workers,
+            include_header=True,
+            progress_callback=lambda progress: self.check_report_progress(
+                progress_start + progress * (progress_end - progress_start)
+            ),
+        )
+        # the header is only checked for data before the first frame
+        next(frames)
         uids = {}
-        is_fiber = "fiber" in object_type
-        for line in data_lines:
-            overall_line += 1
-            if CytosimConverter._ignore_line(line):
-                continue
-            columns = line.split()
-            if line[0] == "%":
-                if "frame" in line:
-                    # start of frame
-                    time_index += 1
-                elif "time" in line:
-                    # time metadata
-                    result.times[time_index] = float(columns[2])
-                elif "fiber" in columns[1]:
-                    # start of fiber object
-                    (result, uids, used_unique_IDs,) = CytosimConverter._parse_object(
-                        object_type,
-                        columns,
-                        time_index,
-                        scale_factor,
-                        object_info,
-                        result,
-                        uids,
-                        used_unique_IDs,
-                    )
-                    result.n_agents[time_index] += 1
-                continue
-            elif is_fiber:
-                # each fiber point
-                agent_index = int(result.n_agents[time_index] - 1)
-                subpoint_index = int(result.n_subpoints[time_index][agent_index])
-                # position
-                result.subpoints[time_index][agent_index][
-                    subpoint_index : subpoint_index
-                    + SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
-                ] = scale_factor * np.array(
-                    [
-                        float(columns[1].strip("+,")),
-                        float(columns[2].strip("+,")),
-                        float(columns[3].strip("+,")),
-                    ]
-                )
-                result.n_subpoints[time_index][agent_index] += SUBPOINT_VALUES_PER_ITEM(
-                    DISPLAY_TYPE.FIBER
-                )
-            else:
-                # each non-fiber object
-                (result, uids, used_unique_IDs,) = CytosimConverter._parse_object(
-                    object_type,
-                    columns,
-                    time_index,
-                    scale_factor,
-                    object_info,
-                    result,
-                    uids,
-                    used_unique_IDs,
-                )
-                # position
-                result.positions[time_index][
-                    int(result.n_agents[time_index])
-                ] = scale_factor * (
-                    np.array(
-                        [
-                            float(columns[object_info.position_indices[0]].strip("+,")),
-                            float(columns[object_info.position_indices[1]].strip("+,")),
-                            float(columns[object_info.position_indices[2]].strip("+,")),
-                        ]
-                    )
-                )
-                result.n_agents[time_index] += 1
-            self.check_report_progress(overall_line / total_lines)
-
-        result.n_timesteps = time_index + 1
-        return (result, used_unique_IDs, overall_line)
+        time_index = -1
+        for time_index, frame in enumerate(frames):
+            CytosimConverter._add_objects(
+                object_type,
+                frame,
+                time_index,
+                scale_factor,
+                object_info,
+                agent_data,
+                uids,
+                used_unique_IDs,
+            )
+        return time_index + 1
 
     def _read(self, input_data: CytosimData) -> TrajectoryData:
         """
         Return a TrajectoryData object containing the CytoSim data
         """
         print("Reading Cytosim Data -------------")
-        # load the data from Cytosim output .txt files
-        cytosim_data = {}
         try:
-            for object_type in input_data.object_info:
-                cytosim_data[object_type] = (
-                    input_data.object_info[object_type]
-                    .cytosim_file.get_contents()
-                    .split("\n")
-                )
+            file_sizes = [
+                input_data.object_info[object_type].cytosim_file.get_size()
+                for object_type in input_data.object_info
+            ]
         except Exception as e:
             raise InputDataError(f"Error reading input cytosim file: {e}")
-
-        # parse
-        dimensions = CytosimConverter._parse_dimensions(cytosim_data)
-        agent_data = AgentData.from_dimensions(dimensions)
-        agent_data.draw_fiber_points = input_data.draw_fiber_points
-        overall_line = 0
-        total_lines = sum(
-            len(cytosim_data[object_type]) for object_type in input_data.object_info
+        total_size = max(sum(file_sizes), 1)
+        # parse, growing the arrays as needed
+        agent_data = AgentData.from_dimensions(
+            DimensionData(total_steps=0, max_agents=0),
+            use_type_ids=True,
+            ragged_subpoints=True,
+            dtype=input_data.dtype,
         )
-
-        uids = []
-        for object_type in input_data.object_info:
+        agent_data.draw_fiber_points = input_data.draw_fiber_points
+        total_steps = 0
+        n_read = 0
+        used_unique_IDs = set()
+        for object_type, file_size in zip(input_data.object_info, file_sizes):
             try:
-                (agent_data, uids, overall_line) = self._parse_objects(
+                object_steps = self._parse_objects(
                     object_type,
-                    cytosim_data[object_type],
                     input_data.meta_data.scale_factor,
                     input_data.object_info[object_type],
                     agent_data,
-                    uids,
-                    overall_line,
-                    total_lines,
+                    used_unique_IDs,
+                    n_read / total_size,
+                    (n_read + file_size) / total_size,
                 )
             except Exception as e:
                 raise InputDataError(f"Error reading input cytosim data: {e}")
+            total_steps = max(total_steps, object_steps)
+            n_read += file_size
+        agent_data._trim_to_fit(total_steps)
         # get display data (geometry and color)
         for object_type in input_data.object_info:
             for tid in input_data.object_info[object_type].display_data:
@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from .cytosim_object_info import CytosimObjectInfo
 from ..data_objects import MetaData
 
@@ -19,6 +21,7 @@ class CytosimData:
     meta_data: MetaData
     draw_fiber_points: bool
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -26,6 +29,7 @@ class CytosimData:
         meta_data: MetaData = None,
         draw_fiber_points: bool = False,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -50,8 +54,14 @@ class CytosimData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.object_info = object_info
         self.meta_data = meta_data if meta_data is not None else MetaData()
         self.draw_fiber_points = draw_fiber_points
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
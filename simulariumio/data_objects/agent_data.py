@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import copy
+import itertools
 import logging
 from typing import List, Tuple, Dict, Any, Union
 
@@ -18,6 +19,7 @@ from ..constants import (
     SUBPOINT_VALUES_PER_ITEM,
 )
 from ..exceptions import DataError
+from ..instrumentation import instrument_stage
 from .dimension_data import DimensionData
 from .display_data import DisplayData
 
@@ -35,11 +37,15 @@ class AgentData:
     viz_types: Union[np.ndarray, List[List[float]]]
     unique_ids: Union[np.ndarray, List[List[int]]]
     types: List[List[str]]
+    type_ids: np.ndarray
+    type_names: List[str]
     positions: Union[np.ndarray, List[List[List[float]]]]
     radii: Union[np.ndarray, List[List[float]]]
     rotations: Union[np.ndarray, List[List[List[float]]]]
     n_subpoints: Union[np.ndarray, List[List[float]]]
     subpoints: Union[np.ndarray, List[List[List[float]]]]
+    subpoint_values: np.ndarray
+    subpoint_offsets: np.ndarray
     display_data: Dict[str, DisplayData]
     draw_fiber_points: bool
 
@@ -58,6 +64,10 @@ class AgentData:
         display_data: Dict[str, DisplayData] = None,
         draw_fiber_points: bool = False,
         n_timesteps: int = -1,
+        type_ids: np.ndarray = None,
+        type_names: List[str] = None,
+        subpoint_values: np.ndarray = None,
+        subpoint_offsets: np.ndarray = None,
     ):
         """
         This object contains spatial simulation data
@@ -81,7 +91,8 @@ class AgentData:
             for each agent at each timestep
         types : List[List[str]] (list of shape [timesteps, agents])
             A list containing timesteps, for each a list of
-            the string name for the type of each agent
+            the string name for the type of each agent.
+            Can be None if type_ids and type_names are provided
         positions : np.ndarray or List[List[List[float]]]
         (shape = [timesteps, agents, 3])
             A numpy ndarray or list containing the XYZ position
@@ -117,6 +128,28 @@ class AgentData:
         n_timesteps : int (optional)
             Use the first n_timesteps frames of data
             Default: -1 (use the full length of the buffer)
+        type_ids : np.ndarray (shape = [timesteps, agents]) (optional)
+            A numpy ndarray containing the index in type_names
+            of the type of each agent at each timestep,
+            used instead of types if types is None.
+            The types list is then created from type_ids
+            the first time it's accessed, and used from then on
+            Default: None
+        type_names : List[str] (optional)
+            A list of the type names referenced by type_ids
+            Default: None
+        subpoint_values : np.ndarray (optional)
+            A flat numpy ndarray containing the subpoints for all agents
+            at all timesteps, used instead of subpoints if subpoints is None
+            and subpoint_offsets are provided. The subpoints array is then
+            created from subpoint_values the first time it's accessed,
+            and used from then on
+            Default: None
+        subpoint_offsets : np.ndarray (shape = [timesteps, agents]) (optional)
+            A numpy ndarray containing the index in subpoint_values
+            of the first subpoint for each agent at each timestep,
+            the agent's subpoints continue for n_subpoints values
+            Default: None
         """
         self.times = np.array(times)
         self.n_agents = np.array(n_agents)
@@ -131,6 +164,9 @@ class AgentData:
             else unique_ids
         )
         self.types = types
+        if types is None:
+            self.type_ids = type_ids
+            self.type_names = type_names if type_names is not None else []
         self.positions = (
             AgentData._jagged_3d_list_to_numpy_array(positions)
             if type(positions) is list
@@ -146,84 +182,421 @@ class AgentData:
             if rotations is not None
             else np.zeros_like(self.positions)
         )
-        self.n_subpoints = (
-            AgentData._fill_df(pd.DataFrame(n_subpoints), 0.0).to_numpy(dtype=int)
-            if n_subpoints is not None
-            else np.zeros_like(self.radii)
-        )
-        self.subpoints = (
-            AgentData._get_subpoints_numpy_array(subpoints)
-            if subpoints is not None
-            else np.zeros_like(n_agents)
-        )
+        if n_subpoints is None:
+            self.n_subpoints = np.zeros_like(self.radii)
+        elif type(n_subpoints) is np.ndarray:
+            # filling an array with a DataFrame is slow with many agents
+            self.n_subpoints = np.nan_to_num(n_subpoints).astype(int)
+        else:
+            self.n_subpoints = AgentData._fill_df(
+                pd.DataFrame(n_subpoints), 0.0
+            ).to_numpy(dtype=int)
+        if subpoints is None and subpoint_offsets is not None:
+            self.subpoints = None
+            self.subpoint_values = (
+                subpoint_values if subpoint_values is not None else np.zeros(0)
+            )
+            self.subpoint_offsets = subpoint_offsets
+        else:
+            self.subpoints = (
+                AgentData._get_subpoints_numpy_array(subpoints)
+                if subpoints is not None
+                else np.zeros_like(n_agents)
+            )
         self.display_data = display_data if display_data is not None else {}
         self.draw_fiber_points = draw_fiber_points
         self.n_timesteps = n_timesteps
 
+    @property
+    def types(self) -> List[List[str]]:
+        """
+        The string name for the type of each agent at each timestep.
+        If the types are stored as type_ids, the list is created here
+        and used from then on, since it may be modified
+        """
+        if self._types is None and self.type_ids is not None:
+            self._types = self._get_types_list()
+            self.type_ids = None
+            self.type_names = None
+        return self._types
+
+    @types.setter
+    def types(self, types: List[List[str]]):
+        self._types = types
+        self.type_ids = None
+        self.type_names = None
+        self._type_name_indices = None
+
+    def _get_types_list(self) -> List[List[str]]:
+        """
+        Get the types list without storing it
+        """
+        if self._types is not None or self.type_ids is None:
+            return self._types
+        type_names = np.array(self.type_names, dtype=object)
+        return [
+            type_names[
+                self.type_ids[time_index, : int(self.n_agents[time_index])].astype(int)
+            ].tolist()
+            for time_index in range(self.type_ids.shape[0])
+        ]
+
+    def get_type_id(self, type_name: str) -> int:
+        """
+        Get the index of a type name in type_names,
+        adding the name if it isn't there yet
+        """
+        if self._type_name_indices is None:
+            self._type_name_indices = {
+                name: index for index, name in enumerate(self.type_names)
+            }
+        if type_name not in self._type_name_indices:
+            self._type_name_indices[type_name] = len(self.type_names)
+            self.type_names.append(type_name)
+        return self._type_name_indices[type_name]
+
+    def type_name_for_agent(self, time_index: int, agent_index: int) -> str:
+        """
+        Get the type name for the agent
+        at the given time and agent indices
+        """
+        if self._types is None and self.type_ids is not None:
+            return self.type_names[int(self.type_ids[time_index][agent_index])]
+        return self._types[time_index][agent_index]
+
+    def get_agent_type_ids(self) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get an array with the index in a list of type names
+        of the type of each agent at each timestep, and the list of names.
+        If the types are stored as a list, the type names are listed
+        in the order they first appear
+        """
+        if self._types is None and self.type_ids is not None:
+            return self.type_ids, self.type_names
+        type_codes, type_names = self._factorize_types()
+        return np.maximum(type_codes, 0), type_names
+
+    def _factorize_types(
+        self, time_indices: List[int] = None
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get an array with the index of the type of each agent at each timestep
+        (or each of the given timesteps) in a list of the type names
+        in the order they first appear, -1 where there is no agent,
+        and the list of names
+        """
+        types = (
+            self._types
+            if time_indices is None
+            else [self._types[time_index] for time_index in time_indices]
+        )
+        frame_n_agents = np.array(
+            [len(frame_types) for frame_types in types], dtype=int
+        )
+        max_agents = int(np.amax(frame_n_agents)) if frame_n_agents.size > 0 else 0
+        flat_types = np.empty(int(np.sum(frame_n_agents)), dtype=object)
+        flat_types[:] = list(itertools.chain.from_iterable(types))
+        flat_codes, type_names = pd.factorize(flat_types, sort=False)
+        result = np.full((frame_n_agents.shape[0], max_agents), -1, dtype=int)
+        result[np.arange(max_agents) < frame_n_agents[:, np.newaxis]] = flat_codes
+        return result, list(type_names)
+
+    @property
+    def subpoints(self) -> np.ndarray:
+        """
+        The subpoints for each agent at each timestep.
+        If the subpoints are stored as subpoint_values, the array is created here
+        and used from then on, since it may be modified
+        """
+        if self._subpoints is None and self.subpoint_offsets is not None:
+            self._subpoints = self._get_dense_subpoints()
+            self.subpoint_values = None
+            self.subpoint_offsets = None
+        return self._subpoints
+
+    @subpoints.setter
+    def subpoints(self, subpoints: np.ndarray):
+        self._subpoints = subpoints
+        self.subpoint_values = None
+        self.subpoint_offsets = None
+
+    @property
+    def subpoint_values(self) -> np.ndarray:
+        """
+        The flat array of ragged subpoint values
+        """
+        return self._subpoint_values
+
+    @subpoint_values.setter
+    def subpoint_values(self, subpoint_values: np.ndarray):
+        self._subpoint_values = subpoint_values
+        # new subpoints are added after all the values
+        self._n_subpoint_values = (
+            subpoint_values.shape[0] if subpoint_values is not None else 0
+        )
+
+    def has_ragged_subpoints(self) -> bool:
+        """
+        Are the subpoints stored as subpoint_values and subpoint_offsets?
+        """
+        return self._subpoints is None and self.subpoint_offsets is not None
+
+    def _get_dense_subpoints(self) -> np.ndarray:
+        """
+        Get the subpoints array without storing it
+        """
+        if not self.has_ragged_subpoints():
+            return self._subpoints
+        total_steps, max_agents = self.subpoint_offsets.shape
+        max_subpoints = self.get_dimensions().max_subpoints
+        return self.get_subpoint_values(
+            np.arange(total_steps)[:, np.newaxis, np.newaxis],
+            np.arange(max_agents)[np.newaxis, :, np.newaxis],
+            np.arange(max_subpoints)[np.newaxis, np.newaxis, :],
+        )
+
+    def get_subpoint_values(
+        self,
+        time_indices: Union[int, np.ndarray],
+        agent_indices: Union[int, np.ndarray],
+        subpoint_indices: Union[int, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Get the subpoint values at the given (broadcastable) time, agent,
+        and subpoint indices, values past an agent's subpoints are zero
+        """
+        if not self.has_ragged_subpoints():
+            return self._subpoints[time_indices, agent_indices, subpoint_indices]
+        n_subpoints = self.n_subpoints[time_indices, agent_indices]
+        is_subpoint = subpoint_indices < n_subpoints
+        if self._subpoint_values.shape[0] < 1:
+            return np.zeros(is_subpoint.shape)
+        value_indices = np.where(
+            is_subpoint,
+            self.subpoint_offsets[time_indices, agent_indices] + subpoint_indices,
+            0,
+        )
+        return np.where(is_subpoint, self.subpoint_values[value_indices], 0.0)
+
+    def get_subpoints(self, time_index: int, agent_index: int) -> np.ndarray:
+        """
+        Get a view of the subpoints for the agent
+        at the given time and agent indices
+        """
+        n_sp = int(self.n_subpoints[time_index][agent_index])
+        if not self.has_ragged_subpoints():
+            return self._subpoints[time_index][agent_index][:n_sp]
+        offset = int(self.subpoint_offsets[time_index][agent_index])
+        return self.subpoint_values[offset : offset + n_sp]
+
+    def set_subpoints(self, time_index: int, agent_index: int, subpoints: np.ndarray):
+        """
+        Set the subpoints and number of subpoints for the agent
+        at the given time and agent indices.
+        Ragged subpoints are written over the agent's current subpoints
+        if they fit, otherwise they are added after all the subpoint values
+        """
+        n_sp = subpoints.shape[0]
+        if not self.has_ragged_subpoints():
+            self._subpoints[time_index][agent_index][:n_sp] = subpoints
+            self.n_subpoints[time_index][agent_index] = n_sp
+            return
+        if n_sp > self.n_subpoints[time_index][agent_index]:
+            offset = self._n_subpoint_values
+            if offset + n_sp > self._subpoint_values.shape[0]:
+                # grow the values array geometrically
+                new_values = np.zeros(
+                    max(offset + n_sp, 2 * self._subpoint_values.shape[0]),
+                    dtype=self._subpoint_values.dtype,
+                )
+                new_values[:offset] = self._subpoint_values[:offset]
+                self._subpoint_values = new_values
+            self._n_subpoint_values = offset + n_sp
+            self.subpoint_offsets[time_index][agent_index] = offset
+        offset = int(self.subpoint_offsets[time_index][agent_index])
+        self.subpoint_values[offset : offset + n_sp] = subpoints
+        self.n_subpoints[time_index][agent_index] = n_sp
+
+    def set_frame_subpoints(
+        self,
+        time_index: int,
+        agent_start: int,
+        n_subpoints: np.ndarray,
+        subpoint_values: np.ndarray,
+    ):
+        """
+        Set the subpoints and number of subpoints for consecutive agents
+        at the given time index, starting at agent_start,
+        from one flat array of all their subpoint values in order.
+        Ragged subpoints are added after all the subpoint values
+        """
+        n_subpoints = np.asarray(n_subpoints, dtype=int)
+        agent_end = agent_start + n_subpoints.shape[0]
+        self.n_subpoints[time_index, agent_start:agent_end] = n_subpoints
+        if not self.has_ragged_subpoints():
+            agent_indices = np.repeat(np.arange(agent_start, agent_end), n_subpoints)
+            # index of each value within its agent's subpoints
+            subpoint_indices = np.arange(subpoint_values.shape[0]) - np.repeat(
+                np.cumsum(n_subpoints) - n_subpoints, n_subpoints
+            )
+            self._subpoints[time_index, agent_indices, subpoint_indices] = (
+                subpoint_values
+            )
+            return
+        offset = self._n_subpoint_values
+        n_values = subpoint_values.shape[0]
+        if offset + n_values > self._subpoint_values.shape[0]:
+            # grow the values array geometrically
+            new_values = np.zeros(
+                max(offset + n_values, 2 * self._subpoint_values.shape[0]),
+                dtype=self._subpoint_values.dtype,
+            )
+            new_values[:offset] = self._subpoint_values[:offset]
+            self._subpoint_values = new_values
+        self._subpoint_values[offset : offset + n_values] = subpoint_values
+        self._n_subpoint_values = offset + n_values
+        self.subpoint_offsets[time_index, agent_start:agent_end] = (
+            offset + np.cumsum(n_subpoints) - n_subpoints
+        )
+
+    @staticmethod
+    def _frame_buffer_as_numpy_array(
+        frame_data: Union[List[float], bytes],
+    ) -> np.ndarray:
+        """
+        Get one frame's packed agent data from a simularium JSON dict
+        as a numpy array, frame data may be a list of floats
+        or little-endian float32 bytes
+        """
+        if isinstance(frame_data, (bytes, bytearray, memoryview)):
+            return np.frombuffer(frame_data, dtype=np.dtype("f").newbyteorder("<"))
+        return np.asarray(frame_data, dtype=float)
+
+    @staticmethod
+    def _get_agent_start_indices(frame_buffer: np.ndarray) -> np.ndarray:
+        """
+        Get the index in a packed frame buffer where each agent starts
+        """
+        n_values = frame_buffer.shape[0]
+        values_per_agent = V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+        if n_values % values_per_agent == 0 and not np.any(
+            frame_buffer[V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX :: values_per_agent]
+        ):
+            # no agents have subpoints, so all agents are the same length
+            return np.arange(0, n_values, values_per_agent)
+        # agents have subpoints, so follow each agent's
+        # number of subpoints to the start of the next agent
+        n_subpoints = frame_buffer[V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX :].astype(int)
+        result = []
+        buffer_index = 0
+        while buffer_index + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX < n_values:
+            result.append(buffer_index)
+            buffer_index += values_per_agent + n_subpoints[buffer_index]
+        return np.array(result, dtype=int)
+
     @staticmethod
-    def _get_buffer_data_dimensions(buffer_data: Dict[str, Any]) -> DimensionData:
+    def _get_buffer_data_dimensions(
+        buffer_data: Dict[str, Any],
+        frame_buffers: List[np.ndarray] = None,
+        agent_start_indices: List[np.ndarray] = None,
+    ) -> DimensionData:
         """
         Get dimensions of a simularium JSON dict containing buffers
         """
         bundle_data = buffer_data["spatialData"]["bundleData"]
         result = DimensionData(total_steps=len(bundle_data), max_agents=0)
         for time_index in range(result.total_steps):
-            # buffer = packed agent data as a list of numbers
-            buffer = bundle_data[time_index]["data"]
-            buffer_index = 0
-            agents = 0
-            while buffer_index < len(buffer):
-                # a new agent should start at this index
-                agents += 1
-                buffer_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                # get the number of subpoints
-                subpoints = buffer[buffer_index]
-                if subpoints > result.max_subpoints:
-                    result.max_subpoints = int(subpoints)
-                buffer_index += int(
-                    buffer[buffer_index]
-                    + (
-                        V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
+            frame_buffer = (
+                frame_buffers[time_index]
+                if frame_buffers is not None
+                else AgentData._frame_buffer_as_numpy_array(
+                    bundle_data[time_index]["data"]
+                )
+            )
+            start_indices = (
+                agent_start_indices[time_index]
+                if agent_start_indices is not None
+                else AgentData._get_agent_start_indices(frame_buffer)
+            )
+            if start_indices.shape[0] > result.max_agents:
+                result.max_agents = int(start_indices.shape[0])
+            if start_indices.shape[0] > 0:
+                max_subpoints = int(
+                    np.amax(
+                        frame_buffer[start_indices + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX]
                     )
                 )
-            if agents > result.max_agents:
-                result.max_agents = agents
+                if max_subpoints > result.max_subpoints:
+                    result.max_subpoints = max_subpoints
         return result
 
     def get_type_ids_and_mapping(self) -> Tuple[np.ndarray, Dict[str, Any]]:
         """
-        Generate a type_ids array from the type_names list
+        Generate a type_ids array from the type_names list,
+        numbering the types in the order they first appear
         """
-        total_steps = len(self.types)
-        max_agents = 0
-        for time_index in range(len(self.types)):
-            agent_index = len(self.types[time_index])
-            if agent_index > max_agents:
-                max_agents = agent_index
-        type_ids = np.zeros((len(self.types), max_agents))
-        type_name_mapping = {}
-        type_id_mapping = {}
-        last_tid = 0
-        for time_index in range(total_steps):
-            for agent_index in range(len(self.types[time_index])):
-                type_name = self.types[time_index][agent_index]
-                if len(type_name) == 0:
-                    continue
-                if type_name not in type_id_mapping:
-                    tid = last_tid
-                    last_tid += 1
-                    type_id_mapping[type_name] = tid
-                    type_name_mapping[str(tid)] = {"name": type_name}
-                    if type_name not in self.display_data:
-                        raise DataError(
-                            f"Please provide DisplayData for agent type {type_name}"
-                        )
-                    type_name_mapping[str(tid)]["geometry"] = dict(
-                        self.display_data[type_name]
-                    )
-                type_ids[time_index][agent_index] = type_id_mapping[type_name]
-        return type_ids, type_name_mapping
+        with instrument_stage("type_mapping", n_frames=self.total_timesteps()):
+            if self._types is None and self.type_ids is not None:
+                return self._get_type_ids_and_mapping_from_type_ids()
+            type_codes, type_names = self._factorize_types()
+            has_name = np.array(
+                [len(type_name) > 0 for type_name in type_names], dtype=bool
+            )
+            is_agent = type_codes >= 0
+            is_agent[is_agent] = has_name[type_codes[is_agent]]
+            # types without a name are skipped and keep type ID 0
+            new_type_ids = np.cumsum(has_name) - 1
+            type_ids = np.zeros(type_codes.shape)
+            type_ids[is_agent] = new_type_ids[type_codes[is_agent]]
+            return type_ids, self._get_type_mapping(
+                [type_name for type_name in type_names if len(type_name) > 0]
+            )
+
+    def _get_type_mapping(self, type_names: List[str]) -> Dict[str, Any]:
+        """
+        Generate the type mapping for the type names, in order of type ID
+        """
+        result = {}
+        for tid, type_name in enumerate(type_names):
+            if type_name not in self.display_data:
+                raise DataError(
+                    f"Please provide DisplayData for agent type {type_name}"
+                )
+            result[str(tid)] = {
+                "name": type_name,
+                "geometry": dict(self.display_data[type_name]),
+            }
+        return result
+
+    def _get_type_ids_and_mapping_from_type_ids(
+        self,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Generate a type_ids array numbering the types in the order
+        they first appear, from the type_ids and type_names
+        """
+        total_steps = self.type_ids.shape[0]
+        n_agents = self.n_agents[:total_steps].astype(int)
+        max_agents = int(np.amax(n_agents)) if total_steps > 0 else 0
+        agent_type_ids = self.type_ids[:, :max_agents].astype(int)
+        is_agent = np.arange(max_agents) < n_agents[:, np.newaxis]
+        has_name = np.array(
+            [len(type_name) > 0 for type_name in self.type_names], dtype=bool
+        )
+        if has_name.shape[0] > 0:
+            is_agent &= has_name[agent_type_ids]
+        # number the type names in order of first appearance
+        unique_type_ids, first_indices = np.unique(
+            agent_type_ids[is_agent], return_index=True
+        )
+        ordered_type_ids = unique_type_ids[np.argsort(first_indices)]
+        new_type_ids = np.zeros(len(self.type_names), dtype=int)
+        new_type_ids[ordered_type_ids] = np.arange(ordered_type_ids.shape[0])
+        type_ids = np.zeros((total_steps, max_agents))
+        type_ids[is_agent] = new_type_ids[agent_type_ids[is_agent]]
+        return type_ids, self._get_type_mapping(
+            [self.type_names[type_index] for type_index in ordered_type_ids]
+        )
 
     @staticmethod
     def get_type_names(
@@ -232,14 +605,14 @@ class AgentData:
         """
         Generate the type_names list from a type_ids array and a type_mapping
         """
-        result = []
-        for time_index in range(type_ids.shape[0]):
-            result.append([])
-            for agent_index in range(int(len(type_ids[time_index]))):
-                result[time_index].append(
-                    type_mapping[str(int(type_ids[time_index][agent_index]))]["name"]
-                )
-        return result
+        unique_type_ids, type_indices = np.unique(
+            type_ids.astype(int), return_inverse=True
+        )
+        unique_type_names = np.array(
+            [type_mapping[str(type_id)]["name"] for type_id in unique_type_ids],
+            dtype=object,
+        )
+        return unique_type_names[type_indices.reshape(type_ids.shape)].tolist()
 
     @staticmethod
     def get_display_data(
@@ -278,64 +651,70 @@ class AgentData:
         Create AgentData from a simularium JSON dict containing buffers
         """
         bundle_data = buffer_data["spatialData"]["bundleData"]
-        dimensions = AgentData._get_buffer_data_dimensions(buffer_data)
+        frame_buffers = [
+            AgentData._frame_buffer_as_numpy_array(frame["data"])
+            for frame in bundle_data
+        ]
+        agent_start_indices = [
+            AgentData._get_agent_start_indices(frame_buffer)
+            for frame_buffer in frame_buffers
+        ]
+        dimensions = AgentData._get_buffer_data_dimensions(
+            buffer_data, frame_buffers, agent_start_indices
+        )
         print(f"original dim = {dimensions}")
         agent_data = AgentData.from_dimensions(dimensions)
         type_ids = np.zeros((dimensions.total_steps, dimensions.max_agents))
+        buffer_struct = V1_SPATIAL_BUFFER_STRUCT
+        xyz = np.arange(VALUES_PER_3D_POINT)
         for time_index in range(dimensions.total_steps):
             agent_data.times[time_index] = bundle_data[time_index]["time"]
-            frame_data = bundle_data[time_index]["data"]
-            agent_index = 0
-            buffer_index = 0
-            while buffer_index + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX < len(frame_data):
-                # a new agent should start at this index
-                agent_data.viz_types[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
-                ]
-                agent_data.unique_ids[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
-                ]
-                type_ids[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX
-                ]
-                agent_data.positions[time_index][agent_index] = [
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSY_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSZ_INDEX],
-                ]
-                agent_data.rotations[time_index][agent_index] = [
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTY_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTZ_INDEX],
-                ]
-                agent_data.radii[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.R_INDEX
-                ]
-                buffer_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                # get the subpoints
-                if dimensions.max_subpoints < 1:
-                    buffer_index += int(
-                        V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                    )
-                    agent_index += 1
-                    continue
-                agent_data.n_subpoints[time_index][agent_index] = int(
-                    frame_data[buffer_index]
-                )
-                for i in range(int(frame_data[buffer_index])):
-                    agent_data.subpoints[time_index][agent_index][i] = frame_data[
-                        buffer_index + 1 + i
-                    ]
-                buffer_index += int(
-                    frame_data[buffer_index]
-                    + (
-                        V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                    )
-                )
-                agent_index += 1
-            agent_data.n_agents[time_index] = agent_index
+            frame_buffer = frame_buffers[time_index]
+            start_indices = agent_start_indices[time_index]
+            n_agents = start_indices.shape[0]
+            agent_data.n_agents[time_index] = n_agents
+            if n_agents < 1:
+                continue
+            agent_data.viz_types[time_index, :n_agents] = frame_buffer[
+                start_indices + buffer_struct.VIZ_TYPE_INDEX
+            ]
+            agent_data.unique_ids[time_index, :n_agents] = frame_buffer[
+                start_indices + buffer_struct.UID_INDEX
+            ]
+            type_ids[time_index, :n_agents] = frame_buffer[
+                start_indices + buffer_struct.TID_INDEX
+            ]
+            agent_data.positions[time_index, :n_agents] = frame_buffer[
+                start_indices[:, np.newaxis] + buffer_struct.POSX_INDEX + xyz
+            ]
+            agent_data.rotations[time_index, :n_agents] = frame_buffer[
+                start_indices[:, np.newaxis] + buffer_struct.ROTX_INDEX + xyz
+            ]
+            agent_data.radii[time_index, :n_agents] = frame_buffer[
+                start_indices + buffer_struct.R_INDEX
+            ]
+            # get the subpoints
+            if dimensions.max_subpoints < 1:
+                continue
+            n_subpoints = frame_buffer[start_indices + buffer_struct.NSP_INDEX].astype(
+                int
+            )
+            agent_data.n_subpoints[time_index, :n_agents] = n_subpoints
+            total_subpoints = int(np.sum(n_subpoints))
+            if total_subpoints < 1:
+                continue
+            subpoint_agent_indices = np.repeat(np.arange(n_agents), n_subpoints)
+            subpoint_indices = (
+                np.arange(total_subpoints)
+                - (np.cumsum(n_subpoints) - n_subpoints)[subpoint_agent_indices]
+            )
+            agent_data.subpoints[
+                time_index, subpoint_agent_indices, subpoint_indices
+            ] = frame_buffer[
+                start_indices[subpoint_agent_indices]
+                + buffer_struct.SP_INDEX
+                + subpoint_indices
+            ]
         type_names = AgentData.get_type_names(
             type_ids, buffer_data["trajectoryInfo"]["typeMapping"]
         )
@@ -371,7 +750,7 @@ class AgentData:
 
     @staticmethod
     def _jagged_3d_list_to_numpy_array(
-        jagged_3d_list: Union[np.ndarray, List]
+        jagged_3d_list: Union[np.ndarray, List],
     ) -> np.ndarray:
         """
         Shape a jagged list with 3 dimensions to a numpy array
@@ -482,33 +861,88 @@ class AgentData:
 
     @classmethod
     def from_dimensions(
-        cls, dimensions: DimensionData, default_viz_type: float = VIZ_TYPE.DEFAULT
+        cls,
+        dimensions: DimensionData,
+        default_viz_type: float = VIZ_TYPE.DEFAULT,
+        use_type_ids: bool = False,
+        ragged_subpoints: bool = False,
+        dtype: np.dtype = np.float64,
     ):
         """
-        Create AgentData with empty numpy arrays of the required dimensions
+        Create AgentData with empty numpy arrays of the required dimensions,
+        optionally storing types as an empty type_ids array
+        instead of a list, with type names added by get_type_id,
+        and subpoints as ragged subpoint_values, added by set_subpoints.
+        Spatial arrays use the given float dtype, with np.float32
+        unique IDs and counts are stored as np.int32
         """
+        count_dtype = AgentData._count_dtype(dtype)
         return cls(
             times=np.zeros(dimensions.total_steps),
-            n_agents=np.zeros(dimensions.total_steps),
+            n_agents=np.zeros(dimensions.total_steps, dtype=count_dtype),
             viz_types=default_viz_type
-            * np.ones((dimensions.total_steps, dimensions.max_agents)),
-            unique_ids=np.zeros((dimensions.total_steps, dimensions.max_agents)),
-            types=[[] for t in range(dimensions.total_steps)],
+            * np.ones((dimensions.total_steps, dimensions.max_agents), dtype=dtype),
+            unique_ids=np.zeros(
+                (dimensions.total_steps, dimensions.max_agents), dtype=count_dtype
+            ),
+            types=(
+                None if use_type_ids else [[] for t in range(dimensions.total_steps)]
+            ),
             positions=np.zeros(
-                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT)
+                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT),
+                dtype=dtype,
             ),
-            radii=np.ones((dimensions.total_steps, dimensions.max_agents)),
+            radii=np.ones((dimensions.total_steps, dimensions.max_agents), dtype=dtype),
             rotations=np.zeros(
-                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT)
+                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT),
+                dtype=dtype,
+            ),
+            n_subpoints=np.zeros(
+                (dimensions.total_steps, dimensions.max_agents), dtype=count_dtype
             ),
-            n_subpoints=np.zeros((dimensions.total_steps, dimensions.max_agents)),
-            subpoints=np.zeros(
-                (
-                    dimensions.total_steps,
-                    dimensions.max_agents,
-                    dimensions.max_subpoints,
+            subpoints=(
+                np.zeros(
+                    (
+                        dimensions.total_steps,
+                        dimensions.max_agents,
+                        dimensions.max_subpoints,
+                    ),
+                    dtype=dtype,
                 )
+                if not ragged_subpoints
+                else None
             ),
+            type_ids=(
+                np.zeros((dimensions.total_steps, dimensions.max_agents), dtype=int)
+                if use_type_ids
+                else None
+            ),
+            subpoint_values=np.zeros(0, dtype=dtype) if ragged_subpoints else None,
+            subpoint_offsets=(
+                np.zeros((dimensions.total_steps, dimensions.max_agents), dtype=int)
+                if ragged_subpoints
+                else None
+            ),
+        )
+
+    @staticmethod
+    def _count_dtype(dtype: np.dtype) -> np.dtype:
+        """
+        Get the dtype for unique IDs and counts given the dtype for spatial arrays,
+        these are int32 for float32 data and otherwise use the same dtype
+        """
+        return np.int32 if np.dtype(dtype) == np.float32 else dtype
+
+    def get_dtype(self) -> np.dtype:
+        """
+        Get the float dtype used for this object's spatial arrays,
+        np.float32 if they were created with it, otherwise np.float64
+        """
+        return (
+            np.float32
+            if isinstance(self.positions, np.ndarray)
+            and self.positions.dtype == np.float32
+            else np.float64
         )
 
     def total_timesteps(self) -> int:
@@ -522,12 +956,18 @@ class AgentData:
         """
         Get the dimensions of this object's numpy arrays
         """
+        if self.has_ragged_subpoints():
+            max_subpoints = (
+                int(np.amax(self.n_subpoints)) if self.n_subpoints.size > 0 else 0
+            )
+        else:
+            max_subpoints = (
+                self.subpoints.shape[2] if len(self.subpoints.shape) > 2 else 0
+            )
         return DimensionData(
             total_steps=self.total_timesteps(),
             max_agents=self.viz_types.shape[1],
-            max_subpoints=self.subpoints.shape[2]
-            if len(self.subpoints.shape) > 2
-            else 0,
+            max_subpoints=max_subpoints,
         )
 
     def get_copy_with_increased_buffer_size(
@@ -540,8 +980,14 @@ class AgentData:
         print(f"increase buffer {axis}")
         current_dimensions = self.get_dimensions()
         new_dimensions = added_dimensions.add(current_dimensions, axis)
-        current_types = copy.deepcopy(self.types)
-        result = AgentData.from_dimensions(new_dimensions)
+        use_type_ids = self._types is None and self.type_ids is not None
+        ragged_subpoints = self.has_ragged_subpoints()
+        result = AgentData.from_dimensions(
+            new_dimensions,
+            use_type_ids=use_type_ids,
+            ragged_subpoints=ragged_subpoints,
+            dtype=self.get_dtype(),
+        )
         result.times[0 : current_dimensions.total_steps] = self.times[:]
         result.n_agents[0 : current_dimensions.total_steps] = self.n_agents[:]
         result.viz_types[
@@ -550,10 +996,19 @@ class AgentData:
         result.unique_ids[
             0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
         ] = self.unique_ids[:]
-        for time_index in range(current_dimensions.total_steps):
-            n_a = int(self.n_agents[time_index])
-            for agent_index in range(n_a):
-                result.types[time_index].append(current_types[time_index][agent_index])
+        if use_type_ids:
+            result.type_ids[
+                0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
+            ] = self.type_ids[:]
+            result.type_names = list(self.type_names)
+        else:
+            current_types = copy.deepcopy(self.types)
+            for time_index in range(current_dimensions.total_steps):
+                n_a = int(self.n_agents[time_index])
+                for agent_index in range(n_a):
+                    result.types[time_index].append(
+                        current_types[time_index][agent_index]
+                    )
         result.positions[
             0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
         ] = self.positions[:]
@@ -566,7 +1021,13 @@ class AgentData:
         result.n_subpoints[
             0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
         ] = self.n_subpoints[:]
-        if len(self.subpoints.shape) > 2:
+        if ragged_subpoints:
+            result.subpoint_offsets[
+                0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
+            ] = self.subpoint_offsets[:]
+            result.subpoint_values = np.copy(self.subpoint_values)
+            result._n_subpoint_values = self._n_subpoint_values
+        elif len(self.subpoints.shape) > 2:
             result.subpoints[
                 0 : current_dimensions.total_steps,
                 0 : current_dimensions.max_agents,
@@ -605,7 +1066,7 @@ class AgentData:
                     ),
                     axis,
                 )
-        elif axis == 2:  # subpoints dimension
+        elif axis == 2 and not result.has_ragged_subpoints():  # subpoints dimension
             while next_index >= result.get_dimensions().max_subpoints:
                 result = result.get_copy_with_increased_buffer_size(
                     DimensionData(
@@ -617,12 +1078,94 @@ class AgentData:
                 )
         return result
 
+    def _resize(self, total_steps: int, max_agents: int):
+        """
+        Resize the arrays in place to the given number of timesteps
+        and agents, keeping the values that fit.
+        New timesteps and agents get the same defaults as from_dimensions
+        """
+
+        def resized(array: np.ndarray, fill_value: float = 0) -> np.ndarray:
+            shape = (total_steps, max_agents)[: len(array.shape)] + array.shape[2:]
+            if array.shape == shape:
+                return array
+            result = np.full(shape, fill_value, dtype=array.dtype)
+            overlap = tuple(
+                slice(0, min(size, new_size))
+                for size, new_size in zip(array.shape, shape)
+            )
+            result[overlap] = array[overlap]
+            return result
+
+        self.times = resized(self.times)
+        self.n_agents = resized(self.n_agents)
+        self.viz_types = resized(self.viz_types, VIZ_TYPE.DEFAULT)
+        self.unique_ids = resized(self.unique_ids)
+        self.positions = resized(self.positions)
+        self.radii = resized(self.radii, 1.0)
+        self.rotations = resized(self.rotations)
+        self.n_subpoints = resized(self.n_subpoints)
+        if self._types is None and self.type_ids is not None:
+            self.type_ids = resized(self.type_ids)
+        elif self._types is not None:
+            self._types = self._types[:total_steps] + [
+                [] for _ in range(total_steps - len(self._types))
+            ]
+        if self.has_ragged_subpoints():
+            self.subpoint_offsets = resized(self.subpoint_offsets)
+        elif len(self._subpoints.shape) > 2:
+            self._subpoints = resized(self._subpoints)
+
+    def _grow_to_fit(self, total_steps: int, max_agents: int):
+        """
+        If the arrays don't have room for the given timesteps and agents,
+        at least double their size along that axis, so agent data
+        can be added as it is parsed without knowing its dimensions
+        """
+        current_steps, current_agents = self.unique_ids.shape
+        if total_steps <= current_steps and max_agents <= current_agents:
+            return
+        self._resize(
+            (
+                max(total_steps, 2 * current_steps)
+                if total_steps > current_steps
+                else current_steps
+            ),
+            (
+                max(max_agents, 2 * current_agents)
+                if max_agents > current_agents
+                else current_agents
+            ),
+        )
+
+    def _trim_to_fit(self, total_steps: int):
+        """
+        After growing the arrays with _grow_to_fit, resize them
+        to the given number of timesteps and the max agents in them
+        """
+        self._resize(total_steps, int(np.amax(self.n_agents[:total_steps], initial=0)))
+        self._trim_subpoint_values()
+        self.n_timesteps = total_steps
+
+    def _trim_subpoint_values(self):
+        """
+        Trim the ragged subpoint values to the ones in use,
+        after they were grown by set_frame_subpoints
+        """
+        if (
+            self.has_ragged_subpoints()
+            and self._n_subpoint_values < self._subpoint_values.shape[0]
+        ):
+            self.subpoint_values = np.copy(
+                self._subpoint_values[: self._n_subpoint_values]
+            )
+
     def display_type_for_agent(self, time_index: int, agent_index: int) -> DISPLAY_TYPE:
         """
         Get the DISPLAY_TYPE for the agent
         at the given time and agent indices
         """
-        type_name = self.types[time_index][agent_index]
+        type_name = self.type_name_for_agent(time_index, agent_index)
         if type_name not in self.display_data:
             self.display_data[type_name] = DisplayData(
                 name=type_name,
@@ -653,24 +1196,139 @@ class AgentData:
                 return default_display_types[values_per_item]
         return DISPLAY_TYPE.SPHERE
 
-    def _check_subpoints_match_display_type(self):
+    def _get_frame_time_indices(self, time_indices: List[int] = None) -> np.ndarray:
+        """
+        Get the given timesteps as an array,
+        or all the timesteps that exist if None
+        """
+        if time_indices is not None:
+            return np.asarray(time_indices, dtype=int)
+        n_types_steps = (
+            self.type_ids.shape[0]
+            if self._types is None and self.type_ids is not None
+            else len(self._types)
+        )
+        return np.arange(min(self.times.shape[0], n_types_steps))
+
+    def _get_frame_agent_type_ids(
+        self, time_indices: List[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Get the index in a list of type names of the type of each agent
+        at each timestep (or each of the given timesteps),
+        limited to the timesteps and agents that exist,
+        a mask of which agents exist, and the list of names
+        """
+        time_indices = self._get_frame_time_indices(time_indices)
+        if self._types is None and self.type_ids is not None:
+            type_ids = self.type_ids[time_indices].astype(int)
+            type_names = self.type_names
+        else:
+            type_ids, type_names = self._factorize_types(time_indices)
+        n_agents = self.n_agents[time_indices].astype(int)
+        is_agent = np.arange(type_ids.shape[1]) < n_agents[:, np.newaxis]
+        return type_ids, is_agent, type_names
+
+    def _add_default_display_data(
+        self, time_indices: List[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Add default DisplayData for each type without DisplayData
+        at each timestep (or each of the given timesteps),
+        using the number of subpoints of the first agent of that type
+        Return the type IDs, mask, and type names
+        from _get_frame_agent_type_ids
+        """
+        time_indices = self._get_frame_time_indices(time_indices)
+        type_ids, is_agent, type_names = self._get_frame_agent_type_ids(time_indices)
+        is_missing = np.array(
+            [type_name not in self.display_data for type_name in type_names],
+            dtype=bool,
+        )
+        if not np.any(is_missing):
+            return type_ids, is_agent, type_names
+        # first agent of each type in time then agent order
+        flat_indices = np.flatnonzero(is_agent)
+        flat_type_ids = type_ids.reshape(-1)[flat_indices]
+        unique_type_ids, first_indices = np.unique(flat_type_ids, return_index=True)
+        for type_index, first_index in sorted(
+            zip(unique_type_ids.tolist(), first_indices.tolist()),
+            key=lambda item: item[1],
+        ):
+            if not is_missing[type_index]:
+                continue
+            frame_index, agent_index = np.unravel_index(
+                flat_indices[first_index], type_ids.shape
+            )
+            self.display_type_for_agent(
+                int(time_indices[frame_index]), int(agent_index)
+            )
+        return type_ids, is_agent, type_names
+
+    def _check_subpoints_match_display_type(self, time_indices: List[int] = None):
         """
         Check that the number of subpoints is divisible
         by the values per item for the agent's display type
+        at each timestep (or each of the given timesteps)
         """
-        for time_index in range(self.times.shape[0]):
-            for agent_index in range(int(self.n_agents[time_index])):
-                display_type = self.display_type_for_agent(time_index, agent_index)
-                values_per_item = SUBPOINT_VALUES_PER_ITEM(display_type)
-                n_subpoints = self.n_subpoints[time_index][agent_index]
-                if n_subpoints % values_per_item != 0:
-                    type_name = self.types[time_index][agent_index]
-                    raise Exception(
-                        f"T = {time_index} : {type_name} at index = "
-                        f"{agent_index} has n_subpoints = {n_subpoints} "
-                        f"but is display_type = {display_type}, which requires "
-                        f"subpoints in multiples of {values_per_item}"
-                    )
+        time_indices = self._get_frame_time_indices(time_indices)
+        type_ids, is_agent, type_names = self._add_default_display_data(time_indices)
+        if type_ids.size < 1 or not np.any(is_agent):
+            return
+        type_values_per_item = np.ones(len(type_names), dtype=int)
+        for type_index, type_name in enumerate(type_names):
+            if type_name in self.display_data:
+                display_type = self.display_data[type_name].display_type
+                type_values_per_item[type_index] = SUBPOINT_VALUES_PER_ITEM(
+                    display_type
+                )
+        n_agents = min(type_ids.shape[1], self.n_subpoints.shape[1])
+        type_ids = type_ids[:, :n_agents]
+        is_agent = is_agent[:, :n_agents]
+        n_subpoints = self.n_subpoints[time_indices, :n_agents]
+        values_per_item = type_values_per_item[np.where(is_agent, type_ids, 0)]
+        is_invalid = is_agent & (n_subpoints % values_per_item != 0)
+        if not np.any(is_invalid):
+            return
+        frame_index, agent_index = np.argwhere(is_invalid)[0]
+        time_index = int(time_indices[frame_index])
+        display_type = self.display_type_for_agent(time_index, agent_index)
+        raise Exception(
+            f"T = {time_index} : {type_names[type_ids[frame_index, agent_index]]} "
+            f"at index = {agent_index} has n_subpoints = "
+            f"{n_subpoints[frame_index][agent_index]} "
+            f"but is display_type = {display_type}, which requires "
+            f"subpoints in multiples of {values_per_item[frame_index, agent_index]}"
+        )
+
+    def __copy__(self):
+        """
+        Copy this object without copying its arrays,
+        the display_data dict is copied since DisplayData
+        for each type is added to it as needed
+        """
+        result = type(self)(
+            times=self.times,
+            n_agents=self.n_agents,
+            viz_types=self.viz_types,
+            unique_ids=self.unique_ids,
+            types=self._types,
+            positions=self.positions,
+            radii=self.radii,
+            rotations=self.rotations,
+            n_subpoints=self.n_subpoints,
+            subpoints=self._subpoints,
+            display_data=dict(self.display_data),
+            draw_fiber_points=self.draw_fiber_points,
+            n_timesteps=self.n_timesteps,
+            type_ids=self.type_ids,
+            type_names=list(self.type_names) if self.type_names is not None else None,
+            subpoint_values=self.subpoint_values,
+            subpoint_offsets=self.subpoint_offsets,
+        )
+        if self._subpoint_values is not None:
+            result._n_subpoint_values = self._n_subpoint_values
+        return result
 
     def __deepcopy__(self, memo):
         result = type(self)(
@@ -678,15 +1336,31 @@ class AgentData:
             n_agents=np.copy(self.n_agents),
             viz_types=np.copy(self.viz_types),
             unique_ids=np.copy(self.unique_ids),
-            types=copy.deepcopy(self.types, memo),
+            types=copy.deepcopy(self._types, memo),
             positions=np.copy(self.positions),
             radii=np.copy(self.radii),
             rotations=np.copy(self.rotations),
             n_subpoints=np.copy(self.n_subpoints),
-            subpoints=np.copy(self.subpoints),
+            subpoints=(
+                np.copy(self._subpoints) if self._subpoints is not None else None
+            ),
             display_data=copy.deepcopy(self.display_data, memo),
             draw_fiber_points=self.draw_fiber_points,
+            type_ids=np.copy(self.type_ids) if self.type_ids is not None else None,
+            type_names=list(self.type_names) if self.type_names is not None else None,
+            subpoint_values=(
+                np.copy(self.subpoint_values)
+                if self.subpoint_values is not None
+                else None
+            ),
+            subpoint_offsets=(
+                np.copy(self.subpoint_offsets)
+                if self.subpoint_offsets is not None
+                else None
+            ),
         )
+        if self._subpoint_values is not None:
+            result._n_subpoint_values = self._n_subpoint_values
         return result
 
     def __eq__(self, other):
@@ -696,12 +1370,13 @@ class AgentData:
             and False not in np.isclose(self.n_agents, other.n_agents)
             and False not in np.isclose(self.viz_types, other.viz_types)
             and False not in np.isclose(self.unique_ids, other.unique_ids)
-            and self.types == other.types
+            and self._get_types_list() == other._get_types_list()
             and False not in np.isclose(self.positions, other.positions)
             and False not in np.isclose(self.radii, other.radii)
             and False not in np.isclose(self.rotations, other.rotations)
             and False not in np.isclose(self.n_subpoints, other.n_subpoints)
-            and False not in np.isclose(self.subpoints, other.subpoints)
+            and False
+            not in np.isclose(self._get_dense_subpoints(), other._get_dense_subpoints())
             and self.display_data == other.display_data
             and self.draw_fiber_points == other.draw_fiber_points
         )
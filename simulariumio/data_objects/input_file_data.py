@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import Union
+import os
+from typing import Iterator, List, Tuple, Union
 
 from ..exceptions import DataError
 from ..constants import BINARY_SETTINGS
@@ -13,6 +14,11 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# the default size of the blocks read by iter_line_blocks
+READ_BLOCK_N_BYTES = 16 * 1024 * 1024
+
+###############################################################################
+
 
 class InputFileData:
     file_path: str
@@ -60,6 +66,67 @@ class InputFileData:
         with open(self.file_path, "r") as myfile:
             return myfile.read()
 
+    def get_size(self) -> int:
+        """
+        Return the size of the file in bytes,
+        or the length of file_contents if it is provided
+        """
+        if self.file_contents:
+            return len(self.file_contents)
+        return os.path.getsize(self.file_path)
+
+    def iter_line_blocks(
+        self, block_n_bytes: int = READ_BLOCK_N_BYTES
+    ) -> Iterator[Tuple[List[str], int]]:
+        """
+        Yield the lines of a text file in blocks of about block_n_bytes,
+        so the whole file doesn't need to be held in memory,
+        along with how much of the file has been read so far
+        (out of get_size()).
+        Lines end with "\\n", "\\r\\n", or "\\r", as when reading in text mode
+        """
+        if self.file_contents:
+            contents = self.file_contents
+            if isinstance(contents, bytes):
+                contents = contents.decode("utf-8")
+            start = 0
+            while start < len(contents):
+                end = contents.find("\n", start + block_n_bytes)
+                end = len(contents) if end < 0 else end + 1
+                yield InputFileData._split_lines(contents[start:end]), end
+                start = end
+            return
+        n_read = 0
+        remainder = b""
+        with open(self.file_path, "rb") as open_file:
+            while True:
+                block = open_file.read(block_n_bytes)
+                if not block:
+                    break
+                n_read += len(block)
+                # only split complete lines, the rest is added to the next block
+                block = remainder + block
+                end = block.rfind(b"\n") + 1
+                remainder = block[end:]
+                if end > 0:
+                    yield InputFileData._split_lines(
+                        block[:end].decode("utf-8")
+                    ), n_read - len(remainder)
+        if remainder:
+            yield InputFileData._split_lines(remainder.decode("utf-8")), n_read
+
+    @staticmethod
+    def _split_lines(text: str) -> List[str]:
+        """
+        Split text into lines, without a trailing empty line
+        """
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return lines
+
     def _is_binary(self):
         """
         Is this data in binary? (or JSON?)
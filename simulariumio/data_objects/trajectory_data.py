@@ -129,6 +129,19 @@ class TrajectoryData:
                 new_agent_index += 1
         self.agent_data = result
 
+    def __copy__(self):
+        """
+        Copy this object and its data objects without copying any arrays
+        """
+        result = type(self)(
+            meta_data=copy.copy(self.meta_data),
+            agent_data=copy.copy(self.agent_data),
+            time_units=copy.copy(self.time_units),
+            spatial_units=copy.copy(self.spatial_units),
+            plots=list(self.plots),
+        )
+        return result
+
     def __deepcopy__(self, memo):
         result = type(self)(
             meta_data=copy.deepcopy(self.meta_data, memo),
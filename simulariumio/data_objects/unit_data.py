@@ -95,10 +95,12 @@ class UnitData:
         return f"{magnitude}{self.name}"
 
     def __copy__(self):
-        result = type(self)(
-            name=self.name,
-            magnitude=self.magnitude,
-        )
+        # parse the units with this object's registry
+        # instead of building a new one, which is slow
+        result = type(self).__new__(type(self))
+        ureg = self._quantity._REGISTRY
+        result._quantity = self.magnitude * ureg(self.name)
+        result._update_units()
         return result
 
     def __eq__(self, other):
@@ -9,6 +9,7 @@ from .trajectory_converter import TrajectoryConverter
 from .data_objects import TrajectoryData, UnitData, InputFileData, DisplayData
 from .constants import CURRENT_VERSION
 from .readers import SimulariumBinaryReader
+from .instrumentation import instrument_stage
 
 ###############################################################################
 
@@ -31,18 +32,20 @@ class FileConverter(TrajectoryConverter):
         """
         if display_data is None:
             display_data = {}
-        if input_file._is_binary():
-            print("Reading Simularium binary -------------")
-            buffer_data = SimulariumBinaryReader.load_binary(input_file)
-        else:
-            print("Reading Simularium JSON -------------")
-            buffer_data = json.loads(input_file.get_contents())
-        if (
-            int(buffer_data["trajectoryInfo"]["version"])
-            < CURRENT_VERSION.TRAJECTORY_INFO
-        ):
-            buffer_data = FileConverter.update_trajectory_info_version(buffer_data)
-        self._data = TrajectoryData.from_buffer_data(buffer_data, display_data)
+        with instrument_stage("parse", converter="FileConverter") as stage:
+            if input_file._is_binary():
+                print("Reading Simularium binary -------------")
+                buffer_data = SimulariumBinaryReader.load_binary(input_file)
+            else:
+                print("Reading Simularium JSON -------------")
+                buffer_data = json.loads(input_file.get_contents())
+            if (
+                int(buffer_data["trajectoryInfo"]["version"])
+                < CURRENT_VERSION.TRAJECTORY_INFO
+            ):
+                buffer_data = FileConverter.update_trajectory_info_version(buffer_data)
+            self._data = TrajectoryData.from_buffer_data(buffer_data, display_data)
+            stage.n_frames = self._data.agent_data.total_timesteps()
 
     @staticmethod
     def _update_trajectory_info_v1_to_v2(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -20,6 +20,7 @@ log = logging.getLogger(__name__)
 class EveryNthAgentFilter(Filter):
     n_per_type: Dict[str, int]
     default_n: int
+    mutates_data: bool = False
 
     def __init__(self, n_per_type: Dict[str, int], default_n: int = 1):
         """
@@ -46,7 +47,10 @@ class EveryNthAgentFilter(Filter):
         print("Filtering: every Nth agent -------------")
         # get filtered data
         start_dimensions = data.agent_data.get_dimensions()
-        result = AgentData.from_dimensions(start_dimensions)
+        ragged_subpoints = data.agent_data.has_ragged_subpoints()
+        result = AgentData.from_dimensions(
+            start_dimensions, ragged_subpoints=ragged_subpoints
+        )
         result.times = data.agent_data.times
         result.draw_fiber_points = data.agent_data.draw_fiber_points
         result.display_data = data.agent_data.display_data
@@ -83,12 +87,20 @@ class EveryNthAgentFilter(Filter):
                 result.rotations[time_index][
                     new_agent_index
                 ] = data.agent_data.rotations[time_index][agent_index]
-                result.n_subpoints[time_index][
-                    new_agent_index
-                ] = data.agent_data.n_subpoints[time_index][agent_index]
-                result.subpoints[time_index][new_agent_index][
-                    : np.shape(data.agent_data.subpoints[time_index][agent_index])[0]
-                ] = data.agent_data.subpoints[time_index][agent_index]
+                if ragged_subpoints:
+                    result.set_subpoints(
+                        time_index,
+                        new_agent_index,
+                        data.agent_data.get_subpoints(time_index, agent_index),
+                    )
+                else:
+                    result.n_subpoints[time_index][
+                        new_agent_index
+                    ] = data.agent_data.n_subpoints[time_index][agent_index]
+                    subpoints = data.agent_data.subpoints[time_index][agent_index]
+                    result.subpoints[time_index][new_agent_index][
+                        : np.shape(subpoints)[0]
+                    ] = subpoints
                 new_agent_index += 1
             result.n_agents[time_index] = new_agent_index
         data.agent_data = result
@@ -20,6 +20,7 @@ log = logging.getLogger(__name__)
 class EveryNthSubpointFilter(Filter):
     n_per_type: Dict[str, int]
     default_n: int
+    mutates_data: bool = False
 
     def __init__(self, n_per_type: Dict[str, int], default_n: int = 1):
         """
@@ -50,8 +51,14 @@ class EveryNthSubpointFilter(Filter):
         max_agents = int(np.amax(data.agent_data.n_agents))
         max_subpoints = int(np.amax(data.agent_data.n_subpoints))
         # get filtered data
+        ragged_subpoints = data.agent_data.has_ragged_subpoints()
         new_n_subpoints = np.zeros((total_steps, max_agents))
-        new_subpoints = np.zeros((total_steps, max_agents, max_subpoints))
+        if ragged_subpoints:
+            new_subpoint_offsets = np.zeros((total_steps, max_agents), dtype=int)
+            new_subpoint_values = []
+            n_values = 0
+        else:
+            new_subpoints = np.zeros((total_steps, max_agents, max_subpoints))
         for time_index in range(total_steps):
             for agent_index in range(int(data.agent_data.n_agents[time_index])):
                 sp_items = self.get_items_from_subpoints(
@@ -68,11 +75,23 @@ class EveryNthSubpointFilter(Filter):
                 new_n_items = math.ceil(sp_items.shape[0] / float(inc))
                 new_n_sp = sp_items.shape[1] * new_n_items
                 new_n_subpoints[time_index][agent_index] = new_n_sp
+                if ragged_subpoints:
+                    new_subpoint_offsets[time_index][agent_index] = n_values
+                    new_subpoint_values.append(sp_items[::inc].flatten())
+                    n_values += new_n_sp
+                    continue
                 new_subpoints[time_index][agent_index][:new_n_sp] = sp_items[
                     ::inc
                 ].flatten()
         data.agent_data.n_subpoints = new_n_subpoints
-        data.agent_data.subpoints = new_subpoints
+        if ragged_subpoints:
+            data.agent_data.subpoint_values = np.concatenate(
+                new_subpoint_values
+                + [np.zeros(0, dtype=data.agent_data.subpoint_values.dtype)]
+            )
+            data.agent_data.subpoint_offsets = new_subpoint_offsets
+        else:
+            data.agent_data.subpoints = new_subpoints
         print(
             f"filtered dims = {total_steps} timesteps X "
             f"{max_agents} agents X {int(np.amax(new_n_subpoints))} subpoints"
@@ -20,6 +20,7 @@ log = logging.getLogger(__name__)
 
 class EveryNthTimestepFilter(Filter):
     n: int
+    mutates_data: bool = False
 
     def __init__(
         self,
@@ -50,7 +51,11 @@ class EveryNthTimestepFilter(Filter):
             max_agents=int(np.amax(data.agent_data.n_agents)),
             max_subpoints=int(np.amax(data.agent_data.n_subpoints)),
         )
-        result = AgentData.from_dimensions(new_dimensions)
+        ragged_subpoints = data.agent_data.has_ragged_subpoints()
+        result = AgentData.from_dimensions(
+            new_dimensions, ragged_subpoints=ragged_subpoints
+        )
+        result.draw_fiber_points = data.agent_data.draw_fiber_points
         # get filtered data
         new_time_index = 0
         for time_index in range(data.agent_data.times.size):
@@ -78,12 +83,20 @@ class EveryNthTimestepFilter(Filter):
                 result.rotations[new_time_index][
                     agent_index
                 ] = data.agent_data.rotations[time_index][agent_index]
-                result.n_subpoints[new_time_index][
-                    agent_index
-                ] = data.agent_data.n_subpoints[time_index][agent_index]
-                result.subpoints[new_time_index][agent_index][
-                    : np.shape(data.agent_data.subpoints[time_index][agent_index])[0]
-                ] = data.agent_data.subpoints[time_index][agent_index]
+                if ragged_subpoints:
+                    result.set_subpoints(
+                        new_time_index,
+                        agent_index,
+                        data.agent_data.get_subpoints(time_index, agent_index),
+                    )
+                else:
+                    result.n_subpoints[new_time_index][
+                        agent_index
+                    ] = data.agent_data.n_subpoints[time_index][agent_index]
+                    subpoints = data.agent_data.subpoints[time_index][agent_index]
+                    result.subpoints[new_time_index][agent_index][
+                        : np.shape(subpoints)[0]
+                    ] = subpoints
             new_time_index += 1
         unique_types = set([tn for frame in result.types for tn in frame])
         for type_name in unique_types:
@@ -17,6 +17,12 @@ log = logging.getLogger(__name__)
 
 
 class Filter(ABC):
+    # Does apply() modify the input data's arrays, lists or dicts in place?
+    # Filters that only reassign attributes of the TrajectoryData
+    # and its AgentData can set this to False,
+    # so the data doesn't need to be copied before they are applied
+    mutates_data: bool = True
+
     @abstractmethod
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         pass
@@ -34,6 +40,6 @@ class Filter(ABC):
         display_type = agent_data.display_type_for_agent(time_index, agent_index)
         values_per_item = SUBPOINT_VALUES_PER_ITEM(display_type)
         n_items = round(n_sp / values_per_item)
-        items = agent_data.subpoints[time_index][agent_index][:n_sp]
+        items = agent_data.get_subpoints(time_index, agent_index)
         items = items.reshape(n_items, values_per_item)
         return items
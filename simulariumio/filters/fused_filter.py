@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from ..data_objects import TrajectoryData, AgentData, DimensionData
+from ..constants import DISPLAY_TYPE, VALUES_PER_3D_POINT, SUBPOINT_VALUES_PER_ITEM
+from .filter import Filter
+from .every_nth_timestep_filter import EveryNthTimestepFilter
+from .every_nth_agent_filter import EveryNthAgentFilter
+from .translate_filter import TranslateFilter
+from .multiply_space_filter import MultiplySpaceFilter
+from .multiply_time_filter import MultiplyTimeFilter
+from .transform_spatial_axes_filter import TransformSpatialAxesFilter
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+FUSABLE_FILTERS = (
+    EveryNthTimestepFilter,
+    EveryNthAgentFilter,
+    TranslateFilter,
+    MultiplySpaceFilter,
+    MultiplyTimeFilter,
+    TransformSpatialAxesFilter,
+)
+
+
+class FusedFilter(Filter):
+    filters: List[Filter]
+    mutates_data: bool = False
+
+    def __init__(self, filters: List[Filter]):
+        """
+        This filter applies a list of filters in one pass over the frames.
+        Timestep and agent selections are composed into indices,
+        and spatial transforms are composed into one linear transform
+        plus a translation for each agent type,
+        which gives the same result as applying the filters in order
+
+        Parameters
+        ----------
+        filters : List[Filter]
+            the filters to apply, in order. Only EveryNthTimestepFilter,
+            EveryNthAgentFilter, TranslateFilter, MultiplySpaceFilter,
+            MultiplyTimeFilter, and TransformSpatialAxesFilter can be fused
+        """
+        for f in filters:
+            if not FusedFilter.is_fusable(f):
+                raise ValueError(f"{type(f).__name__} cannot be fused")
+        self.filters = filters
+
+    @staticmethod
+    def is_fusable(f: Filter) -> bool:
+        """
+        Can the filter be applied as part of a FusedFilter?
+        """
+        return type(f) in FUSABLE_FILTERS
+
+    @staticmethod
+    def fuse(filters: List[Filter]) -> List[Filter]:
+        """
+        Replace each run of consecutive fusable filters in the list
+        with a FusedFilter, other filters are left as they are
+        """
+        result = []
+        fusable_run = []
+        for f in filters + [None]:
+            if f is not None and FusedFilter.is_fusable(f):
+                fusable_run.append(f)
+                continue
+            if len(fusable_run) > 1:
+                result.append(FusedFilter(fusable_run))
+            else:
+                result += fusable_run
+            fusable_run = []
+            if f is not None:
+                result.append(f)
+        return result
+
+    @staticmethod
+    def _axes_transform_matrix(f: TransformSpatialAxesFilter) -> np.ndarray:
+        """
+        Get the matrix that remaps the axes like the filter does
+        """
+        return np.array(
+            [
+                f._transform_coordinate(np.eye(VALUES_PER_3D_POINT)[:, d])
+                for d in range(VALUES_PER_3D_POINT)
+            ]
+        ).T
+
+    def _compose_spatial_transforms(self):
+        """
+        Compose the spatial filters into one linear transform
+        and a translation per type (and a default translation)
+        """
+        self._linear = np.eye(VALUES_PER_3D_POINT)
+        self._scale = 1.0
+        self._translation_per_type = {}
+        self._default_translation = np.zeros(VALUES_PER_3D_POINT)
+        for f in self.filters:
+            if isinstance(f, TranslateFilter):
+                for type_name in f.translation_per_type:
+                    if type_name not in self._translation_per_type:
+                        self._translation_per_type[type_name] = np.copy(
+                            self._default_translation
+                        )
+                for type_name in self._translation_per_type:
+                    self._translation_per_type[type_name] = self._translation_per_type[
+                        type_name
+                    ] + f.translation_per_type.get(type_name, f.default_translation)
+                self._default_translation = (
+                    self._default_translation + f.default_translation
+                )
+                continue
+            if isinstance(f, MultiplySpaceFilter):
+                self._scale *= f.multiplier
+                step = f.multiplier * np.eye(VALUES_PER_3D_POINT)
+            elif isinstance(f, TransformSpatialAxesFilter):
+                step = FusedFilter._axes_transform_matrix(f)
+            else:
+                continue
+            self._linear = np.dot(step, self._linear)
+            for type_name in self._translation_per_type:
+                self._translation_per_type[type_name] = np.dot(
+                    step, self._translation_per_type[type_name]
+                )
+            self._default_translation = np.dot(step, self._default_translation)
+
+    def _select_timesteps(self, total_steps: int) -> np.ndarray:
+        """
+        Get the indices of the timesteps to keep
+        """
+        result = np.arange(total_steps)
+        for f in self.filters:
+            if isinstance(f, EveryNthTimestepFilter):
+                if f.n < 2:
+                    raise Exception("N < 2: no timesteps will be filtered")
+                result = result[:: f.n]
+        return result
+
+    def _select_agents(self, type_names: np.ndarray) -> np.ndarray:
+        """
+        Get the indices of the agents to keep in a frame
+        """
+        result = np.arange(type_names.shape[0])
+        for f in self.filters:
+            if not isinstance(f, EveryNthAgentFilter) or result.shape[0] < 1:
+                continue
+            unique_names, type_indices = np.unique(
+                type_names[result], return_inverse=True
+            )
+            # index of each agent among the agents of its type
+            order = np.argsort(type_indices, kind="stable")
+            group_starts = np.searchsorted(type_indices[order], type_indices[order])
+            type_ranks = np.zeros_like(order)
+            type_ranks[order] = np.arange(order.shape[0]) - group_starts
+            inc = np.array(
+                [f.n_per_type.get(str(name), f.default_n) for name in unique_names]
+            )[type_indices]
+            keep = (inc >= 1) & (type_ranks % np.maximum(inc, 1) == 0)
+            result = result[keep]
+        return result
+
+    def _type_translations(self, type_names: np.ndarray) -> np.ndarray:
+        """
+        Get the composed translation for each agent given its type
+        """
+        if not self._translation_per_type:
+            return np.tile(self._default_translation, (type_names.shape[0], 1))
+        unique_names, type_indices = np.unique(type_names, return_inverse=True)
+        translations = np.array(
+            [
+                self._translation_per_type.get(name, self._default_translation)
+                for name in unique_names
+            ]
+        ).reshape(-1, VALUES_PER_3D_POINT)
+        return translations[type_indices.reshape(-1)]
+
+    def _transform_subpoints(
+        self,
+        subpoints: np.ndarray,
+        n_subpoints: np.ndarray,
+        values_per_item: np.ndarray,
+        translations: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Apply the composed transforms to a frame of subpoints
+        """
+        max_subpoints = subpoints.shape[1]
+        for vpi in np.unique(values_per_item):
+            agents = (values_per_item == vpi) & (n_subpoints > 0)
+            if not np.any(agents):
+                continue
+            if vpi < VALUES_PER_3D_POINT:
+                subpoints[agents] *= self._scale
+                continue
+            n_items = max_subpoints // vpi
+            items = subpoints[agents, : n_items * vpi].reshape(-1, n_items, vpi)
+            items[:, :, :VALUES_PER_3D_POINT] = (
+                np.dot(items[:, :, :VALUES_PER_3D_POINT], self._linear.T)
+                + translations[agents][:, np.newaxis, :]
+            )
+            items[:, :, VALUES_PER_3D_POINT:] *= self._scale
+            # values past each agent's subpoints are only scaled
+            is_subpoint = np.arange(n_items * vpi) < n_subpoints[agents][:, np.newaxis]
+            subpoints[agents, : n_items * vpi] = np.where(
+                is_subpoint,
+                items.reshape(-1, n_items * vpi),
+                self._scale * subpoints[agents, : n_items * vpi],
+            )
+            subpoints[agents, n_items * vpi :] *= self._scale
+        return subpoints
+
+    @staticmethod
+    def _display_type_per_type(
+        agent_data: AgentData, time_indices: np.ndarray
+    ) -> Dict[str, DISPLAY_TYPE]:
+        """
+        Get the display type for each agent type at the kept timesteps,
+        adding default DisplayData where needed
+        """
+        _, _, type_names = agent_data._add_default_display_data(time_indices)
+        return {
+            type_name: agent_data.display_data[type_name].display_type
+            for type_name in type_names
+            if type_name in agent_data.display_data
+        }
+
+    @staticmethod
+    def _values_per_item(
+        type_names: np.ndarray, display_types: Dict[str, DISPLAY_TYPE]
+    ) -> np.ndarray:
+        """
+        Get the number of subpoint values per item for each agent's display type,
+        looking up each type name once
+        """
+        unique_names, type_indices = np.unique(type_names, return_inverse=True)
+        return np.array(
+            [
+                SUBPOINT_VALUES_PER_ITEM(display_types[type_name])
+                for type_name in unique_names
+            ],
+            dtype=int,
+        )[type_indices.reshape(-1)]
+
+    def apply(self, data: TrajectoryData) -> TrajectoryData:
+        """
+        Apply all the filters in one pass over the frames
+        """
+        filter_names = ", ".join(type(f).__name__ for f in self.filters)
+        print(f"Filtering: fused [{filter_names}] -------------")
+        self._compose_spatial_transforms()
+        # meta data
+        time_multiplier = 1.0
+        for f in self.filters:
+            if isinstance(f, MultiplySpaceFilter):
+                data.meta_data.box_size = f.multiplier * data.meta_data.box_size
+                data.spatial_units.multiply(1.0 / f.multiplier)
+            elif isinstance(f, TransformSpatialAxesFilter):
+                data.meta_data.box_size = f._transform_coordinate(
+                    data.meta_data.box_size, False
+                )
+            elif isinstance(f, MultiplyTimeFilter):
+                if f.apply_to_plots:
+                    data.plots = f._multiply_plots(data.plots)
+                time_multiplier *= f.multiplier
+        # agent data
+        agent_data = data.agent_data
+        has_subpoints = (
+            agent_data.n_subpoints.size > 0 and int(np.amax(agent_data.n_subpoints)) > 0
+        )
+        time_indices = self._select_timesteps(agent_data.times.size)
+        display_types = (
+            FusedFilter._display_type_per_type(agent_data, time_indices)
+            if has_subpoints
+            else {}
+        )
+        # keep the types as type IDs if they are stored that way
+        use_type_ids = agent_data._types is None and agent_data.type_ids is not None
+        all_type_names = (
+            np.array(agent_data.type_names, dtype=object) if use_type_ids else None
+        )
+        frame_type_ids = []
+        frame_type_names = []
+        frame_agent_indices = []
+        for time_index in time_indices:
+            n_a = int(agent_data.n_agents[time_index])
+            if use_type_ids:
+                type_ids = agent_data.type_ids[time_index, :n_a].astype(int)
+                type_names = all_type_names[type_ids]
+                frame_type_ids.append(type_ids)
+            else:
+                type_names = np.array(agent_data.types[time_index][:n_a], dtype=object)
+            frame_type_names.append(type_names)
+            frame_agent_indices.append(self._select_agents(type_names))
+        new_dimensions = DimensionData(
+            total_steps=time_indices.shape[0],
+            max_agents=max(
+                [agent_indices.shape[0] for agent_indices in frame_agent_indices] + [0]
+            ),
+            max_subpoints=agent_data.get_dimensions().max_subpoints,
+        )
+        ragged_subpoints = agent_data.has_ragged_subpoints()
+        result = AgentData.from_dimensions(
+            new_dimensions,
+            use_type_ids=use_type_ids,
+            ragged_subpoints=ragged_subpoints,
+            dtype=agent_data.get_dtype(),
+        )
+        result.draw_fiber_points = agent_data.draw_fiber_points
+        result.display_data = agent_data.display_data
+        if use_type_ids:
+            result.type_names = list(agent_data.type_names)
+        for new_time_index, time_index in enumerate(time_indices):
+            agent_indices = frame_agent_indices[new_time_index]
+            n_a = agent_indices.shape[0]
+            result.times[new_time_index] = (
+                time_multiplier * agent_data.times[time_index]
+            )
+            result.n_agents[new_time_index] = n_a
+            type_names = frame_type_names[new_time_index][agent_indices]
+            if use_type_ids:
+                result.type_ids[new_time_index, :n_a] = frame_type_ids[new_time_index][
+                    agent_indices
+                ]
+            else:
+                result.types[new_time_index] = type_names.tolist()
+            if n_a < 1:
+                continue
+            result.viz_types[new_time_index, :n_a] = agent_data.viz_types[
+                time_index, agent_indices
+            ]
+            result.unique_ids[new_time_index, :n_a] = agent_data.unique_ids[
+                time_index, agent_indices
+            ]
+            result.rotations[new_time_index, :n_a] = agent_data.rotations[
+                time_index, agent_indices
+            ]
+            result.radii[new_time_index, :n_a] = (
+                self._scale * agent_data.radii[time_index, agent_indices]
+            )
+            translations = self._type_translations(type_names)
+            positions = np.dot(
+                agent_data.positions[time_index, agent_indices], self._linear.T
+            )
+            if not has_subpoints:
+                result.positions[new_time_index, :n_a] = positions + translations
+                continue
+            n_subpoints = agent_data.n_subpoints[time_index, agent_indices].astype(int)
+            values_per_item = FusedFilter._values_per_item(type_names, display_types)
+            # fibers are translated by their subpoints instead of their position,
+            # sphere groups are translated by their position only
+            translate_subpoints = (n_subpoints > 0) & (
+                values_per_item == VALUES_PER_3D_POINT
+            )
+            result.positions[new_time_index, :n_a] = positions + np.where(
+                translate_subpoints[:, np.newaxis], 0.0, translations
+            )
+            # ragged subpoints are transformed padded to this frame's max
+            max_subpoints = (
+                int(np.amax(n_subpoints))
+                if ragged_subpoints
+                else new_dimensions.max_subpoints
+            )
+            subpoints = self._transform_subpoints(
+                agent_data.get_subpoint_values(
+                    time_index,
+                    agent_indices[:, np.newaxis],
+                    np.arange(max_subpoints),
+                ).astype(float),
+                n_subpoints,
+                values_per_item,
+                np.where(translate_subpoints[:, np.newaxis], translations, 0.0),
+            )
+            if ragged_subpoints:
+                result.set_frame_subpoints(
+                    new_time_index,
+                    0,
+                    n_subpoints,
+                    subpoints[np.arange(max_subpoints) < n_subpoints[:, np.newaxis]],
+                )
+            else:
+                result.n_subpoints[new_time_index, :n_a] = n_subpoints
+                result.subpoints[new_time_index, :n_a] = subpoints
+        data.agent_data = result
+        print(f"filtered dims = {new_dimensions}")
+        return data
@@ -15,6 +15,7 @@ log = logging.getLogger(__name__)
 
 class MultiplySpaceFilter(Filter):
     multiplier: float
+    mutates_data: bool = False
 
     def __init__(
         self,
@@ -40,6 +41,11 @@ class MultiplySpaceFilter(Filter):
         data.meta_data.box_size = self.multiplier * data.meta_data.box_size
         data.agent_data.positions = self.multiplier * data.agent_data.positions
         data.agent_data.radii = self.multiplier * data.agent_data.radii
-        data.agent_data.subpoints = self.multiplier * data.agent_data.subpoints
+        if data.agent_data.has_ragged_subpoints():
+            data.agent_data.subpoint_values = (
+                self.multiplier * data.agent_data.subpoint_values
+            )
+        else:
+            data.agent_data.subpoints = self.multiplier * data.agent_data.subpoints
         data.spatial_units.multiply(1.0 / self.multiplier)
         return data
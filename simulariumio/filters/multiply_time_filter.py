@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
 import logging
+from typing import Any, Dict, List
 
 import numpy as np
 
@@ -18,6 +20,7 @@ log = logging.getLogger(__name__)
 class MultiplyTimeFilter(Filter):
     multiplier: float
     apply_to_plots: bool
+    mutates_data: bool = False
 
     def __init__(
         self,
@@ -39,6 +42,20 @@ class MultiplyTimeFilter(Filter):
         self.multiplier = multiplier
         self.apply_to_plots = apply_to_plots
 
+    def _multiply_plots(self, plots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get a copy of the plots with time values multiplied
+        """
+        result = []
+        for plot in plots:
+            x_title = plot["layout"]["xaxis"]["title"]
+            if "time" in x_title.lower():
+                plot = copy.deepcopy(plot)
+                for trace in plot["data"]:
+                    trace["x"] = (self.multiplier * np.array(trace["x"])).tolist()
+            result.append(plot)
+        return result
+
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         """
         Multiply time values in the data
@@ -46,13 +63,7 @@ class MultiplyTimeFilter(Filter):
         print(f"Filtering: multiplying time by {self.multiplier} -------------")
         # plot data
         if self.apply_to_plots:
-            for plot in range(len(data.plots)):
-                x_title = data.plots[plot]["layout"]["xaxis"]["title"]
-                if "time" not in x_title.lower():
-                    continue
-                for tr in range(len(data.plots[plot]["data"])):
-                    trace = data.plots[plot]["data"][tr]
-                    trace["x"] = (self.multiplier * np.array(trace["x"])).tolist()
+            data.plots = self._multiply_plots(data.plots)
         # spatial data
         data.agent_data.times = self.multiplier * data.agent_data.times
         return data
@@ -98,7 +98,7 @@ class TransformSpatialAxesFilter(Filter):
                     ] = self._transform_coordinate(
                         sp_items[item_index][:VALUES_PER_3D_POINT]
                     )
-                data.agent_data.subpoints[time_index][agent_index][
-                    :n_sp
-                ] = sp_items.reshape(n_sp)
+                data.agent_data.set_subpoints(
+                    time_index, agent_index, sp_items.reshape(n_sp)
+                )
         return data
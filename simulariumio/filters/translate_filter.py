@@ -85,9 +85,9 @@ class TranslateFilter(Filter):
                         for item_index in range(n_items):
                             sp_items[item_index][:VALUES_PER_3D_POINT] += translation
                         n_sp = int(data.agent_data.n_subpoints[time_index][agent_index])
-                        data.agent_data.subpoints[time_index][agent_index][
-                            :n_sp
-                        ] = sp_items.reshape(n_sp)
+                        data.agent_data.set_subpoints(
+                            time_index, agent_index, sp_items.reshape(n_sp)
+                        )
                 if not translate_subpoints:
                     # translate agent position for non-fibers
                     data.agent_data.positions[time_index][agent_index] += translation
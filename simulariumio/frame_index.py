@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Tuple
+
+import numpy as np
+
+from .data_objects import InputFileData
+from .data_objects.input_file_data import READ_BLOCK_N_BYTES
+from .instrumentation import instrument_stage
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+def _get_contents_bytes(input_file: InputFileData) -> bytes:
+    """
+    Get the file_contents of the input file encoded as bytes,
+    or None if it should be read from its file_path
+    """
+    if not input_file.file_contents:
+        return None
+    if isinstance(input_file.file_contents, bytes):
+        return input_file.file_contents
+    return input_file.file_contents.encode("utf-8")
+
+
+def _iter_blocks(
+    file_path: str, contents: bytes, block_n_bytes: int
+) -> Iterator[bytes]:
+    """
+    Yield the bytes of the contents, or of the file if there are none,
+    in blocks of block_n_bytes
+    """
+    if contents is not None:
+        for start in range(0, len(contents), block_n_bytes):
+            yield contents[start : start + block_n_bytes]
+        return
+    with open(file_path, "rb") as open_file:
+        while True:
+            block = open_file.read(block_n_bytes)
+            if not block:
+                return
+            yield block
+
+
+def _iter_frame_chunks(
+    file_path: str,
+    contents: bytes,
+    frame_start_pattern: re.Pattern,
+    separator_at_start: bool,
+    block_n_bytes: int,
+    keep_bytes: bool,
+) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Scan a text file once for the start of each frame,
+    where each match of the pattern ends.
+    Yield the start and end offset in bytes of the header before
+    the first frame, then of each frame, and their bytes if keep_bytes
+    """
+    chunks = []
+    chunk_start = 0
+    offset = 0
+    # the end of the lines scanned so far, so matches can look back at them,
+    # the file is matched as if it started after a line break
+    tail = b"\n\n" if separator_at_start else b"\n"
+    remainder = b""
+    blocks = _iter_blocks(file_path, contents, block_n_bytes)
+    at_end = False
+    while not at_end:
+        block = next(blocks, None)
+        if block is None:
+            at_end = True
+            lines = remainder
+        else:
+            # only scan complete lines, the rest is added to the next block
+            block = remainder + block
+            end = block.rfind(b"\n") + 1
+            lines = block[:end]
+            remainder = block[end:]
+        text = tail + lines
+        position = 0
+        for match in frame_start_pattern.finditer(text):
+            start = offset - len(tail) + match.end()
+            if start < offset:
+                # this frame start was found in the previous lines
+                continue
+            end = start - offset
+            if keep_bytes:
+                chunks.append(lines[position:end])
+            yield chunk_start, start, b"".join(chunks) if keep_bytes else None
+            chunks = []
+            chunk_start = start
+            position = end
+        if keep_bytes:
+            chunks.append(lines[position:])
+        offset += len(lines)
+        tail = text[max(text.rfind(b"\n", 0, len(text) - 1), 0) :]
+    yield chunk_start, offset, b"".join(chunks) if keep_bytes else None
+
+
+def _decode_lines(data: bytes) -> List[str]:
+    """
+    Decode bytes of a text file and split them into lines
+    """
+    return InputFileData._split_lines(data.decode("utf-8"))
+
+
+def _parse_frame_batch(
+    file_path: str,
+    contents: bytes,
+    contents_offset: int,
+    frame_ranges: List[Tuple[int, int]],
+    parse_frame: Callable[[List[str], Any], Any],
+    context: Any,
+) -> List[Any]:
+    """
+    Read and parse each frame in a worker process,
+    from the file or from the contents starting at contents_offset
+    """
+    result = []
+    if contents is not None:
+        for start, end in frame_ranges:
+            data = contents[start - contents_offset : end - contents_offset]
+            result.append(parse_frame(_decode_lines(data), context))
+        return result
+    with open(file_path, "rb") as open_file:
+        for start, end in frame_ranges:
+            open_file.seek(start)
+            data = open_file.read(end - start)
+            result.append(parse_frame(_decode_lines(data), context))
+    return result
+
+
+class FrameIndex:
+    frame_starts: np.ndarray
+    n_bytes: int
+
+    def __init__(self, frame_starts: np.ndarray, n_bytes: int):
+        """
+        This object holds where each frame starts in a text file
+        with frame delimiters, so the frames can be read
+        and parsed independently
+
+        Parameters
+        ----------
+        frame_starts: np.ndarray
+            the offset in bytes of the start of each frame,
+            anything before the first frame is the header
+        n_bytes: int
+            the size of the file in bytes
+        """
+        self.frame_starts = frame_starts
+        self.n_bytes = n_bytes
+
+    @classmethod
+    def from_file(
+        cls,
+        input_file: InputFileData,
+        frame_start_pattern: bytes,
+        separator_at_start: bool = False,
+        block_n_bytes: int = READ_BLOCK_N_BYTES,
+    ):
+        """
+        Scan a text file once to find the offset of each frame
+
+        Parameters
+        ----------
+        input_file: InputFileData
+            the file to index
+        frame_start_pattern: bytes
+            a regular expression, each frame starts where a match of it ends.
+            Matching the line break before the frame's first line,
+            e.g. rb"\\n(?=% frame)", is much faster than using "^"
+        separator_at_start: bool (optional)
+            match as if there was an empty line before the file,
+            e.g. when frames are separated by empty lines
+            Default: False
+        block_n_bytes: int (optional)
+            how much of the file to scan at a time
+            Default: READ_BLOCK_N_BYTES
+        """
+        frame_starts = []
+        n_bytes = 0
+        with instrument_stage("frame_indexing") as stage:
+            for start, end, _ in _iter_frame_chunks(
+                input_file.file_path,
+                _get_contents_bytes(input_file),
+                re.compile(frame_start_pattern),
+                separator_at_start,
+                block_n_bytes,
+                keep_bytes=False,
+            ):
+                frame_starts.append(start)
+                n_bytes = end
+            stage.n_frames = len(frame_starts) - 1
+        # the first chunk is the header
+        return cls(np.array(frame_starts[1:], dtype=np.int64), n_bytes)
+
+    @property
+    def n_frames(self) -> int:
+        return self.frame_starts.shape[0]
+
+    def header_range(self) -> Tuple[int, int]:
+        """
+        Get the start and end offset of the header before the first frame
+        """
+        return 0, int(self.frame_starts[0]) if self.n_frames > 0 else self.n_bytes
+
+    def frame_range(self, frame_index: int) -> Tuple[int, int]:
+        """
+        Get the start and end offset of a frame
+        """
+        return (
+            int(self.frame_starts[frame_index]),
+            (
+                int(self.frame_starts[frame_index + 1])
+                if frame_index + 1 < self.n_frames
+                else self.n_bytes
+            ),
+        )
+
+    def batches(self, max_batch_n_bytes: int) -> List[List[Tuple[int, int]]]:
+        """
+        Group the frame ranges into batches of consecutive frames
+        of up to max_batch_n_bytes, or one frame if it is bigger
+        """
+        result = []
+        batch = []
+        batch_n_bytes = 0
+        for frame_index in range(self.n_frames):
+            start, end = self.frame_range(frame_index)
+            if batch and batch_n_bytes + end - start > max_batch_n_bytes:
+                result.append(batch)
+                batch = []
+                batch_n_bytes = 0
+            batch.append((start, end))
+            batch_n_bytes += end - start
+        if batch:
+            result.append(batch)
+        return result
+
+
+def parse_frames(
+    input_file: InputFileData,
+    frame_start_pattern: bytes,
+    parse_frame: Callable[[List[str], Any], Any],
+    context: Any = None,
+    workers: int = 1,
+    separator_at_start: bool = False,
+    include_header: bool = False,
+    progress_callback: Callable[[float], None] = None,
+    block_n_bytes: int = READ_BLOCK_N_BYTES,
+) -> Iterator[Any]:
+    """
+    Parse each frame of a text file with frame delimiters
+    and yield the results in order.
+
+    With one worker, the file is read once in blocks and each frame is parsed
+    as soon as it is complete. With more, the file is first scanned to index
+    the frames, then batches of frames are read and parsed in a pool
+    of worker processes, so parse_frame and context must be picklable
+
+    Parameters
+    ----------
+    input_file: InputFileData
+        the file to parse
+    frame_start_pattern: bytes
+        a regular expression, each frame starts where a match of it ends.
+        Matching the line break before the frame's first line,
+        e.g. rb"\\n(?=% frame)", is much faster than using "^"
+    parse_frame: Callable[[List[str], Any], Any]
+        function called with the lines of each frame and the context,
+        returning the parsed frame
+    context: Any (optional)
+        passed to parse_frame, e.g. the scale factor
+        Default: None
+    workers: int (optional)
+        how many processes to parse frames in
+        Default: 1
+    separator_at_start: bool (optional)
+        match as if there was an empty line before the file,
+        e.g. when frames are separated by empty lines
+        Default: False
+    include_header: bool (optional)
+        also parse the lines before the first frame
+        and yield the result first?
+        Default: False
+    progress_callback: Callable[[float], None] (optional)
+        called with the fraction of the file parsed after each frame
+        Default: None
+    block_n_bytes: int (optional)
+        how much of the file to read at a time,
+        and the max size of each batch of frames for the workers
+        Default: READ_BLOCK_N_BYTES
+    """
+    file_path = input_file.file_path
+    contents = _get_contents_bytes(input_file)
+    n_bytes = max(
+        len(contents) if contents is not None else os.path.getsize(file_path), 1
+    )
+    pattern = re.compile(frame_start_pattern)
+    if workers <= 1:
+        chunks = _iter_frame_chunks(
+            file_path, contents, pattern, separator_at_start, block_n_bytes, True
+        )
+        for chunk_index, (_, end, data) in enumerate(chunks):
+            if chunk_index > 0 or include_header:
+                yield parse_frame(_decode_lines(data), context)
+            if chunk_index > 0 and progress_callback is not None:
+                progress_callback(end / n_bytes)
+        return
+    frame_index = FrameIndex.from_file(
+        input_file, frame_start_pattern, separator_at_start, block_n_bytes
+    )
+    if include_header:
+        start, end = frame_index.header_range()
+        yield _parse_frame_batch(
+            file_path, contents, 0, [(start, end)], parse_frame, context
+        )[0]
+    # a few batches for each worker to balance the load
+    batches = frame_index.batches(
+        min(block_n_bytes, max(frame_index.n_bytes // (4 * workers), 1))
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a few batches in flight for each worker
+        futures = deque()
+        for batch_index, batch in enumerate(batches):
+            batch_start, batch_end = batch[0][0], batch[-1][1]
+            future = executor.submit(
+                _parse_frame_batch,
+                file_path,
+                contents[batch_start:batch_end] if contents is not None else None,
+                batch_start,
+                batch,
+                parse_frame,
+                context,
+            )
+            futures.append((batch_end, future))
+            while futures and (
+                len(futures) > 2 * workers or batch_index == len(batches) - 1
+            ):
+                batch_end, future = futures.popleft()
+                yield from future.result()
+                if progress_callback is not None:
+                    progress_callback(batch_end / n_bytes)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import logging
+import time
+import tracemalloc
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# the Instrumentation measuring stages in the current context, if any
+_active_instrumentation: ContextVar = ContextVar(
+    "simulariumio_instrumentation", default=None
+)
+
+
+class StageMetrics:
+    name: str
+    details: Dict[str, Any]
+    n_frames: int
+    start_time: float
+    wall_time: float
+    cpu_time: float
+    peak_allocated_bytes: int
+
+    def __init__(
+        self,
+        name: str,
+        n_frames: int = None,
+        details: Dict[str, Any] = None,
+    ):
+        """
+        This object contains measurements of one stage
+        of reading, filtering, or writing simularium data
+
+        Parameters
+        ----------
+        name: str
+            the stage, e.g. "parse", "filter", or "frame_packing"
+        n_frames: int (optional)
+            the number of frames processed in the stage
+            Default: None
+        details: Dict[str, Any] (optional)
+            more info about the stage, e.g. the class of a filter
+            Default: {}
+        """
+        self.name = name
+        self.n_frames = n_frames
+        self.details = details if details is not None else {}
+        self.start_time = time.time()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_allocated_bytes = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the measurements as a dict, e.g. to save as JSON
+        """
+        return {
+            "name": self.name,
+            "details": dict(self.details),
+            "n_frames": self.n_frames,
+            "start_time": self.start_time,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_allocated_bytes": self.peak_allocated_bytes,
+        }
+
+    def __str__(self) -> str:
+        details = "".join(f" {key}={value}" for key, value in self.details.items())
+        result = (
+            f"{self.name}{details}: {self.wall_time:.3f}s wall, "
+            f"{self.cpu_time:.3f}s CPU"
+        )
+        if self.n_frames is not None:
+            result += f", {self.n_frames} frames"
+        if self.peak_allocated_bytes is not None:
+            result += f", {self.peak_allocated_bytes / 1e6:.1f} MB peak allocated"
+        return result
+
+
+def log_stage(event: str, metrics: StageMetrics) -> None:
+    """
+    The default sink, logs the start of each stage at DEBUG level
+    and its measurements at INFO level
+    """
+    if event == Instrumentation.STAGE_START:
+        log.debug(f"Started {metrics.name}")
+    else:
+        log.info(str(metrics))
+
+
+class _Interval:
+    __slots__ = ["metrics", "wall_start", "cpu_start", "bytes_start", "peak_bytes"]
+
+    def __init__(self, metrics: StageMetrics):
+        """
+        One measured span of a stage
+        """
+        self.metrics = metrics
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.bytes_start = 0
+        self.peak_bytes = 0
+
+
+class Instrumentation:
+    STAGE_START: str = "start"
+    STAGE_END: str = "end"
+
+    sink: Callable[[str, StageMetrics], None]
+    trace_memory: bool
+    stages: List[StageMetrics]
+
+    def __init__(
+        self,
+        sink: Callable[[str, StageMetrics], None] = None,
+        trace_memory: bool = False,
+    ):
+        """
+        This object measures each stage of reading, filtering,
+        and writing simularium data run inside it, e.g.
+
+            with Instrumentation():
+                converter = SmoldynConverter(smoldyn_data)
+                converter.save("output")
+
+        The stages are "parse" in the converters, "dimension_prescan"
+        in the PhysiCell and cellPACK converters,
+        "frame_indexing" when text formats are parsed with more than one worker,
+        "filter" for each filter, "type_mapping", "validation",
+        and "frame_packing" and "file_io" in the writers.
+        The sink is called with STAGE_START when each stage starts,
+        and with STAGE_END and the measurements when it ends.
+
+        Parameters
+        ----------
+        sink: Callable[[str, StageMetrics], None] (optional)
+            function called with the event ("start" or "end")
+            and the StageMetrics for each stage
+            Default: log_stage, which logs with the logging module
+        trace_memory: bool (optional)
+            also measure the peak bytes allocated in each stage
+            with tracemalloc? This slows down the stages
+            Default: False
+        """
+        self.sink = sink if sink is not None else log_stage
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._intervals = []
+        self._started_tracing = False
+        self._token = None
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active_instrumentation.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_instrumentation.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _is_tracing(self) -> bool:
+        return self.trace_memory and tracemalloc.is_tracing()
+
+    def _start_stage(self, metrics: StageMetrics):
+        metrics.start_time = time.time()
+        self.sink(Instrumentation.STAGE_START, metrics)
+
+    def _end_stage(self, metrics: StageMetrics):
+        self.stages.append(metrics)
+        self.sink(Instrumentation.STAGE_END, metrics)
+
+    def _start_interval(self, metrics: StageMetrics):
+        """
+        Start measuring a span of the stage,
+        spans can be nested in the spans of other stages
+        """
+        interval = _Interval(metrics)
+        if self._is_tracing():
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            # keep the peak so far for the outer spans before resetting it
+            for outer_interval in self._intervals:
+                outer_interval.peak_bytes = max(outer_interval.peak_bytes, peak_bytes)
+            tracemalloc.reset_peak()
+            interval.bytes_start = current_bytes
+            interval.peak_bytes = current_bytes
+        self._intervals.append(interval)
+
+    def _end_interval(self):
+        """
+        Stop measuring the innermost span
+        and add its measurements to its stage
+        """
+        interval = self._intervals.pop()
+        metrics = interval.metrics
+        metrics.wall_time += time.perf_counter() - interval.wall_start
+        metrics.cpu_time += time.process_time() - interval.cpu_start
+        if self._is_tracing():
+            peak_bytes = max(interval.peak_bytes, tracemalloc.get_traced_memory()[1])
+            metrics.peak_allocated_bytes = max(
+                metrics.peak_allocated_bytes or 0, peak_bytes - interval.bytes_start
+            )
+            for outer_interval in self._intervals:
+                outer_interval.peak_bytes = max(outer_interval.peak_bytes, peak_bytes)
+
+
+@contextlib.contextmanager
+def instrument_stage(
+    name: str, n_frames: int = None, **details: Any
+) -> Iterator[StageMetrics]:
+    """
+    Measure the code run inside as one stage
+    if there is an active Instrumentation.
+    Yield the StageMetrics so n_frames or details can be set
+    once they are known
+    """
+    metrics = StageMetrics(name, n_frames, details)
+    instrumentation = _active_instrumentation.get()
+    if instrumentation is None:
+        yield metrics
+        return
+    instrumentation._start_stage(metrics)
+    instrumentation._start_interval(metrics)
+    try:
+        yield metrics
+    finally:
+        instrumentation._end_interval()
+        instrumentation._end_stage(metrics)
+
+
+class AccumulatedStage:
+    metrics: StageMetrics
+
+    def __init__(self, name: str, n_frames: int = None, **details: Any):
+        """
+        This object measures a stage that runs in many short spans
+        interleaved with other stages, e.g. packing each frame
+        between writing frames to a file, if there is an active Instrumentation.
+        The spans are measured with measure() or iterate()
+        inside a with block for the whole stage
+        """
+        self.metrics = StageMetrics(name, n_frames, details)
+        self._instrumentation = _active_instrumentation.get()
+
+    def __enter__(self):
+        if self._instrumentation is not None:
+            self._instrumentation._start_stage(self.metrics)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._instrumentation is not None:
+            self._instrumentation._end_stage(self.metrics)
+
+    @contextlib.contextmanager
+    def _measure(self) -> Iterator[None]:
+        self._instrumentation._start_interval(self.metrics)
+        try:
+            yield
+        finally:
+            self._instrumentation._end_interval()
+
+    def measure(self) -> contextlib.AbstractContextManager:
+        """
+        Measure the code run inside as one span of the stage
+        """
+        if self._instrumentation is None:
+            return contextlib.nullcontext()
+        return self._measure()
+
+    def iterate(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Yield each item, measuring the time to get each one
+        as a span of the stage, e.g. for a generator that packs frames
+        """
+        if self._instrumentation is None:
+            yield from items
+            return
+        iterator = iter(items)
+        while True:
+            with self._measure():
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
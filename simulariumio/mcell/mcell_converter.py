@@ -7,7 +7,6 @@ import json
 import os
 import array
 import numpy as np
-import scipy.linalg as linalg
 from scipy.spatial.transform import Rotation
 
 from ..trajectory_converter import TrajectoryConverter
@@ -60,62 +59,75 @@ class McellConverter(TrajectoryConverter):
             Default: 10
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
     def _normalize(v: np.ndarray) -> np.ndarray:
         """
-        normalize a vector
+        normalize a vector, or each vector in an array of shape (..., 3)
         """
-        return v / np.linalg.norm(v)
+        return v / np.linalg.norm(v, axis=-1, keepdims=True)
 
     @staticmethod
-    def _rotate(v: np.ndarray, axis: np.ndarray, angle: float) -> np.ndarray:
+    def _rotate(v: np.ndarray, axis: np.ndarray, angle: np.ndarray) -> np.ndarray:
         """
-        rotate a vector around axis by angle (radians)
+        rotate each vector around each axis by each angle (radians)
+        with Rodrigues' rotation formula
         """
-        rotation = linalg.expm(
-            np.cross(
-                np.eye(VALUES_PER_3D_POINT), McellConverter._normalize(axis) * angle
-            )
+        axis = McellConverter._normalize(axis)
+        angle = np.asarray(angle)[..., np.newaxis]
+        cos_angle = np.cos(angle)
+        return (
+            v * cos_angle
+            + np.cross(axis, v) * np.sin(angle)
+            + axis * np.sum(axis * v, axis=-1, keepdims=True) * (1.0 - cos_angle)
         )
-        return np.dot(rotation, np.copy(v))
 
     @staticmethod
-    def _get_perpendicular_vector(v: np.ndarray, angle: float) -> np.ndarray:
+    def _get_perpendicular_vector(v: np.ndarray, angle: np.ndarray) -> np.ndarray:
         """
-        Get a unit vector perpendicular to the given vector
-        rotated by the given angle
+        Get a unit vector perpendicular to each given vector
+        rotated by each given angle
         """
-        if v[0] == 0 and v[1] == 0:
-            if v[2] == 0:
-                raise ValueError("Cannot calculate perpendicular vector to zero vector")
-            return np.array([0, 1, 0])
-        u = McellConverter._normalize(np.array([-v[1], v[0], 0]))
-        return McellConverter._rotate(u, v, angle)
+        v = np.asarray(v, dtype=float)
+        on_z_axis = (v[..., 0] == 0) & (v[..., 1] == 0)
+        if np.any(on_z_axis & (v[..., 2] == 0)):
+            raise ValueError("Cannot calculate perpendicular vector to zero vector")
+        # vectors on the z axis get a placeholder here and [0, 1, 0] below
+        u = McellConverter._normalize(
+            np.stack([-v[..., 1], v[..., 0], on_z_axis.astype(float)], axis=-1)
+        )
+        return np.where(
+            on_z_axis[..., np.newaxis],
+            np.array([0.0, 1.0, 0.0]),
+            McellConverter._rotate(u, v, angle),
+        )
 
     @staticmethod
     def _get_rotation_matrix(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
         """
-        Orthonormalize and cross the vectors to get a rotation matrix
+        Orthonormalize and cross the vectors to get a rotation matrix,
+        or an array of shape (..., 3, 3) for arrays of vectors
         """
         v1 = McellConverter._normalize(v1)
         v2 = McellConverter._normalize(v2)
-        v2 = McellConverter._normalize(v2 - (np.dot(v1, v2) / np.dot(v1, v1)) * v1)
-        v3 = np.cross(v2, v1)
-        return np.array(
-            [
-                np.array([v2[0], v1[0], v3[0]]),
-                np.array([v2[1], v1[1], v3[1]]),
-                np.array([v2[2], v1[2], v3[2]]),
-            ]
+        v2 = McellConverter._normalize(
+            v2
+            - (
+                np.sum(v1 * v2, axis=-1, keepdims=True)
+                / np.sum(v1 * v1, axis=-1, keepdims=True)
+            )
+            * v1
         )
+        v3 = np.cross(v2, v1)
+        return np.stack([v2, v1, v3], axis=-1)
 
     @staticmethod
-    def _get_euler_angles(normal: np.ndarray, angle: float) -> np.ndarray:
+    def _get_euler_angles(normal: np.ndarray, angle: np.ndarray) -> np.ndarray:
         """
         Get euler angles in degrees representing a rotation defined by the basis
-        between the given normal and a perpendicular vector rotated at angle
+        between the given normal and a perpendicular vector rotated at angle,
+        or an array of shape (N, 3) for N normals and angles
         """
         perpendicular = McellConverter._get_perpendicular_vector(normal, angle)
         rotation = McellConverter._get_rotation_matrix(normal, perpendicular)
@@ -132,10 +144,10 @@ class McellConverter(TrajectoryConverter):
         if angle is None:
             angles = np.rad2deg(2 * np.pi) * np.random.random(normals.shape[0])
         else:
-            angles = np.array(normals.shape[0] * [angle])
-        return np.array(
-            [McellConverter._get_euler_angles(n, a) for n, a in zip(normals, angles)]
-        )
+            angles = np.full(normals.shape[0], angle)
+        if normals.shape[0] < 1:
+            return np.zeros((0, VALUES_PER_3D_POINT))
+        return McellConverter._get_euler_angles(normals, angles)
 
     @staticmethod
     def _should_read_cellblender_binary_file(
@@ -314,7 +326,7 @@ class McellConverter(TrajectoryConverter):
         except Exception as e:
             raise InputDataError(f"Error reading Mcell binary files: {e}")
 
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(dimensions, dtype=input_data.dtype)
         # get metadata for each agent type
         molecule_info = {}
         total_steps = 0
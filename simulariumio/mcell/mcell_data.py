@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import MetaData, DisplayData
 
 ###############################################################################
@@ -21,6 +23,7 @@ class McellData:
     display_data: Dict[str, DisplayData]
     surface_mol_rotation_angle: float
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -31,6 +34,7 @@ class McellData:
         display_data: Dict[str, DisplayData] = None,
         surface_mol_rotation_angle: float = None,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -66,6 +70,11 @@ class McellData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.path_to_data_model_json = path_to_data_model_json
         self.path_to_binary_files = path_to_binary_files
@@ -74,3 +83,4 @@ class McellData:
         self.display_data = display_data if display_data is not None else {}
         self.surface_mol_rotation_angle = surface_mol_rotation_angle
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
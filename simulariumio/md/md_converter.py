@@ -3,7 +3,7 @@
 
 import logging
 import copy
-from typing import Set, Callable
+from typing import Iterable, Callable
 
 import numpy as np
 import pandas as pd
@@ -51,7 +51,7 @@ class MdConverter(TrajectoryConverter):
             Default: 10
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
     def _read_universe_dimensions(
@@ -59,18 +59,14 @@ class MdConverter(TrajectoryConverter):
     ) -> DimensionData:
         """
         Use a MD Universe to get the number of timesteps
-        and maximum agents per timestep
+        and the number of atoms, without reading the frames
         """
-        result = DimensionData(
-            total_steps=0,
-            max_agents=0,
+        return DimensionData(
+            total_steps=len(
+                input_data.md_universe.trajectory[:: input_data.nth_timestep_to_read]
+            ),
+            max_agents=input_data.md_universe.atoms.n_atoms,
         )
-        for ts in input_data.md_universe.trajectory[:: input_data.nth_timestep_to_read]:
-            result.total_steps += 1
-            n_agents = input_data.md_universe.atoms.positions.shape[0]
-            if n_agents > result.max_agents:
-                result.max_agents = n_agents
-        return result
 
     @staticmethod
     def _get_type_name(raw_type_name: str, input_data: MdData) -> float:
@@ -147,7 +143,7 @@ class MdConverter(TrajectoryConverter):
 
     @staticmethod
     def _get_display_data_mapping(
-        unique_raw_type_names: Set[str], input_data: MdData
+        unique_raw_type_names: Iterable[str], input_data: MdData
     ) -> DisplayData:
         """
         Get display names mapped to display data (geometry and color)
@@ -166,37 +162,43 @@ class MdConverter(TrajectoryConverter):
         Use a MD Universe to get AgentData
         """
         dimensions = MdConverter._read_universe_dimensions(input_data)
-        result = AgentData.from_dimensions(dimensions)
-        get_type_name_func = np.frompyfunc(MdConverter._get_type_name, 2, 1)
-        unique_raw_type_names = set([])
-        time_index = 0
-
-        for frame in input_data.md_universe.trajectory[
-            :: input_data.nth_timestep_to_read
-        ]:
+        result = AgentData.from_dimensions(
+            dimensions, use_type_ids=True, dtype=input_data.dtype
+        )
+        scale_factor = input_data.meta_data.scale_factor
+        # the topology is the same in every frame,
+        # so get the type and radius for each atom name once
+        raw_type_names, atom_name_indices = np.unique(
+            input_data.md_universe.atoms.names, return_inverse=True
+        )
+        type_ids = np.array(
+            [
+                result.get_type_id(MdConverter._get_type_name(name, input_data))
+                for name in raw_type_names
+            ],
+            dtype=int,
+        )
+        radii = np.array(
+            [MdConverter._get_radius(name, input_data) for name in raw_type_names]
+        )
+        result.n_agents[:] = dimensions.max_agents
+        result.unique_ids[:] = np.arange(dimensions.max_agents)
+        result.type_ids[:] = type_ids[atom_name_indices]
+        result.radii[:] = scale_factor * radii[atom_name_indices]
+        for time_index, frame in enumerate(
+            input_data.md_universe.trajectory[:: input_data.nth_timestep_to_read]
+        ):
             result.times[time_index] = input_data.md_universe.trajectory.time
-            atom_positions = input_data.md_universe.atoms.positions
-            result.n_agents[time_index] = atom_positions.shape[0]
-            result.unique_ids[time_index] = np.arange(atom_positions.shape[0])
-            unique_raw_type_names.update(list(input_data.md_universe.atoms.names))
-            result.types[time_index] = get_type_name_func(
-                input_data.md_universe.atoms.names, input_data
-            )
-            result.positions[time_index] = (
-                input_data.meta_data.scale_factor * atom_positions
-            )
-            result.radii[time_index] = input_data.meta_data.scale_factor * np.array(
-                [
-                    MdConverter._get_radius(type_name, input_data)
-                    for type_name in input_data.md_universe.atoms.names
-                ]
+            np.multiply(
+                input_data.md_universe.atoms.positions,
+                scale_factor,
+                out=result.positions[time_index],
             )
-            time_index += 1
-            self.check_report_progress(time_index / dimensions.total_steps)
+            self.check_report_progress((time_index + 1) / dimensions.total_steps)
 
         result.n_timesteps = dimensions.total_steps
         result.display_data = MdConverter._get_display_data_mapping(
-            unique_raw_type_names, input_data
+            raw_type_names, input_data
         )
         return result
 
@@ -4,6 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
 from MDAnalysis import Universe
 
 from ..data_objects import MetaData, UnitData, DisplayData
@@ -23,6 +24,7 @@ class MdData:
     time_units: UnitData
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -33,6 +35,7 @@ class MdData:
         time_units: UnitData = None,
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -69,6 +72,11 @@ class MdData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.md_universe = md_universe
         self.nth_timestep_to_read = nth_timestep_to_read
@@ -79,3 +87,4 @@ class MdData:
             spatial_units if spatial_units is not None else UnitData("m")
         )
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
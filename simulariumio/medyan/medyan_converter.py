@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import List, Callable
-import math
+from typing import List, Tuple, Callable
+import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
+from ..frame_index import parse_frames
 from ..data_objects import (
     TrajectoryData,
     AgentData,
@@ -28,6 +29,11 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# snapshots are separated by empty lines
+FRAME_START_PATTERN = rb"\n\r?\n(?=[^\r\n])"
+
+###############################################################################
+
 
 class MedyanConverter(TrajectoryConverter):
     def __init__(
@@ -35,6 +41,7 @@ class MedyanConverter(TrajectoryConverter):
         input_data: MedyanData,
         progress_callback: Callable[[float], None] = None,
         callback_interval: float = 10,
+        workers: int = 1,
     ):
         """
         This object reads simulation trajectory outputs
@@ -56,9 +63,15 @@ class MedyanConverter(TrajectoryConverter):
             If a progress_callback was provided, the period between updates
             to be sent to the callback, in seconds
             Default: 10
+        workers : int (optional)
+            How many processes to parse the frames in,
+            with more than one the file is indexed first
+            and each process reads and parses batches of frames
+            Default: 1
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self.workers = workers
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
     def _draw_endpoints(line: str, object_type: str, input_data: MedyanData) -> bool:
@@ -94,29 +107,22 @@ class MedyanConverter(TrajectoryConverter):
             return input_data.display_data[object_type][raw_tid].name
 
     @staticmethod
-    def _parse_data_dimensions(
-        lines: List[str], input_data: MedyanData
-    ) -> DimensionData:
+    def _parse_frame(
+        lines: List[str], scale_factor: float
+    ) -> Tuple[float, int, List[Tuple[str, str, int, int, np.ndarray]]]:
         """
-        Parse a MEDYAN snapshot.traj output file to get the max numbers
-        of subpoints per agent and agents per timestep, and number of timesteps
+        Parse the lines of one snapshot of a MEDYAN snapshot.traj output file,
+        return the time, the number of objects in the snapshot's first line,
+        and for each object its type ("filament", "linker", or "motor"),
+        its first line, raw unique ID, raw type ID, and subpoints
         """
-        result = DimensionData(0, 0)
-        agents = 0
-        at_frame_start = True
+        cols = lines[0].split()
+        time = float(cols[1])
+        n_objects = int(cols[2]) + int(cols[3]) + int(cols[4])
+        objects = []
+        parsing_object = False
         for line in lines:
-            if len(line) < 1:
-                at_frame_start = True
-                continue
-            if at_frame_start:
-                # start of timestep
-                cols = line.split()
-                if agents > result.max_agents:
-                    result.max_agents = agents
-                agents = int(cols[2]) + int(cols[3]) + int(cols[4])
-                result.total_steps += 1
-                at_frame_start = False
-            elif "FILAMENT" in line or "LINKER" in line or "MOTOR" in line:
+            if "FILAMENT" in line or "LINKER" in line or "MOTOR" in line:
                 # start of object
                 if "FILAMENT" in line:
                     object_type = "filament"
@@ -124,163 +130,146 @@ class MedyanConverter(TrajectoryConverter):
                     object_type = "linker"
                 else:
                     object_type = "motor"
-                if MedyanConverter._draw_endpoints(line, object_type, input_data):
-                    agents += 2
-                if "FILAMENT" in line:
-                    # start of filament
-                    # filaments N xyz points = 3 * N subpoints
-                    cols = line.split()
-                    subpoints = SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) * int(
-                        cols[3]
-                    )
-                    if result.max_subpoints < subpoints:
-                        result.max_subpoints = subpoints
-                else:
-                    # start of linker or motor
-                    # all linkers and motors have 2 xyz points = 6 subpoints
-                    if result.max_subpoints < 2 * SUBPOINT_VALUES_PER_ITEM(
-                        DISPLAY_TYPE.FIBER
-                    ):
-                        result.max_subpoints = 2 * SUBPOINT_VALUES_PER_ITEM(
-                            DISPLAY_TYPE.FIBER
-                        )
-        if agents > result.max_agents:
-            result.max_agents = agents
-        return result
+                cols = line.split()
+                # filaments have N xyz points = 3 * N subpoints,
+                # all linkers and motors have 2 xyz points = 6 subpoints
+                n_subpoints = SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) * (
+                    int(cols[3]) if object_type == "filament" else 2
+                )
+                objects.append(
+                    [object_type, line, int(cols[1]), int(cols[2]), n_subpoints]
+                )
+                parsing_object = True
+            elif parsing_object:
+                # object coordinates
+                coordinates = scale_factor * np.array(line.split(), dtype=float)
+                subpoints = np.zeros(objects[-1][4])
+                n_values = min(subpoints.shape[0], coordinates.shape[0])
+                subpoints[:n_values] = coordinates[:n_values]
+                objects[-1][4] = subpoints
+                parsing_object = False
+        if parsing_object:
+            objects[-1][4] = np.zeros(objects[-1][4])
+        return time, n_objects, [tuple(info) for info in objects]
 
     def _get_trajectory_data(
         self,
         input_data: MedyanData,
     ) -> AgentData:
         """
-        Parse a MEDYAN snapshot.traj output file to get agents
+        Parse a MEDYAN snapshot.traj output file to get agents,
+        in parallel if there is more than one worker
         """
-        try:
-            lines = input_data.snapshot_file.get_contents().split("\n")
-            dimensions = MedyanConverter._parse_data_dimensions(lines, input_data)
-        except Exception as e:
-            raise InputDataError(f"Error reading input medyan data: {e}")
-
-        result = AgentData.from_dimensions(dimensions)
-        time_index = -1
-        at_frame_start = True
-        parsing_object = False
+        result = AgentData.from_dimensions(
+            DimensionData(total_steps=0, max_agents=0),
+            use_type_ids=True,
+            ragged_subpoints=True,
+            dtype=input_data.dtype,
+        )
+        scale_factor = input_data.meta_data.scale_factor
         uids = {
             "filament": {},
             "linker": {},
             "motor": {},
         }
         last_uid = 0
-        tids = {
+        # type ID, radius, and whether to draw endpoints
+        # for each object type and raw type ID
+        type_info = {
             "filament": {},
             "linker": {},
             "motor": {},
         }
-        last_tid = 0
-        object_type = ""
-        draw_endpoints = False
-        line_count = 0
-
-        for line in lines:
-            if len(line) < 1:
-                at_frame_start = True
-                continue
-            cols = line.split()
-            if at_frame_start:
-                # start of timestep
-                time_index += 1
-                agent_index = 0
-                result.times[time_index] = float(cols[1])
-                result.n_agents[time_index] = int(cols[2]) + int(cols[3]) + int(cols[4])
-                at_frame_start = False
-            if "FILAMENT" in line or "LINKER" in line or "MOTOR" in line:
-                # start of object
-                result.viz_types[time_index][agent_index] = VIZ_TYPE.FIBER
-                if "FILAMENT" in line:
-                    object_type = "filament"
-                elif "LINKER" in line:
-                    object_type = "linker"
-                else:
-                    object_type = "motor"
-                draw_endpoints = MedyanConverter._draw_endpoints(
-                    line, object_type, input_data
-                )
+        time_index = -1
+        for time_index, frame in enumerate(
+            parse_frames(
+                input_data.snapshot_file,
+                FRAME_START_PATTERN,
+                MedyanConverter._parse_frame,
+                scale_factor,
+                workers=self.workers,
+                separator_at_start=True,
+                progress_callback=self.check_report_progress,
+            )
+        ):
+            time, n_objects, objects = frame
+            viz_types = []
+            unique_ids = []
+            type_ids = []
+            radii = []
+            n_subpoints = []
+            subpoints = []
+            positions = []
+            for object_type, line, raw_uid, raw_tid, object_subpoints in objects:
+                if raw_tid not in type_info[object_type]:
+                    draw_endpoints = MedyanConverter._draw_endpoints(
+                        line, object_type, input_data
+                    )
+                    type_name = MedyanConverter._get_display_type_name(
+                        line, object_type, input_data
+                    )
+                    end_type = type_name + " End"
+                    if draw_endpoints and end_type not in result.display_data:
+                        result.display_data[end_type] = DisplayData(
+                            name=end_type,
+                            display_type=DISPLAY_TYPE.SPHERE,
+                        )
+                    radius = (
+                        input_data.display_data[object_type][raw_tid].radius
+                        if input_data.display_data[object_type][raw_tid].radius
+                        is not None
+                        else 1.0
+                    )
+                    type_info[object_type][raw_tid] = (
+                        result.get_type_id(type_name),
+                        result.get_type_id(end_type) if draw_endpoints else None,
+                        scale_factor * radius,
+                        draw_endpoints,
+                    )
+                type_id, end_type_id, radius, draw_endpoints = type_info[object_type][
+                    raw_tid
+                ]
                 # unique instance ID
-                raw_uid = int(cols[1])
                 if raw_uid not in uids[object_type]:
                     uids[object_type][raw_uid] = last_uid
                     last_uid += 1 if not draw_endpoints else 3
-                result.unique_ids[time_index][agent_index] = uids[object_type][raw_uid]
-                # type ID
-                raw_tid = int(cols[2])
-                if raw_tid not in tids[object_type]:
-                    tids[object_type][raw_tid] = last_tid
-                    last_tid += 1
-                # type name
-                result.types[time_index].append(
-                    MedyanConverter._get_display_type_name(
-                        line, object_type, input_data
-                    )
-                )
-                # radius
-                radius = (
-                    input_data.display_data[object_type][raw_tid].radius
-                    if raw_tid in input_data.display_data[object_type]
-                    and input_data.display_data[object_type][raw_tid].radius is not None
-                    else 1.0
-                )
-                result.radii[time_index][agent_index] = (
-                    input_data.meta_data.scale_factor * radius
-                )
-                if object_type == "filament":
-                    result.n_subpoints[time_index][agent_index] = int(
-                        cols[3]
-                    ) * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
-                else:
-                    result.n_subpoints[time_index][
-                        agent_index
-                    ] = 2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
+                uid = uids[object_type][raw_uid]
+                viz_types.append(VIZ_TYPE.FIBER)
+                unique_ids.append(uid)
+                type_ids.append(type_id)
+                radii.append(radius)
+                n_subpoints.append(object_subpoints.shape[0])
+                subpoints.append(object_subpoints)
+                positions.append(np.zeros(VALUES_PER_3D_POINT))
                 # draw endpoints?
                 if draw_endpoints:
                     for i in range(2):
-                        result.viz_types[time_index][
-                            agent_index + i + 1
-                        ] = VIZ_TYPE.DEFAULT
-                        result.unique_ids[time_index][agent_index + i + 1] = (
-                            uids[object_type][raw_uid] + i + 1
+                        viz_types.append(VIZ_TYPE.DEFAULT)
+                        unique_ids.append(uid + i + 1)
+                        type_ids.append(end_type_id)
+                        radii.append(2 * radius)
+                        n_subpoints.append(0)
+                        positions.append(
+                            object_subpoints[
+                                i * VALUES_PER_3D_POINT : (i + 1) * VALUES_PER_3D_POINT
+                            ]
                         )
-                        end_type = result.types[time_index][agent_index] + " End"
-                        result.types[time_index].append(end_type)
-                        if end_type not in result.display_data:
-                            result.display_data[end_type] = DisplayData(
-                                name=end_type,
-                                display_type=DISPLAY_TYPE.SPHERE,
-                            )
-                        result.radii[time_index][agent_index + i + 1] = (
-                            2 * input_data.meta_data.scale_factor * radius
-                        )
-                parsing_object = True
-            elif parsing_object:
-                # object coordinates
-                for i in range(len(cols)):
-                    result.subpoints[time_index][agent_index][
-                        i
-                    ] = input_data.meta_data.scale_factor * float(cols[i])
-                    if draw_endpoints:
-                        endpoint_index = math.floor(i / float(VALUES_PER_3D_POINT))
-                        dim_index = i % VALUES_PER_3D_POINT
-                        result.positions[time_index][agent_index + endpoint_index + 1][
-                            dim_index
-                        ] = input_data.meta_data.scale_factor * float(cols[i])
-                parsing_object = False
-                agent_index += 1
-                if draw_endpoints:
-                    agent_index += 2
-                    result.n_agents[time_index] += 2
-            line_count += 1
-            self.check_report_progress(line_count / len(lines))
-
-        result.n_timesteps = time_index + 1
+                    n_objects += 2
+            n_agents = len(unique_ids)
+            result._grow_to_fit(time_index + 1, max(n_objects, n_agents))
+            result.times[time_index] = time
+            result.n_agents[time_index] = n_objects
+            if n_agents < 1:
+                continue
+            result.viz_types[time_index, :n_agents] = viz_types
+            result.unique_ids[time_index, :n_agents] = unique_ids
+            result.type_ids[time_index, :n_agents] = type_ids
+            result.radii[time_index, :n_agents] = radii
+            result.positions[time_index, :n_agents] = np.array(positions)
+            result.set_frame_subpoints(
+                time_index, 0, np.array(n_subpoints), np.concatenate(subpoints)
+            )
+        result._trim_to_fit(time_index + 1)
         return result
 
     def _read(self, input_data: MedyanData) -> TrajectoryData:
@@ -288,7 +277,10 @@ class MedyanConverter(TrajectoryConverter):
         Return an object containing the data shaped for Simularium format
         """
         print("Reading MEDYAN Data -------------")
-        agent_data = self._get_trajectory_data(input_data)
+        try:
+            agent_data = self._get_trajectory_data(input_data)
+        except Exception as e:
+            raise InputDataError(f"Error reading input medyan data: {e}")
         # get display data (geometry and color)
         for object_type in input_data.display_data:
             for tid in input_data.display_data[object_type]:
@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import MetaData, DisplayData, InputFileData
 
 ###############################################################################
@@ -20,6 +22,7 @@ class MedyanData:
     agents_with_endpoints: List[str]
     draw_fiber_points: bool
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -31,6 +34,7 @@ class MedyanData:
         agents_with_endpoints: List[str] = None,
         draw_fiber_points: bool = False,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -78,6 +82,11 @@ class MedyanData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.snapshot_file = snapshot_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
@@ -93,3 +102,4 @@ class MedyanData:
         )
         self.draw_fiber_points = draw_fiber_points
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
@@ -39,6 +39,11 @@ class pyMCDS:
     output_path: str, optional
         String containing the path (relative or absolute) to the directory
         where PhysiCell output files are stored (default= ".")
+    cell_variables: list, optional
+        Names of the only cell variables to read, e.g. ["position_x", "cell_type"].
+        If given, the mesh, voxel and continuum data are skipped
+        and only these rows of the cell matrix are kept (default= None,
+        read everything)
     Attributes
     ----------
     data : dict
@@ -46,8 +51,16 @@ class pyMCDS:
         file and the files referenced therein.
     """
 
-    def __init__(self, xml_file, parse_continuum_variables=True, output_path="."):
-        self.data = self._read_xml(xml_file, output_path, parse_continuum_variables)
+    def __init__(
+        self,
+        xml_file,
+        parse_continuum_variables=True,
+        output_path=".",
+        cell_variables=None,
+    ):
+        self.data = self._read_xml(
+            xml_file, output_path, parse_continuum_variables, cell_variables
+        )
 
     # METADATA RELATED FUNCTIONS
 
@@ -343,9 +356,16 @@ class pyMCDS:
         vox_df = cell_df[inside_voxel]
         return vox_df
 
-    def _read_xml(self, xml_file, output_path=".", parse_continuum_variables=True):
+    def _read_xml(
+        self,
+        xml_file,
+        output_path=".",
+        parse_continuum_variables=True,
+        cell_variables=None,
+    ):
         """
-        Does the actual work of initializing MultiCellDS by parsing the xml
+        Does the actual work of initializing MultiCellDS by parsing the xml,
+        reading only the requested cell variables if cell_variables is given
         """
 
         output_path = Path(output_path)
@@ -376,50 +396,52 @@ class pyMCDS:
         # find the mesh node
         mesh_node = me_node.find("mesh")
         MCDS["metadata"]["spatial_units"] = mesh_node.get("units")
-        MCDS["mesh"] = {}
+        # the mesh isn't needed when only reading some cell variables
+        if cell_variables is None:
+            MCDS["mesh"] = {}
 
-        # while we're at it, find the mesh
-        coord_str = mesh_node.find("x_coordinates").text
-        delimiter = mesh_node.find("x_coordinates").get("delimiter")
-        x_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
+            # while we're at it, find the mesh
+            coord_str = mesh_node.find("x_coordinates").text
+            delimiter = mesh_node.find("x_coordinates").get("delimiter")
+            x_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
 
-        coord_str = mesh_node.find("y_coordinates").text
-        delimiter = mesh_node.find("y_coordinates").get("delimiter")
-        y_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
+            coord_str = mesh_node.find("y_coordinates").text
+            delimiter = mesh_node.find("y_coordinates").get("delimiter")
+            y_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
 
-        coord_str = mesh_node.find("z_coordinates").text
-        delimiter = mesh_node.find("z_coordinates").get("delimiter")
-        z_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
+            coord_str = mesh_node.find("z_coordinates").text
+            delimiter = mesh_node.find("z_coordinates").get("delimiter")
+            z_coords = np.array(coord_str.split(delimiter), dtype=np.float64)
 
-        # reshape into a mesh grid
-        xx, yy, zz = np.meshgrid(x_coords, y_coords, z_coords)
+            # reshape into a mesh grid
+            xx, yy, zz = np.meshgrid(x_coords, y_coords, z_coords)
 
-        MCDS["mesh"]["x_coordinates"] = xx
-        MCDS["mesh"]["y_coordinates"] = yy
-        MCDS["mesh"]["z_coordinates"] = zz
+            MCDS["mesh"]["x_coordinates"] = xx
+            MCDS["mesh"]["y_coordinates"] = yy
+            MCDS["mesh"]["z_coordinates"] = zz
 
-        # Voxel data must be loaded from .mat file
-        voxel_file = mesh_node.find("voxels").find("filename").text
-        voxel_path = output_path / voxel_file
-        try:
-            initial_mesh = sio.loadmat(voxel_path)["mesh"]
-        except:
-            raise FileNotFoundError(
-                "No such file or directory:\n'{}' referenced in '{}'".format(
-                    voxel_path, xml_file
+            # Voxel data must be loaded from .mat file
+            voxel_file = mesh_node.find("voxels").find("filename").text
+            voxel_path = output_path / voxel_file
+            try:
+                initial_mesh = sio.loadmat(voxel_path)["mesh"]
+            except:
+                raise FileNotFoundError(
+                    "No such file or directory:\n'{}' referenced in '{}'".format(
+                        voxel_path, xml_file
+                    )
                 )
-            )
-            sys.exit(1)
+                sys.exit(1)
 
-        print("Reading {}".format(voxel_path))
+            print("Reading {}".format(voxel_path))
 
-        # # center of voxel specified by first three rows [ x, y, z ]
-        # # volume specified by fourth row
-        MCDS["mesh"]["voxels"] = {}
-        MCDS["mesh"]["voxels"]["centers"] = initial_mesh[:3, :]
-        MCDS["mesh"]["voxels"]["volumes"] = initial_mesh[3, :]
+            # # center of voxel specified by first three rows [ x, y, z ]
+            # # volume specified by fourth row
+            MCDS["mesh"]["voxels"] = {}
+            MCDS["mesh"]["voxels"]["centers"] = initial_mesh[:3, :]
+            MCDS["mesh"]["voxels"]["volumes"] = initial_mesh[3, :]
 
-        if parse_continuum_variables:
+        if parse_continuum_variables and cell_variables is None:
             # Continuum_variables, unlike in the matlab version the individual chemical
             # species will be primarily accessed through their names e.g.
             # MCDS['continuum_variables']['oxygen']['units']
@@ -564,7 +586,20 @@ class pyMCDS:
 
         print("Reading {}".format(cell_path))
 
-        for col in range(len(data_labels)):
-            MCDS["discrete_cells"][data_labels[col]] = cell_data[col, :]
+        if cell_variables is None:
+            for col in range(len(data_labels)):
+                MCDS["discrete_cells"][data_labels[col]] = cell_data[col, :]
+            return MCDS
+
+        # copy only the requested rows so the rest of the matrix can be freed
+        label_rows = {label: row for row, label in enumerate(data_labels)}
+        missing = [name for name in cell_variables if name not in label_rows]
+        if missing:
+            raise ValueError(
+                "Cell variables {} not found in '{}'".format(missing, xml_file)
+            )
+        cell_data = cell_data[[label_rows[name] for name in cell_variables], :]
+        for row, name in enumerate(cell_variables):
+            MCDS["discrete_cells"][name] = cell_data[row, :]
 
         return MCDS
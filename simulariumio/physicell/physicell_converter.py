@@ -1,15 +1,19 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import hashlib
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from simulariumio.data_objects.dimension_data import DimensionData
 from typing import Dict, Tuple, List, Callable
 from pathlib import Path
 import numpy as np
-import pandas as pd
 from .dep.pyMCDS import pyMCDS
 
 from ..trajectory_converter import TrajectoryConverter
+from ..instrumentation import instrument_stage
 from ..data_objects import TrajectoryData, AgentData, UnitData, DisplayData
 from ..exceptions import MissingDataError, DataError, InputDataError
 from ..constants import (
@@ -26,6 +30,18 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# the cell variables read from each timestep
+CELL_VARIABLES = [
+    "position_x",
+    "position_y",
+    "position_z",
+    "total_volume",
+    "cell_type",
+    "current_phase",
+]
+
+###############################################################################
+
 
 class PhysicellConverter(TrajectoryConverter):
     def __init__(
@@ -33,6 +49,7 @@ class PhysicellConverter(TrajectoryConverter):
         input_data: PhysicellData,
         progress_callback: Callable[[float], None] = None,
         callback_interval: float = 10,
+        workers: int = 1,
     ):
         """
         This object reads simulation trajectory outputs
@@ -54,16 +71,69 @@ class PhysicellConverter(TrajectoryConverter):
             If a progress_callback was provided, the period between updates
             to be sent to the callback, in seconds
             Default: 10
+        workers : int (optional)
+            How many processes to load the timesteps' XML and MATLAB files in
+            Default: 1
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self.workers = workers
+        self._data = self._read_instrumented(input_data)
+
+    @staticmethod
+    def _get_cache_path(xml_path: Path, cache_dir: str) -> Path:
+        """
+        Get the path to cache the cell data from an XML file,
+        named for the file's absolute path and modification time
+        so the cache is not used once the file changes
+        """
+        stat = xml_path.stat()
+        key = f"{xml_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|"
+        key += ",".join(CELL_VARIABLES)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return Path(cache_dir) / f"{xml_path.stem}_{digest}.npz"
+
+    @staticmethod
+    def _load_timestep(
+        xml_path: Path, cache_dir: str = None
+    ) -> Tuple[Dict[str, np.ndarray], str]:
+        """
+        Load the cell variables and spatial units
+        from one timestep's PhysiCell MultiCellDS XML file,
+        or from the cache if the file hasn't changed since it was cached
+        """
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = PhysicellConverter._get_cache_path(xml_path, cache_dir)
+            if cache_path.exists():
+                with np.load(cache_path) as cached_data:
+                    return (
+                        {name: cached_data[name] for name in CELL_VARIABLES},
+                        str(cached_data["spatial_units"]),
+                    )
+        mcds = pyMCDS(
+            xml_path.name, False, str(xml_path.parent), cell_variables=CELL_VARIABLES
+        )
+        cells = mcds.data["discrete_cells"]
+        spatial_units = mcds.data["metadata"]["spatial_units"]
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to a temporary file first so a partial file is never read
+            temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp.npz")
+            np.savez(temp_path, spatial_units=spatial_units, **cells)
+            os.replace(temp_path, cache_path)
+        return cells, spatial_units
 
     @staticmethod
     def _load_data(
-        path_to_output_dir: str, nth_timestep_to_read: int
-    ) -> Tuple[List[pd.DataFrame], str]:
+        path_to_output_dir: str,
+        nth_timestep_to_read: int,
+        workers: int = 1,
+        cache_dir: str = None,
+    ) -> Tuple[List[Dict[str, np.ndarray]], str]:
         """
-        Load simulation data from PhysiCell MultiCellDS XML files
+        Load the cell variables for each timestep
+        from PhysiCell MultiCellDS XML files,
+        in parallel if there is more than one worker
         """
         files = Path(path_to_output_dir).glob("*output*.xml")
         file_mapping = {}
@@ -71,15 +141,23 @@ class PhysicellConverter(TrajectoryConverter):
             index = int(f.name[f.name.index("output") + 6 :].split(".")[0])
             if index % nth_timestep_to_read == 0:
                 file_mapping[index] = f
-        data = []
-        for t, xml_file in sorted(file_mapping.items()):
-            data.append(pyMCDS(xml_file.name, False, path_to_output_dir))
-        physicell_data = np.array(data)
-        total_steps = len(physicell_data)
-        discrete_cells = []
-        for time_index in range(total_steps):
-            discrete_cells.append(physicell_data[time_index].get_cell_df())
-        spatial_units = physicell_data[0].data["metadata"]["spatial_units"]
+        xml_paths = [xml_path for _, xml_path in sorted(file_mapping.items())]
+        if workers > 1 and len(xml_paths) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                timesteps = list(
+                    executor.map(
+                        PhysicellConverter._load_timestep,
+                        xml_paths,
+                        repeat(cache_dir),
+                    )
+                )
+        else:
+            timesteps = [
+                PhysicellConverter._load_timestep(xml_path, cache_dir)
+                for xml_path in xml_paths
+            ]
+        discrete_cells = [cells for cells, _ in timesteps]
+        spatial_units = timesteps[0][1]
         return discrete_cells, spatial_units
 
     @staticmethod
@@ -122,12 +200,64 @@ class PhysicellConverter(TrajectoryConverter):
             last_id += 1
         return type_ids[cell_type_id][cell_phase_id], type_ids, last_id, type_mapping
 
+    @staticmethod
+    def _get_default_agent_types(
+        cell_type_ids: np.ndarray,
+        cell_phase_ids: np.ndarray,
+        input_data: PhysicellData,
+        type_ids: Dict[int, Dict[int, int]],
+        last_id: int,
+        type_mapping: Dict[int, str],
+        result: AgentData,
+    ) -> Tuple[List[str], np.ndarray, int]:
+        """
+        Get the agent type name for each cell displayed as a default agent,
+        and its radius from the display data or NaN if none was provided,
+        adding each new cell type and phase combination in order of appearance
+        """
+        unique_types, first_indices, type_indices = np.unique(
+            np.stack([cell_type_ids, cell_phase_ids], axis=1),
+            axis=0,
+            return_index=True,
+            return_inverse=True,
+        )
+        type_names = np.empty(len(unique_types), dtype=object)
+        radii = np.full(len(unique_types), np.nan)
+        for type_index in np.argsort(first_indices):
+            cell_type_id, cell_phase_id = unique_types[type_index].tolist()
+            (
+                tid,
+                type_ids,
+                last_id,
+                type_mapping,
+            ) = PhysicellConverter._get_agent_type(
+                cell_type_id=cell_type_id,
+                cell_phase_id=cell_phase_id,
+                input_data=input_data,
+                type_ids=type_ids,
+                last_id=last_id,
+                type_mapping=type_mapping,
+            )
+            if type_mapping[tid] not in input_data.display_data:
+                result.display_data[type_mapping[tid]] = DisplayData(
+                    name=type_mapping[tid],
+                    display_type=DISPLAY_TYPE.SPHERE,
+                )
+            type_names[type_index] = type_mapping[tid]
+            if (
+                cell_type_id in input_data.display_data
+                and input_data.display_data[cell_type_id].radius is not None
+            ):
+                radii[type_index] = input_data.display_data[cell_type_id].radius
+        type_indices = type_indices.reshape(-1)
+        return type_names[type_indices].tolist(), radii[type_indices], last_id
+
     @staticmethod
     def _radius_for_volume(total_volume: float) -> float:
         return np.cbrt(3.0 / 4.0 * total_volume / np.pi)
 
     @staticmethod
-    def _get_dimensions(discrete_cells: List[pd.DataFrame]) -> DimensionData:
+    def _get_dimensions(discrete_cells: List[Dict[str, np.ndarray]]) -> DimensionData:
         """
         Get dimensions of the PhysiCell data
         """
@@ -148,11 +278,12 @@ class PhysicellConverter(TrajectoryConverter):
         )
 
     @staticmethod
-    def _cell_is_subcell(cell_type_id: int, input_data: PhysicellData) -> bool:
-        return (
-            input_data.max_owner_cells >= 0
-            and cell_type_id >= input_data.max_owner_cells
-        )
+    def _cell_is_subcell(
+        cell_type_ids: np.ndarray, input_data: PhysicellData
+    ) -> np.ndarray:
+        if input_data.max_owner_cells < 0:
+            return np.zeros(cell_type_ids.shape, dtype=bool)
+        return cell_type_ids >= input_data.max_owner_cells
 
     @staticmethod
     def _display_owner_number(owner_id: int, input_data: PhysicellData) -> bool:
@@ -174,156 +305,173 @@ class PhysicellConverter(TrajectoryConverter):
         type_mapping = {}
         try:
             discrete_cells, units = PhysicellConverter._load_data(
-                input_data.path_to_output_dir, input_data.nth_timestep_to_read
+                input_data.path_to_output_dir,
+                input_data.nth_timestep_to_read,
+                self.workers,
+                input_data.cache_dir,
             )
         except Exception as e:
             raise InputDataError(f"Error reading from Physicell output directory: {e}")
 
-        dimensions = PhysicellConverter._get_dimensions(discrete_cells)
-        result = AgentData.from_dimensions(dimensions)
+        with instrument_stage("dimension_prescan") as stage:
+            dimensions = PhysicellConverter._get_dimensions(discrete_cells)
+            stage.n_frames = dimensions.total_steps
+        result = AgentData.from_dimensions(dimensions, dtype=input_data.dtype)
         result.times = (
             input_data.nth_timestep_to_read
             * input_data.timestep
             * np.arange(dimensions.total_steps)
         )
         # get data
+        scale_factor = input_data.meta_data.scale_factor
         max_subpoints = 0
         values_per_subcell = SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.SPHERE_GROUP)
         n_def_agents = []
         subcells = []
 
         for time_index in range(dimensions.total_steps):
-            n_cells = int(len(discrete_cells[time_index]["position_x"]))
-            n_def_agents.append(0)
-            subcells.append({})
+            cells = discrete_cells[time_index]
             self.check_report_progress(time_index / (dimensions.total_steps * 2))
-            for cell_index in range(n_cells):
-                cell_type_id = int(discrete_cells[time_index]["cell_type"][cell_index])
-                if PhysicellConverter._cell_is_subcell(cell_type_id, input_data):
-                    # this is a subcell
-                    if cell_type_id not in subcells[time_index]:
-                        subcells[time_index][cell_type_id] = []
-                    subcells[time_index][cell_type_id].append(cell_index)
-                    continue
-                # otherwise display as a default agent
-                result.unique_ids[time_index][n_def_agents[time_index]] = cell_index
-                cell_phase = int(
-                    discrete_cells[time_index]["current_phase"][cell_index]
-                )
+            cell_type_ids = cells["cell_type"].astype(int)
+            is_subcell = PhysicellConverter._cell_is_subcell(cell_type_ids, input_data)
+            # display cells that aren't subcells as default agents
+            cell_indices = np.nonzero(~is_subcell)[0]
+            n_def_agents.append(len(cell_indices))
+            if len(cell_indices) > 0:
                 (
-                    tid,
-                    type_ids,
+                    type_names,
+                    radii,
                     last_id,
-                    type_mapping,
-                ) = PhysicellConverter._get_agent_type(
-                    cell_type_id=cell_type_id,
-                    cell_phase_id=cell_phase,
+                ) = PhysicellConverter._get_default_agent_types(
+                    cell_type_ids=cell_type_ids[cell_indices],
+                    cell_phase_ids=cells["current_phase"][cell_indices].astype(int),
                     input_data=input_data,
                     type_ids=type_ids,
                     last_id=last_id,
                     type_mapping=type_mapping,
+                    result=result,
                 )
-                if type_mapping[tid] not in input_data.display_data:
-                    result.display_data[type_mapping[tid]] = DisplayData(
-                        name=type_mapping[tid],
-                        display_type=DISPLAY_TYPE.SPHERE,
-                    )
-                result.types[time_index].append(type_mapping[tid])
-                result.positions[time_index][
-                    n_def_agents[time_index]
-                ] = input_data.meta_data.scale_factor * np.array(
+                agent_indices = slice(0, len(cell_indices))
+                result.unique_ids[time_index][agent_indices] = cell_indices
+                result.types[time_index] += type_names
+                result.positions[time_index][agent_indices] = scale_factor * np.stack(
                     [
-                        discrete_cells[time_index]["position_x"][cell_index],
-                        discrete_cells[time_index]["position_y"][cell_index],
-                        discrete_cells[time_index]["position_z"][cell_index],
-                    ]
+                        cells["position_x"][cell_indices],
+                        cells["position_y"][cell_indices],
+                        cells["position_z"][cell_indices],
+                    ],
+                    axis=1,
                 )
-                result.radii[time_index][
-                    n_def_agents[time_index]
-                ] = input_data.meta_data.scale_factor * (
-                    input_data.display_data[cell_type_id].radius
-                    if cell_type_id in input_data.display_data
-                    and input_data.display_data[cell_type_id].radius is not None
-                    else PhysicellConverter._radius_for_volume(
-                        discrete_cells[time_index]["total_volume"][cell_index]
-                    )
+                result.radii[time_index][agent_indices] = scale_factor * np.where(
+                    np.isnan(radii),
+                    PhysicellConverter._radius_for_volume(
+                        cells["total_volume"][cell_indices]
+                    ),
+                    radii,
+                )
+            # group the subcells by owner, in order of each owner's first subcell
+            subcell_indices = np.nonzero(is_subcell)[0]
+            owner_ids, first_indices, owner_indices, n_subcells = np.unique(
+                cell_type_ids[subcell_indices],
+                return_index=True,
+                return_inverse=True,
+                return_counts=True,
+            )
+            owner_order = np.argsort(first_indices)
+            owner_ranks = np.empty_like(owner_order)
+            owner_ranks[owner_order] = np.arange(len(owner_order))
+            subcell_order = np.argsort(owner_ranks[owner_indices], kind="stable")
+            subcells.append(
+                (
+                    owner_ids[owner_order],
+                    n_subcells[owner_order],
+                    subcell_indices[subcell_order],
+                )
+            )
+            if len(n_subcells) > 0:
+                max_subpoints = max(
+                    max_subpoints, values_per_subcell * int(np.amax(n_subcells))
                 )
-                n_def_agents[time_index] += 1
-            # update max_subpoints
-            for owner_id in subcells[time_index]:
-                n_subcells = len(subcells[time_index][owner_id])
-                if n_subcells * values_per_subcell > max_subpoints:
-                    max_subpoints = n_subcells * values_per_subcell
         # create sphere group agents for owner cells and subcells
         result.subpoints = np.zeros(
             (
                 dimensions.total_steps,
                 dimensions.max_agents,
                 max_subpoints,
-            )
+            ),
+            dtype=input_data.dtype,
         )
         owner_cell_color_indices = {}
+        owner_type_names = {}
         next_color_index = 0
         for time_index in range(dimensions.total_steps):
-            agent_index = n_def_agents[time_index]
+            cells = discrete_cells[time_index]
+            first_agent_index = n_def_agents[time_index]
             self.check_report_progress(
                 (time_index + dimensions.total_steps) / (dimensions.total_steps * 2)
             )
-            for owner_id in subcells[time_index]:
+            owner_ids, n_subcells, subcell_indices = subcells[time_index]
+            n_owners = len(owner_ids)
+            result.n_agents[time_index] = first_agent_index + n_owners
+            if n_owners < 1:
+                continue
+            for owner_id in owner_ids.tolist():
                 if owner_id not in owner_cell_color_indices:
                     owner_cell_color_indices[owner_id] = next_color_index
                     next_color_index += 1
                     if next_color_index >= len(DEFAULT_COLORS):
                         next_color_index = 0
-                result.unique_ids[time_index][agent_index] = owner_id
-                owner_number = PhysicellConverter._display_owner_number(
-                    owner_id, input_data
-                )
-                type_name = f"{input_data.owner_cell_display_name}#{owner_number}"
-                result.types[time_index].append(type_name)
-                type_ids[owner_id] = {}
-                input_data.display_data[owner_id] = DisplayData(
-                    name=type_name,
-                    display_type=DISPLAY_TYPE.SPHERE_GROUP,
-                    color=DEFAULT_COLORS[owner_cell_color_indices[owner_id]],
-                )
-                n_subcells = len(subcells[time_index][owner_id])
-                result.n_subpoints[time_index][agent_index] = (
-                    values_per_subcell * n_subcells
-                )
-                # position
-                subcell_positions = []
-                for subcell_index in range(n_subcells):
-                    cell_index = subcells[time_index][owner_id][subcell_index]
-                    subcell_positions.append(
-                        input_data.meta_data.scale_factor
-                        * np.array(
-                            [
-                                discrete_cells[time_index]["position_x"][cell_index],
-                                discrete_cells[time_index]["position_y"][cell_index],
-                                discrete_cells[time_index]["position_z"][cell_index],
-                            ]
-                        )
+                    owner_number = PhysicellConverter._display_owner_number(
+                        owner_id, input_data
                     )
-                center = np.mean(np.array(subcell_positions), axis=0)
-                result.positions[time_index][agent_index] = center
-                # subpoints
-                for subcell_index in range(n_subcells):
-                    cell_index = subcells[time_index][owner_id][subcell_index]
-                    sp_index = values_per_subcell * subcell_index
-                    result.subpoints[time_index][agent_index][
-                        sp_index : sp_index + VALUES_PER_3D_POINT
-                    ] = (subcell_positions[subcell_index] - center)
-                    result.subpoints[time_index][agent_index][
-                        sp_index + VALUES_PER_3D_POINT
-                    ] = (
-                        input_data.meta_data.scale_factor
-                        * PhysicellConverter._radius_for_volume(
-                            discrete_cells[time_index]["total_volume"][cell_index]
-                        )
+                    owner_type_names[owner_id] = (
+                        f"{input_data.owner_cell_display_name}#{owner_number}"
                     )
-                agent_index += 1
-            result.n_agents[time_index] = agent_index
+                    type_ids[owner_id] = {}
+                    input_data.display_data[owner_id] = DisplayData(
+                        name=owner_type_names[owner_id],
+                        display_type=DISPLAY_TYPE.SPHERE_GROUP,
+                        color=DEFAULT_COLORS[owner_cell_color_indices[owner_id]],
+                    )
+                result.types[time_index].append(owner_type_names[owner_id])
+            agent_indices = first_agent_index + np.arange(n_owners)
+            result.unique_ids[time_index][agent_indices] = owner_ids
+            result.n_subpoints[time_index][agent_indices] = (
+                values_per_subcell * n_subcells
+            )
+            # position at the center of the subcells
+            subcell_positions = scale_factor * np.stack(
+                [
+                    cells["position_x"][subcell_indices],
+                    cells["position_y"][subcell_indices],
+                    cells["position_z"][subcell_indices],
+                ],
+                axis=1,
+            )
+            group_starts = np.cumsum(n_subcells) - n_subcells
+            centers = (
+                np.add.reduceat(subcell_positions, group_starts, axis=0)
+                / n_subcells[:, np.newaxis]
+            )
+            result.positions[time_index][agent_indices] = centers
+            # subpoints, viewed as one row of values per subcell
+            subcell_owners = np.repeat(np.arange(n_owners), n_subcells)
+            subcell_numbers = (
+                np.arange(len(subcell_indices)) - group_starts[subcell_owners]
+            )
+            subpoints = result.subpoints[time_index].reshape(
+                (dimensions.max_agents, -1, values_per_subcell)
+            )
+            subcell_agent_indices = first_agent_index + subcell_owners
+            subpoints[subcell_agent_indices, subcell_numbers, :VALUES_PER_3D_POINT] = (
+                subcell_positions - centers[subcell_owners]
+            )
+            subpoints[subcell_agent_indices, subcell_numbers, VALUES_PER_3D_POINT] = (
+                scale_factor
+                * PhysicellConverter._radius_for_volume(
+                    cells["total_volume"][subcell_indices]
+                )
+            )
         spatial_units = UnitData(
             units,
             1.0 / input_data.meta_data.scale_factor,
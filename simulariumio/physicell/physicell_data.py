@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import UnitData, MetaData, DisplayData
 
 ###############################################################################
@@ -24,6 +26,8 @@ class PhysicellData:
     owner_cell_display_name: str
     time_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
+    cache_dir: str
 
     def __init__(
         self,
@@ -37,6 +41,8 @@ class PhysicellData:
         owner_cell_display_name: str = "cell",
         time_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
+        cache_dir: str = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -83,6 +89,20 @@ class PhysicellData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
+        cache_dir : str (optional)
+            A path to a directory to cache the cell data read
+            from each timestep's XML and MATLAB files in.
+            Converting the same output again, e.g. with different
+            display data, then loads the cell data from the cache
+            instead of parsing the files. Each file is cached
+            by its path and modification time, so changed files
+            are parsed again
+            Default: None (don't cache)
         """
         self.timestep = timestep
         self.path_to_output_dir = path_to_output_dir
@@ -94,3 +114,5 @@ class PhysicellData:
         self.owner_cell_display_name = owner_cell_display_name
         self.time_units = time_units if time_units is not None else UnitData("s")
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
+        self.cache_dir = cache_dir
@@ -2,16 +2,20 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import Any, Tuple, Callable
+import time
+from typing import Any, Tuple, Callable, List
 
+import h5py
 import numpy as np
 import readdy
 
 from ..trajectory_converter import TrajectoryConverter
 from ..data_objects import TrajectoryData, AgentData, DimensionData, DisplayData
-from ..constants import DISPLAY_TYPE, VIZ_TYPE
+from ..constants import DISPLAY_TYPE, VALIDATION
 from .readdy_data import ReaddyData
 from ..exceptions import InputDataError
+from ..instrumentation import AccumulatedStage
+from ..writers import BinaryWriterSession
 
 ###############################################################################
 
@@ -49,24 +53,107 @@ class ReaddyConverter(TrajectoryConverter):
             Default: 10
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self._data = self._read_instrumented(input_data)
+
+    @staticmethod
+    def _get_frame_window(input_data: ReaddyData) -> Tuple[int, int]:
+        """
+        Get the first frame to read and the frame to stop before,
+        limited to the frames in the ReaDDy .h5 trajectory file
+        """
+        with h5py.File(input_data.path_to_readdy_h5, "r") as h5_file:
+            total_frames = h5_file["readdy/trajectory/limits"].shape[0]
+        start = max(input_data.start_frame, 0)
+        stop = (
+            min(input_data.stop_frame, total_frames)
+            if input_data.stop_frame is not None
+            else total_frames
+        )
+        if start >= stop:
+            raise InputDataError(
+                f"No ReaDDy frames to read from frame {start} to {stop}, "
+                f"the trajectory has {total_frames} frames"
+            )
+        return start, stop
 
     @staticmethod
     def _get_raw_trajectory_data(
-        input_data: ReaddyData,
-    ) -> Tuple[AgentData, Any, np.ndarray]:
+        input_data: ReaddyData, start: int, stop: int
+    ) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Return agent data populated from a ReaDDy .h5 trajectory file
+        Load every frame_stride-th frame from start to stop
+        from a ReaDDy .h5 trajectory file
         """
-        # load the trajectory
         traj = readdy.Trajectory(input_data.path_to_readdy_h5)
-        n_agents, positions, type_ids, ids = traj.to_numpy(start=0, stop=None)
+        if input_data.frame_stride <= 1:
+            n_agents, positions, type_ids, ids = traj.to_numpy(start=start, stop=stop)
+            return (traj, n_agents, positions, type_ids, ids)
+        # load each frame on its own so the frames in between are not read
+        frames = [
+            traj.to_numpy(start=time_index, stop=time_index + 1)
+            for time_index in range(start, stop, input_data.frame_stride)
+        ]
+        n_frames = len(frames)
+        max_agents = max(frame[1].shape[1] for frame in frames)
+        n_agents = np.concatenate([frame[0] for frame in frames])
+        positions = np.zeros((n_frames, max_agents, 3), dtype=frames[0][1].dtype)
+        type_ids = np.zeros((n_frames, max_agents), dtype=frames[0][2].dtype)
+        ids = np.zeros((n_frames, max_agents), dtype=frames[0][3].dtype)
+        for time_index, frame in enumerate(frames):
+            _, frame_positions, frame_type_ids, frame_ids = frame
+            n_frame_agents = frame_positions.shape[1]
+            positions[time_index, :n_frame_agents] = frame_positions[0]
+            type_ids[time_index, :n_frame_agents] = frame_type_ids[0]
+            ids[time_index, :n_frame_agents] = frame_ids[0]
         return (traj, n_agents, positions, type_ids, ids)
 
-    def _get_agent_data(self, input_data: ReaddyData) -> AgentData:
+    @staticmethod
+    def _get_species_info(
+        traj: Any, species_ids: np.ndarray, input_data: ReaddyData, result: AgentData
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Pack raw ReaDDy trajectory data into AgentData,
-        ignoring particles with type names in ignore_types
+        Look up the display data for each ReaDDy species once,
+        and get arrays with whether to keep the particles of each species,
+        and their type ID and radius,
+        with an extra ignored species at the end for anything else
+        """
+        n_species = species_ids.shape[0]
+        keep = np.zeros(n_species + 1, dtype=bool)
+        type_ids = np.zeros(n_species + 1, dtype=int)
+        radii = np.ones(n_species + 1)
+        for species_index, tid in enumerate(species_ids):
+            raw_type_name = traj.species_name(tid)
+            if raw_type_name in input_data.ignore_types:
+                continue
+            input_display_data = TrajectoryConverter._get_display_data_for_agent(
+                raw_type_name, input_data.display_data
+            )
+            display_data = (
+                input_display_data
+                if input_display_data is not None
+                else DisplayData(name=raw_type_name, display_type=DISPLAY_TYPE.SPHERE)
+            )
+            result.display_data[display_data.name] = display_data
+            keep[species_index] = True
+            type_ids[species_index] = result.get_type_id(display_data.name)
+            if display_data.radius is not None:
+                radii[species_index] = display_data.radius
+        return keep, type_ids, radii
+
+    @staticmethod
+    def _get_agent_data(
+        input_data: ReaddyData,
+        start: int,
+        stop: int,
+        report_progress: Callable[[float], None] = None,
+        progress_start: float = 0.0,
+        progress_end: float = 1.0,
+    ) -> AgentData:
+        """
+        Pack raw ReaDDy trajectory data from start to stop into AgentData,
+        ignoring particles with type names in ignore_types,
+        and calling report_progress (if provided) with the percent complete
+        from progress_start to progress_end
         """
         (
             traj,
@@ -74,49 +161,51 @@ class ReaddyConverter(TrajectoryConverter):
             positions,
             type_ids,
             ids,
-        ) = ReaddyConverter._get_raw_trajectory_data(input_data)
+        ) = ReaddyConverter._get_raw_trajectory_data(input_data, start, stop)
         data_dimensions = DimensionData(
             total_steps=n_agents.shape[0],
             max_agents=int(np.amax(n_agents)),
         )
-
-        result = AgentData.from_dimensions(data_dimensions)
-        result.times = input_data.timestep * np.arange(data_dimensions.total_steps)
-        result.viz_types = VIZ_TYPE.DEFAULT * np.ones(
-            shape=(data_dimensions.total_steps, data_dimensions.max_agents)
+        total_steps = data_dimensions.total_steps
+        max_agents = data_dimensions.max_agents
+        result = AgentData.from_dimensions(
+            data_dimensions, use_type_ids=True, dtype=input_data.dtype
         )
-        for time_index in range(data_dimensions.total_steps):
-            new_agent_index = 0
-            for agent_index in range(int(n_agents[time_index])):
-                tid = type_ids[time_index][agent_index]
-                if traj.species_name(tid) in input_data.ignore_types:
-                    continue
-                raw_type_name = traj.species_name(tid)
-                input_display_data = TrajectoryConverter._get_display_data_for_agent(
-                    raw_type_name, input_data.display_data
-                )
-                display_data = (
-                    input_display_data
-                    if input_display_data is not None
-                    else DisplayData(
-                        name=raw_type_name, display_type=DISPLAY_TYPE.SPHERE
-                    )
-                )
-                result.unique_ids[time_index][new_agent_index] = ids[time_index][
-                    agent_index
-                ]
-                result.types[time_index].append(display_data.name)
-                result.display_data[display_data.name] = display_data
-                result.positions[time_index][new_agent_index] = (
-                    input_data.meta_data.scale_factor
-                    * positions[time_index][agent_index]
-                )
-                result.radii[time_index][new_agent_index] = (
-                    display_data.radius if display_data.radius is not None else 1.0
+        result.times = input_data.timestep * (
+            start + input_data.frame_stride * np.arange(total_steps)
+        )
+        in_frame = np.arange(max_agents) < n_agents[:, np.newaxis]
+        species_ids = np.unique(type_ids[:, :max_agents][in_frame])
+        species_keep, species_type_ids, species_radii = (
+            ReaddyConverter._get_species_info(traj, species_ids, input_data, result)
+        )
+        # convert blocks of frames at a time so progress can be reported
+        n_frames_per_block = max(1, -(-total_steps // 100))
+        for block_start in range(0, total_steps, n_frames_per_block):
+            if report_progress is not None:
+                report_progress(
+                    progress_start
+                    + (progress_end - progress_start) * block_start / total_steps
                 )
-                new_agent_index += 1
-            result.n_agents[time_index] = new_agent_index
-            self.check_report_progress(time_index / data_dimensions.total_steps)
+            block_end = min(block_start + n_frames_per_block, total_steps)
+            species = np.searchsorted(
+                species_ids, type_ids[block_start:block_end, :max_agents]
+            )
+            keep = in_frame[block_start:block_end] & species_keep[species]
+            # move the kept particles to the front of each frame, in order
+            time_indices = block_start + np.nonzero(keep)[0]
+            agent_indices = (np.cumsum(keep, axis=1) - 1)[keep]
+            species = species[keep]
+            result.n_agents[block_start:block_end] = np.count_nonzero(keep, axis=1)
+            result.unique_ids[time_indices, agent_indices] = ids[
+                block_start:block_end, :max_agents
+            ][keep]
+            result.type_ids[time_indices, agent_indices] = species_type_ids[species]
+            result.positions[time_indices, agent_indices] = (
+                input_data.meta_data.scale_factor
+                * positions[block_start:block_end, :max_agents][keep]
+            )
+            result.radii[time_indices, agent_indices] = species_radii[species]
         return result
 
     def _read(
@@ -128,10 +217,23 @@ class ReaddyConverter(TrajectoryConverter):
         """
         print("Reading ReaDDy Data -------------")
         try:
-            agent_data = self._get_agent_data(input_data)
+            start, stop = ReaddyConverter._get_frame_window(input_data)
+            agent_data = ReaddyConverter._get_agent_data(
+                input_data, start, stop, self.check_report_progress
+            )
+        except InputDataError:
+            raise
         except Exception as e:
             raise InputDataError(f"Error reading input Readdy data: {e}")
+        return ReaddyConverter._get_trajectory_data(input_data, agent_data)
 
+    @staticmethod
+    def _get_trajectory_data(
+        input_data: ReaddyData, agent_data: AgentData
+    ) -> TrajectoryData:
+        """
+        Add the display data, units, and plots to the agent data
+        """
         # get display data (geometry and color)
         for tid in input_data.display_data:
             display_data = input_data.display_data[tid]
@@ -145,3 +247,98 @@ class ReaddyConverter(TrajectoryConverter):
             spatial_units=input_data.spatial_units,
             plots=input_data.plots,
         )
+
+    @classmethod
+    def save_in_chunks(
+        cls,
+        input_data: ReaddyData,
+        output_path: str,
+        chunk_n_frames: int = 1000,
+        progress_callback: Callable[[float], None] = None,
+        callback_interval: float = 10,
+        validate_ids: bool = True,
+        validation: str = VALIDATION.FAST,
+    ) -> List[str]:
+        """
+        Read and convert a ReaDDy trajectory a window of frames at a time,
+        appending each window to a .simularium binary file
+        as soon as it is converted, so only one window is in memory.
+        Use this for trajectories too large to convert at once.
+        Return the names of the file(s) written
+
+        Parameters
+        ----------
+        input_data : ReaddyData
+            An object containing info for reading
+            ReaDDy simulation trajectory outputs and plot data
+        output_path: str
+            where to save the file(s)
+        chunk_n_frames: int (optional)
+            how many frames to read and convert at a time
+            Default: 1000
+        progress_callback : Callable[[float], None] (optional)
+            Callback function that accepts 1 float argument and returns None
+            which will be called at a given progress interval, determined by
+            callback_interval requested, providing the current percent progress
+            Default: None
+        callback_interval : float (optional)
+            If a progress_callback was provided, the period between updates
+            to be sent to the callback, in seconds
+            Default: 10
+        validate_ids: bool (optional)
+            additional validation to check agent ID size?
+            Default: True
+        validation: str (optional)
+            how much to check each window before writing it,
+            "full", "fast", or "off", see VALIDATION
+            Default: "fast"
+        """
+        last_report_time = time.time()
+
+        def report_progress(percent_complete: float) -> None:
+            nonlocal last_report_time
+            current_time = time.time()
+            if current_time > last_report_time + callback_interval:
+                progress_callback(percent_complete)
+                last_report_time = current_time
+
+        print("Reading ReaDDy Data -------------")
+        try:
+            start, stop = ReaddyConverter._get_frame_window(input_data)
+        except InputDataError:
+            raise
+        except Exception as e:
+            raise InputDataError(f"Error reading input Readdy data: {e}")
+        trajectory_data = ReaddyConverter._get_trajectory_data(
+            input_data, AgentData.from_dimensions(DimensionData(0, 0))
+        )
+        chunk_stride = chunk_n_frames * input_data.frame_stride
+        with AccumulatedStage(
+            "parse", converter=cls.__name__
+        ) as parse, BinaryWriterSession(
+            trajectory_data,
+            output_path,
+            validate_ids,
+            validation=validation,
+        ) as session:
+            n_frames = 0
+            for chunk_start in range(start, stop, chunk_stride):
+                chunk_stop = min(chunk_start + chunk_stride, stop)
+                with parse.measure():
+                    try:
+                        agent_data = ReaddyConverter._get_agent_data(
+                            input_data,
+                            chunk_start,
+                            chunk_stop,
+                            report_progress if progress_callback else None,
+                            (chunk_start - start) / (stop - start),
+                            (chunk_stop - start) / (stop - start),
+                        )
+                    except InputDataError:
+                        raise
+                    except Exception as e:
+                        raise InputDataError(f"Error reading input Readdy data: {e}")
+                session.append_frame(agent_data)
+                n_frames += agent_data.total_timesteps()
+            parse.metrics.n_frames = n_frames
+        return session.output_names
@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import UnitData, MetaData, DisplayData
 
 ###############################################################################
@@ -22,6 +24,10 @@ class ReaddyData:
     time_units: UnitData
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
+    start_frame: int
+    stop_frame: int
+    frame_stride: int
 
     def __init__(
         self,
@@ -33,6 +39,10 @@ class ReaddyData:
         time_units: UnitData = None,
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
+        start_frame: int = 0,
+        stop_frame: int = None,
+        frame_stride: int = 1,
     ):
         """
         This object holds simulation trajectory outputs
@@ -67,6 +77,22 @@ class ReaddyData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
+        start_frame : int (optional)
+            The index of the first frame to read,
+            e.g. to preview part of a long trajectory
+            Default: 0
+        stop_frame : int (optional)
+            The index of the frame to stop reading before
+            Default: read to the end of the trajectory
+        frame_stride : int (optional)
+            Read every nth frame from start_frame,
+            the frames in between are not loaded
+            Default: 1
         """
         self.timestep = timestep
         self.path_to_readdy_h5 = path_to_readdy_h5
@@ -76,3 +102,7 @@ class ReaddyData:
         self.time_units = time_units if time_units is not None else UnitData("s")
         self.spatial_units = spatial_units if time_units is not None else UnitData("m")
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
+        self.start_frame = start_frame
+        self.stop_frame = stop_frame
+        self.frame_stride = frame_stride
@@ -2,4 +2,5 @@
 # -*- coding: utf-8 -*-
 
 from .simularium_binary_reader import SimulariumBinaryReader  # noqa: F401
+from .lazy_simularium_binary_reader import LazySimulariumBinaryReader  # noqa: F401
 from .binary_info import BinaryFileData, BinaryBlockInfo  # noqa: F401
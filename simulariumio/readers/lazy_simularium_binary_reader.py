@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..data_objects import InputFileData
+from ..constants import BINARY_SETTINGS, BINARY_BLOCK_TYPE
+from ..exceptions import DataError
+from .binary_info import BinaryBlockInfo
+from .simularium_binary_reader import SimulariumBinaryReader
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class LazySimulariumBinaryReader:
+    n_frames: int
+    frame_numbers: np.ndarray
+    times: np.ndarray
+    n_agents: np.ndarray
+
+    def __init__(self, input_file: InputFileData):
+        """
+        This object provides random access to the frames
+        in a .simularium binary file without loading the whole file.
+        A file on disk is memory-mapped, and only the binary header
+        and the spatial data frame offset table are parsed on open.
+        Frames are returned as zero-copy numpy views of the file.
+
+        Parameters
+        ----------
+        input_file: InputFileData
+            A InputFileData object containing binary .simularium data to load.
+            If file_contents are provided, they are viewed without copying,
+            otherwise the file at file_path is memory-mapped
+        """
+        if input_file.file_contents:
+            self._byte_view = np.frombuffer(input_file.file_contents, dtype=np.uint8)
+        else:
+            self._byte_view = np.memmap(input_file.file_path, dtype=np.uint8, mode="r")
+        n_values = int(len(self._byte_view) / BINARY_SETTINGS.BYTES_PER_VALUE)
+        values_view = self._byte_view[: n_values * BINARY_SETTINGS.BYTES_PER_VALUE]
+        self._int_view = values_view.view(np.dtype("I").newbyteorder("<"))
+        self._float_view = values_view.view(np.dtype("f").newbyteorder("<"))
+        self._block_info = SimulariumBinaryReader._parse_binary_header(self._byte_view)
+        self._json_block_indices = {}
+        spatial_block_index = -1
+        for block_index in range(self._block_info.n_blocks):
+            block_type_id = SimulariumBinaryReader._binary_block_type(
+                block_index, self._block_info, self._int_view
+            )
+            if block_type_id == BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value:
+                self._json_block_indices["trajectoryInfo"] = block_index
+            elif block_type_id == BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value:
+                self._json_block_indices["plotData"] = block_index
+            elif block_type_id == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value:
+                spatial_block_index = block_index
+        if spatial_block_index < 0:
+            raise DataError("No binary spatial data block found")
+        self._parse_frame_offsets(spatial_block_index, self._block_info)
+
+    def _parse_frame_offsets(
+        self, block_index: int, block_info: BinaryBlockInfo
+    ) -> None:
+        """
+        Parse the spatial data header to get the offset
+        and length of each frame, in number of values
+        """
+        block_offset_n_bytes = block_info.block_offsets[block_index]
+        header_offset = (
+            int(block_offset_n_bytes / BINARY_SETTINGS.BYTES_PER_VALUE)
+            + BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+        )
+        self.spatial_data_version = int(self._int_view[header_offset])
+        self.n_frames = int(self._int_view[header_offset + 1])
+        frame_info = self._int_view[
+            header_offset
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES : header_offset
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * self.n_frames
+        ].astype(np.int64)
+        # frame offsets are in bytes from the start of the block
+        self._frame_starts = (
+            block_offset_n_bytes + frame_info[0::2]
+        ) // BINARY_SETTINGS.BYTES_PER_VALUE
+        self._frame_ends = (
+            self._frame_starts + frame_info[1::2] // BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        self.frame_numbers = self._int_view[self._frame_starts]
+        self.times = self._float_view[self._frame_starts + 1]
+        self.n_agents = self._int_view[self._frame_starts + 2]
+
+    def _json_block(self, block_type: str) -> Dict[str, Any]:
+        """
+        Parse a JSON block, return None if the block is not in the file
+        """
+        if block_type not in self._json_block_indices:
+            return None
+        return SimulariumBinaryReader._binary_block_json(
+            self._json_block_indices[block_type], self._block_info, self._byte_view
+        )
+
+    @property
+    def trajectory_info(self) -> Dict[str, Any]:
+        """
+        The trajectoryInfo block parsed from JSON
+        """
+        return self._json_block("trajectoryInfo")
+
+    @property
+    def plot_data(self) -> Dict[str, Any]:
+        """
+        The plotData block parsed from JSON
+        """
+        return self._json_block("plotData")
+
+    def frame(self, frame_index: int) -> np.ndarray:
+        """
+        Get a zero-copy view of the packed agent data buffer
+        for the frame at the given index
+
+        Parameters
+        ----------
+        frame_index: int
+            The index of the frame within this file
+        """
+        if frame_index < 0:
+            frame_index += self.n_frames
+        if frame_index < 0 or frame_index >= self.n_frames:
+            raise IndexError(
+                f"Frame index {frame_index} out of range for {self.n_frames} frames"
+            )
+        return self._float_view[
+            self._frame_starts[frame_index]
+            + BINARY_SETTINGS.FRAME_HEADER_N_VALUES : self._frame_ends[frame_index]
+        ]
+
+    def frames(self, frame_slice: slice) -> List[np.ndarray]:
+        """
+        Get zero-copy views of the packed agent data buffers
+        for the frames in the given slice
+
+        Parameters
+        ----------
+        frame_slice: slice
+            Which frames to get
+        """
+        return [
+            self.frame(frame_index)
+            for frame_index in range(*frame_slice.indices(self.n_frames))
+        ]
+
+    def close(self) -> None:
+        """
+        Release the references to the file data held by this object,
+        a memory-mapped file is closed once no frame views remain
+        """
+        self._byte_view = None
+        self._int_view = None
+        self._float_view = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
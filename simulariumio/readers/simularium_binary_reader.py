@@ -117,7 +117,9 @@ class SimulariumBinaryReader:
         )
         block_offset += block_header_n_bytes
         block_length -= block_header_n_bytes
-        traj_info_bytes = data_as_bytes[block_offset : block_offset + block_length]
+        traj_info_bytes = bytes(
+            data_as_bytes[block_offset : block_offset + block_length]
+        )
         return json.loads(traj_info_bytes.decode("utf-8").strip("\x00"))
 
     @staticmethod
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import List, Callable
+from typing import List, Tuple, Callable
 import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
+from ..frame_index import parse_frames
 from ..data_objects import TrajectoryData, AgentData, DimensionData
 from ..exceptions import InputDataError
 from .smoldyn_data import SmoldynData
@@ -16,6 +17,11 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# each frame starts at the 2 column line from the executiontime command
+FRAME_START_PATTERN = rb"\n(?=[^\S\n]*\S+[^\S\n]+\S+[^\S\n]*(?:\n|\Z))"
+
+###############################################################################
+
 
 class SmoldynConverter(TrajectoryConverter):
     def __init__(
@@ -23,6 +29,7 @@ class SmoldynConverter(TrajectoryConverter):
         input_data: SmoldynData,
         progress_callback: Callable[[float], None] = None,
         callback_interval: float = 10,
+        workers: int = 1,
     ):
         """
         This object reads simulation trajectory outputs
@@ -44,99 +51,106 @@ class SmoldynConverter(TrajectoryConverter):
             If a progress_callback was provided, the period between updates
             to be sent to the callback, in seconds
             Default: 10
+        workers : int (optional)
+            How many processes to parse the frames in,
+            with more than one the file is indexed first
+            and each process reads and parses batches of frames
+            Default: 1
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self.workers = workers
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
-    def _parse_dimensions(smoldyn_data_lines: List[str]) -> DimensionData:
+    def _parse_frame(
+        lines: List[str], scale_factor: float
+    ) -> Tuple[float, List[str], List[int], np.ndarray]:
         """
-        Parse Smoldyn output files to get the number of timesteps
-        and maximum agents per timestep
+        Parse the lines of one frame of a Smoldyn output file,
+        return the time, and the raw type name, unique ID,
+        and position for each agent
         """
-        result = DimensionData(0, 0)
-        agents = 0
-        for line in smoldyn_data_lines:
+        time = float(lines[0].split()[0])
+        raw_type_names = []
+        unique_ids = []
+        positions = []
+        for line in lines[1:]:
+            if len(line) < 1:
+                continue
             cols = line.split()
-            if len(cols) == 2:
-                if agents > result.max_agents:
-                    result.max_agents = agents
-                agents = 0
-                result.total_steps += 1
-            else:
-                agents += 1
-        if agents > result.max_agents:
-            result.max_agents = agents
-        return result
+            if len(cols) < 4:
+                raise InputDataError(
+                    "Smoldyn data is not formatted as expected, "
+                    "please use the Smoldyn `listmols` command for output"
+                )
+            is_3D = len(cols) > 4
+            raw_type_names.append(cols[0])
+            unique_ids.append(int(cols[4] if is_3D else cols[3]))
+            positions.append(
+                (float(cols[1]), float(cols[2]), float(cols[3]) if is_3D else 0.0)
+            )
+        return (
+            time,
+            raw_type_names,
+            unique_ids,
+            scale_factor * np.array(positions, dtype=float).reshape((-1, 3)),
+        )
 
-    def _parse_objects(
-        self,
-        smoldyn_data_lines: List[str],
-        input_data: SmoldynData,
-    ) -> AgentData:
+    def _parse_objects(self, input_data: SmoldynData) -> AgentData:
         """
-        Parse a Smoldyn output file to get AgentData
+        Parse a Smoldyn output file to get AgentData,
+        in parallel if there is more than one worker
         """
-        dimensions = SmoldynConverter._parse_dimensions(smoldyn_data_lines)
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(
+            DimensionData(total_steps=0, max_agents=0),
+            use_type_ids=True,
+            dtype=input_data.dtype,
+        )
+        # type ID and radius for each raw type name
+        type_info = {}
         time_index = -1
-        agent_index = 0
-        line_count = 0
-
-        for line in smoldyn_data_lines:
-            if len(line) < 1:
-                continue
-            cols = line.split()
-            if len(cols) == 2:
-                if time_index >= 0:
-                    result.n_agents[time_index] = agent_index
-                agent_index = 0
-                time_index += 1
-                result.times[time_index] = float(cols[0])
-            else:
-                if len(cols) < 4:
-                    raise InputDataError(
-                        "Smoldyn data is not formatted as expected, "
-                        "please use the Smoldyn `listmols` command for output"
-                    )
-                is_3D = len(cols) > 4
-                result.unique_ids[time_index][agent_index] = int(
-                    cols[4] if is_3D else cols[3]
-                )
-                raw_type_name = str(cols[0])
-                result.types[time_index].append(
-                    TrajectoryConverter._get_display_type_name_from_raw(
-                        raw_type_name, input_data.display_data
-                    )
-                )
-                result.positions[time_index][
-                    agent_index
-                ] = input_data.meta_data.scale_factor * np.array(
-                    [
-                        float(cols[1]),
-                        float(cols[2]),
-                        float(cols[3]) if is_3D else 0.0,
-                    ]
+        for time_index, frame in enumerate(
+            parse_frames(
+                input_data.smoldyn_file,
+                FRAME_START_PATTERN,
+                SmoldynConverter._parse_frame,
+                input_data.meta_data.scale_factor,
+                workers=self.workers,
+                progress_callback=self.check_report_progress,
+            )
+        ):
+            time, raw_type_names, unique_ids, positions = frame
+            n_agents = len(unique_ids)
+            result._grow_to_fit(time_index + 1, n_agents)
+            result.times[time_index] = time
+            result.n_agents[time_index] = n_agents
+            result.unique_ids[time_index, :n_agents] = unique_ids
+            result.positions[time_index, :n_agents] = positions
+            for raw_type_name in raw_type_names:
+                if raw_type_name in type_info:
+                    continue
+                type_name = TrajectoryConverter._get_display_type_name_from_raw(
+                    raw_type_name, input_data.display_data
                 )
-
                 # Get the user provided display data for this raw_type_name
                 input_display_data = TrajectoryConverter._get_display_data_for_agent(
                     raw_type_name, input_data.display_data
                 )
-
-                result.radii[time_index][
-                    agent_index
-                ] = input_data.meta_data.scale_factor * (
+                type_info[raw_type_name] = (
+                    result.get_type_id(type_name),
                     input_display_data.radius
                     if input_display_data and input_display_data.radius is not None
-                    else 1.0
+                    else 1.0,
                 )
-                agent_index += 1
-            line_count += 1
-            self.check_report_progress(line_count / len(smoldyn_data_lines))
-
-        result.n_agents[time_index] = agent_index
-        result.n_timesteps = time_index + 1
+            result.type_ids[time_index, :n_agents] = [
+                type_info[raw_type_name][0] for raw_type_name in raw_type_names
+            ]
+            result.radii[time_index, :n_agents] = input_data.meta_data.scale_factor * (
+                np.array(
+                    [type_info[raw_type_name][1] for raw_type_name in raw_type_names]
+                )
+            )
+        result._trim_to_fit(time_index + 1)
         return result
 
     def _read(self, input_data: SmoldynData) -> TrajectoryData:
@@ -144,13 +158,13 @@ class SmoldynConverter(TrajectoryConverter):
         Return a TrajectoryData object containing the Smoldyn data
         """
         print("Reading Smoldyn Data -------------")
-        # load the data from Smoldyn output .txt file
+        # parse the Smoldyn output .txt file
         try:
-            smoldyn_data = input_data.smoldyn_file.get_contents().split("\n")
+            agent_data = self._parse_objects(input_data)
+        except InputDataError:
+            raise
         except Exception as e:
             raise InputDataError(f"Error reading input smoldyn data: {e}")
-        # parse
-        agent_data = self._parse_objects(smoldyn_data, input_data)
         # get display data (geometry and color)
         for tid in input_data.display_data:
             display_data = input_data.display_data[tid]
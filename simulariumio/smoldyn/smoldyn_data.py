@@ -4,6 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
 
 from ..data_objects import (
     MetaData,
@@ -28,6 +29,7 @@ class SmoldynData:
     time_units: UnitData
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -37,6 +39,7 @@ class SmoldynData:
         time_units: UnitData = None,
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -70,6 +73,11 @@ class SmoldynData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.smoldyn_file = smoldyn_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
@@ -79,6 +87,7 @@ class SmoldynData:
             spatial_units if spatial_units is not None else UnitData("m")
         )
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
 
     @classmethod
     def from_dict(
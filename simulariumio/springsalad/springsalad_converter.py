@@ -6,6 +6,7 @@ from typing import List, Tuple, Callable
 import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
+from ..frame_index import parse_frames
 from ..data_objects import (
     TrajectoryData,
     AgentData,
@@ -28,6 +29,11 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+# each scene (timepoint) starts at a line with its CurrentTime
+FRAME_START_PATTERN = rb"\n(?=[^\n]*CurrentTime)"
+
+###############################################################################
+
 
 class SpringsaladConverter(TrajectoryConverter):
     def __init__(
@@ -35,6 +41,7 @@ class SpringsaladConverter(TrajectoryConverter):
         input_data: SpringsaladData,
         progress_callback: Callable[[float], None] = None,
         callback_interval: float = 10,
+        workers: int = 1,
     ):
         """
         This object reads simulation trajectory outputs
@@ -56,99 +63,74 @@ class SpringsaladConverter(TrajectoryConverter):
             If a progress_callback was provided, the period between updates
             to be sent to the callback, in seconds
             Default: 10
+        workers : int (optional)
+            How many processes to parse the frames in,
+            with more than one the file is indexed first
+            and each process reads and parses batches of frames
+            Default: 1
         """
         super().__init__(input_data, progress_callback, callback_interval)
-        self._data = self._read(input_data)
+        self.workers = workers
+        self._data = self._read_instrumented(input_data)
 
     @staticmethod
-    def _parse_dimensions(
-        springsalad_data: List[str], draw_bonds: bool
-    ) -> DimensionData:
-        """
-        Parse SpringSaLaD SIM_VIEW txt file to get the number of timesteps
-        and maximum agents per timestep
-        """
-        result = DimensionData(
-            0, 0, 2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) if draw_bonds else 0
-        )
-        agents = 0
-        for line in springsalad_data:
-            if "CurrentTime" in line:  # beginning of a frame
-                if agents > result.max_agents:
-                    result.max_agents = agents
-                agents = 0
-                result.total_steps += 1
-            if "ID" in line:  # line has data for one agent
-                agents += 1
-            if draw_bonds and "Link" in line:  # line has data for a bond
-                agents += 1
-        if agents > result.max_agents:
-            result.max_agents = agents
-        return result
-
-    def _parse_springsalad_data(
-        self,
-        springsalad_data: List[str],
-        input_data: SpringsaladData,
-    ) -> Tuple[AgentData, np.ndarray]:
+    def _parse_frame(
+        lines: List[str], context: Tuple[float, bool]
+    ) -> Tuple[
+        float,
+        List[Tuple[int, float, bool]],
+        List[str],
+        List[int],
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+    ]:
         """
-        Parse SpringSaLaD SIM_VIEW txt file to get spatial data
+        Parse the lines of one scene (timepoint) of a SpringSaLaD SIM_VIEW
+        txt file, or of the header before the first scene,
+        context is the scale factor and whether to draw bonds.
+        Return the time (or None for the header), the box size values
+        as (axis, value, is added to the axis), and for each agent
+        the raw type name (None for bonds), unique ID, position,
+        radius, and number of subpoints, and the subpoints for all agents
         """
-        dimensions = SpringsaladConverter._parse_dimensions(
-            springsalad_data, input_data.draw_bonds
-        )
-        result = AgentData.from_dimensions(dimensions)
-        box_size = np.zeros(VALUES_PER_3D_POINT)
-        time_index = -1
-        agent_index = 0
-        max_uid = 0
+        scale_factor, draw_bonds = context
+        time = None
+        box_size_values = []
+        raw_type_names = []
+        unique_ids = []
+        positions = []
+        radii = []
+        n_subpoints = []
+        subpoints = []
         scene_agent_positions = {}
-        line_count = 0
-
-        for line in springsalad_data:
+        max_uid = 0
+        for line in lines:
             cols = line.split()
             if "xsize" in line:
-                box_size[0] = 2 * float(cols[1])
+                box_size_values.append((0, 2 * float(cols[1]), False))
             if "ysize" in line:
-                box_size[1] = 2 * float(cols[1])
+                box_size_values.append((1, 2 * float(cols[1]), False))
             if "z_outside" in line:
-                box_size[2] += 2 * float(cols[1])
+                box_size_values.append((2, 2 * float(cols[1]), True))
             if "z_inside" in line:
-                box_size[2] += 2 * float(cols[1])
+                box_size_values.append((2, 2 * float(cols[1]), True))
             if "CurrentTime" in line:  # beginning of a scene (timepoint)
-                agent_index = 0
-                time_index += 1
-                result.times[time_index] = float(
-                    line.split("CurrentTime")[1].split()[0]
-                )
-                scene_agent_positions = {}
-                max_uid = 0
+                time = float(line.split("CurrentTime")[1].split()[0])
             if "ID" in line:  # line has data for one agent in scene
-                result.n_agents[time_index] += 1
-                result.unique_ids[time_index][agent_index] = int(cols[1])
-                raw_type_name = cols[3]
-                result.types[time_index].append(
-                    TrajectoryConverter._get_display_type_name_from_raw(
-                        raw_type_name, input_data.display_data
-                    )
-                )
-                position = input_data.meta_data.scale_factor * np.array(
-                    [float(cols[4]), float(cols[5]), float(cols[6])]
+                position = (
+                    scale_factor * float(cols[4]),
+                    scale_factor * float(cols[5]),
+                    scale_factor * float(cols[6]),
                 )
                 scene_agent_positions[int(cols[1])] = position
-                result.positions[time_index][agent_index] = position
-                input_display_data = TrajectoryConverter._get_display_data_for_agent(
-                    raw_type_name, input_data.display_data
-                )
-                result.radii[time_index][
-                    agent_index
-                ] = input_data.meta_data.scale_factor * (
-                    input_display_data.radius
-                    if input_display_data and input_display_data.radius is not None
-                    else float(cols[2])
-                )
-                agent_index += 1
-            if input_data.draw_bonds and "Link" in line:  # line has data for a bond
+                raw_type_names.append(cols[3])
+                unique_ids.append(int(cols[1]))
+                positions.append(position)
+                radii.append(scale_factor * float(cols[2]))
+                n_subpoints.append(0)
+            if draw_bonds and "Link" in line:  # line has data for a bond
                 particle1_id = int(cols[1])
                 particle2_id = int(cols[3])
                 if (
@@ -157,27 +139,106 @@ class SpringsaladConverter(TrajectoryConverter):
                 ):
                     raise InputDataError(
                         "Could not find particle ID connected by Link "
-                        f"at timepoint {time_index} in SpringSaLaD data, "
+                        f"at time {time} in SpringSaLaD data, "
                         "try converting without drawing bonds"
                     )
-                result.n_agents[time_index] += 1
-                result.viz_types[time_index][agent_index] = VIZ_TYPE.FIBER
-                result.unique_ids[time_index][agent_index] = max_uid
+                raw_type_names.append(None)
+                unique_ids.append(max_uid)
                 max_uid += 1
-                result.types[time_index].append("Link")
-                result.n_subpoints[time_index][
-                    agent_index
-                ] = 2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
-                result.subpoints[time_index][agent_index][
-                    0:VALUES_PER_3D_POINT
-                ] = scene_agent_positions[particle1_id]
-                result.subpoints[time_index][agent_index][
-                    VALUES_PER_3D_POINT : 2 * VALUES_PER_3D_POINT
-                ] = scene_agent_positions[particle2_id]
-                agent_index += 1
-            line_count += 1
-            self.check_report_progress(line_count / len(springsalad_data))
-        result.n_timesteps = time_index + 1
+                positions.append((0.0, 0.0, 0.0))
+                radii.append(1.0)
+                n_subpoints.append(2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER))
+                subpoints += scene_agent_positions[particle1_id]
+                subpoints += scene_agent_positions[particle2_id]
+        return (
+            time,
+            box_size_values,
+            raw_type_names,
+            unique_ids,
+            np.array(positions, dtype=float).reshape((-1, VALUES_PER_3D_POINT)),
+            np.array(radii, dtype=float),
+            np.array(n_subpoints, dtype=int),
+            np.array(subpoints, dtype=float),
+        )
+
+    def _parse_springsalad_data(
+        self,
+        input_data: SpringsaladData,
+    ) -> Tuple[AgentData, np.ndarray]:
+        """
+        Parse SpringSaLaD SIM_VIEW txt file to get spatial data,
+        in parallel if there is more than one worker
+        """
+        result = AgentData.from_dimensions(
+            DimensionData(total_steps=0, max_agents=0),
+            use_type_ids=True,
+            ragged_subpoints=True,
+            dtype=input_data.dtype,
+        )
+        box_size = np.zeros(VALUES_PER_3D_POINT)
+        # type ID and radius (or None) for each raw type name
+        type_info = {None: (None, None)}
+        time_index = -1
+        for frame in parse_frames(
+            input_data.sim_view_txt_file,
+            FRAME_START_PATTERN,
+            SpringsaladConverter._parse_frame,
+            (input_data.meta_data.scale_factor, input_data.draw_bonds),
+            workers=self.workers,
+            include_header=True,
+            progress_callback=self.check_report_progress,
+        ):
+            (
+                time,
+                box_size_values,
+                raw_type_names,
+                unique_ids,
+                positions,
+                radii,
+                n_subpoints,
+                subpoints,
+            ) = frame
+            for axis, value, is_added in box_size_values:
+                box_size[axis] = box_size[axis] + value if is_added else value
+            if time is None:
+                # the header before the first scene
+                continue
+            time_index += 1
+            n_agents = len(unique_ids)
+            result._grow_to_fit(time_index + 1, n_agents)
+            result.times[time_index] = time
+            result.n_agents[time_index] = n_agents
+            result.unique_ids[time_index, :n_agents] = unique_ids
+            result.positions[time_index, :n_agents] = positions
+            result.set_frame_subpoints(time_index, 0, n_subpoints, subpoints)
+            for raw_type_name in raw_type_names:
+                if raw_type_name in type_info:
+                    continue
+                type_name = TrajectoryConverter._get_display_type_name_from_raw(
+                    raw_type_name, input_data.display_data
+                )
+                input_display_data = TrajectoryConverter._get_display_data_for_agent(
+                    raw_type_name, input_data.display_data
+                )
+                type_info[raw_type_name] = (
+                    result.get_type_id(type_name),
+                    input_data.meta_data.scale_factor * input_display_data.radius
+                    if input_display_data and input_display_data.radius is not None
+                    else None,
+                )
+            type_ids = []
+            for agent_index, raw_type_name in enumerate(raw_type_names):
+                type_id, radius = type_info[raw_type_name]
+                if raw_type_name is None:
+                    # bond
+                    result.viz_types[time_index, agent_index] = VIZ_TYPE.FIBER
+                    type_id = result.get_type_id("Link")
+                if radius is not None:
+                    radii[agent_index] = radius
+                type_ids.append(type_id)
+            result.type_ids[time_index, :n_agents] = type_ids
+            result.radii[time_index, :n_agents] = radii
+        result._trim_to_fit(time_index + 1)
         return result, box_size
 
     def _read(self, input_data: SpringsaladData) -> TrajectoryData:
@@ -186,12 +247,11 @@ class SpringsaladConverter(TrajectoryConverter):
         """
         print("Reading SpringSaLaD Data -------------")
         try:
-            springsalad_data = input_data.sim_view_txt_file.get_contents().split("\n")
+            agent_data, box_size = self._parse_springsalad_data(input_data)
+        except InputDataError:
+            raise
         except Exception as e:
             raise InputDataError(f"Error reading input SpringSaLaD data: {e}")
-        agent_data, box_size = self._parse_springsalad_data(
-            springsalad_data, input_data
-        )
         # get display data (geometry and color)
         for tid in input_data.display_data:
             display_data = input_data.display_data[tid]
@@ -4,6 +4,8 @@
 import logging
 from typing import Any, Dict, List
 
+import numpy as np
+
 from ..data_objects import DisplayData, MetaData, InputFileData
 
 ###############################################################################
@@ -19,6 +21,7 @@ class SpringsaladData:
     display_data: Dict[str, DisplayData]
     draw_bonds: bool
     plots: List[Dict[str, Any]]
+    dtype: np.dtype
 
     def __init__(
         self,
@@ -27,6 +30,7 @@ class SpringsaladData:
         display_data: Dict[str, DisplayData] = None,
         draw_bonds: bool = True,
         plots: List[Dict[str, Any]] = None,
+        dtype: np.dtype = np.float64,
     ):
         """
         This object holds simulation trajectory outputs
@@ -54,9 +58,15 @@ class SpringsaladData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype : np.dtype (optional)
+            The float dtype for spatial arrays in the converted data,
+            use np.float32 to halve memory use
+            (unique IDs and counts are then stored as np.int32)
+            Default: np.float64
         """
         self.sim_view_txt_file = sim_view_txt_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
         self.display_data = display_data if display_data is not None else {}
         self.draw_bonds = draw_bonds
         self.plots = plots if plots is not None else []
+        self.dtype = dtype
@@ -325,20 +325,13 @@ aster_pull3D_objects = CytosimData(
         ),
     },
 )
-# load the data from Cytosim output .txt files
-cytosim_data = {}
-for object_type in aster_pull3D_objects.object_info:
-    cytosim_data[object_type] = (
-        aster_pull3D_objects.object_info[object_type]
-        .cytosim_file.get_contents()
-        .split("\n")
-    )
 
 
-def test_parse_dimensions():
-    dimension_data = CytosimConverter._parse_dimensions(cytosim_data)
+def test_dimensions():
+    agent_data = CytosimConverter(aster_pull3D_objects)._data.agent_data
+    dimension_data = agent_data.get_dimensions()
     assert dimension_data.total_steps == 3
-    assert dimension_data.max_agents == 19
+    assert dimension_data.max_agents == 17
     assert dimension_data.max_subpoints == 18
 
 
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock
 
 from simulariumio.physicell import PhysicellConverter, PhysicellData
+from simulariumio.physicell.dep.pyMCDS import pyMCDS
 from simulariumio import MetaData, DisplayData, JsonWriter, UnitData
 from simulariumio.constants import (
     DEFAULT_BOX_SIZE,
@@ -753,3 +754,63 @@ def test_callback_fn():
         assert call_value > last_call_val
         assert call_value <= 1.0 and call_value >= 0.0
         last_call_val = call_value
+
+
+def test_cache_dir(tmp_path):
+    def get_input_data(cache_dir):
+        return PhysicellData(
+            timestep=360.0,
+            path_to_output_dir="simulariumio/tests/data/physicell/default_output/",
+            cache_dir=cache_dir,
+        )
+
+    expected_results = JsonWriter.format_trajectory_data(
+        PhysicellConverter(get_input_data(None))._data
+    )
+    cache_dir = str(tmp_path)
+    cold_results = JsonWriter.format_trajectory_data(
+        PhysicellConverter(get_input_data(cache_dir))._data
+    )
+    assert len(list(tmp_path.glob("*.npz"))) > 0
+    warm_results = JsonWriter.format_trajectory_data(
+        PhysicellConverter(get_input_data(cache_dir))._data
+    )
+    assert cold_results == expected_results
+    assert warm_results == expected_results
+
+
+def test_parallel_loading_matches_serial():
+    def get_input_data():
+        return PhysicellData(
+            timestep=36.0,
+            path_to_output_dir="simulariumio/tests/data/physicell/subcell_output/",
+            max_owner_cells=10000,
+        )
+
+    serial_data = PhysicellConverter(get_input_data())._data
+    parallel_data = PhysicellConverter(get_input_data(), workers=2)._data
+    assert JsonWriter.format_trajectory_data(
+        parallel_data
+    ) == JsonWriter.format_trajectory_data(serial_data)
+
+
+def test_read_only_cell_variables():
+    output_dir = "simulariumio/tests/data/physicell/default_output/"
+    full_mcds = pyMCDS("output00000000.xml", False, output_dir)
+    cell_variables = ["position_x", "cell_type"]
+    lean_mcds = pyMCDS(
+        "output00000000.xml", False, output_dir, cell_variables=cell_variables
+    )
+    assert "mesh" not in lean_mcds.data
+    assert list(lean_mcds.data["discrete_cells"]) == cell_variables
+    for name in cell_variables:
+        assert np.array_equal(
+            lean_mcds.data["discrete_cells"][name],
+            full_mcds.data["discrete_cells"][name],
+        )
+    assert (
+        lean_mcds.data["metadata"]["spatial_units"]
+        == full_mcds.data["metadata"]["spatial_units"]
+    )
+    with pytest.raises(ValueError):
+        pyMCDS("output00000000.xml", False, output_dir, cell_variables=["unknown"])
@@ -6,7 +6,15 @@ import pytest
 from unittest.mock import Mock
 
 from simulariumio.readdy import ReaddyConverter, ReaddyData
-from simulariumio import UnitData, MetaData, DisplayData, JsonWriter
+from simulariumio import (
+    UnitData,
+    MetaData,
+    DisplayData,
+    JsonWriter,
+    BinaryWriter,
+    InputFileData,
+)
+from simulariumio.readers import SimulariumBinaryReader
 from simulariumio.constants import (
     DEFAULT_CAMERA_SETTINGS,
     DISPLAY_TYPE,
@@ -461,3 +469,69 @@ def test_callback_fn():
         assert call_value > last_call_val
         assert call_value <= 1.0 and call_value >= 0.0
         last_call_val = call_value
+
+
+@pytest.mark.parametrize(
+    "start_frame, stop_frame, frame_stride, expected_time_indices",
+    [
+        (1, None, 1, [1, 2]),
+        (0, None, 2, [0, 2]),
+        (1, 2, 1, [1]),
+        (0, 100, 3, [0]),
+    ],
+)
+def test_frame_window(start_frame, stop_frame, frame_stride, expected_time_indices):
+    window_data = ReaddyData(
+        timestep=0.1,
+        path_to_readdy_h5="simulariumio/tests/data/readdy/test.h5",
+        start_frame=start_frame,
+        stop_frame=stop_frame,
+        frame_stride=frame_stride,
+    )
+    window_results = JsonWriter.format_trajectory_data(
+        ReaddyConverter(window_data)._data
+    )
+    window_frames = window_results["spatialData"]["bundleData"]
+    assert len(window_frames) == len(expected_time_indices)
+    for window_frame, time_index in zip(window_frames, expected_time_indices):
+        expected_frame = results["spatialData"]["bundleData"][time_index]
+        assert window_frame["time"] == expected_frame["time"]
+        assert window_frame["data"] == expected_frame["data"]
+
+
+def test_frame_window_error():
+    with pytest.raises(InputDataError):
+        ReaddyConverter(
+            ReaddyData(
+                timestep=0.1,
+                path_to_readdy_h5="simulariumio/tests/data/readdy/test.h5",
+                start_frame=3,
+            )
+        )
+
+
+@pytest.mark.parametrize("chunk_n_frames", [1, 2, 1000])
+def test_save_in_chunks(tmp_path, chunk_n_frames):
+    save_path = str(tmp_path / "save")
+    BinaryWriter.save(converter_display_data._data, save_path, True)
+    chunked_path = str(tmp_path / "chunked")
+    progress = []
+    output_names = ReaddyConverter.save_in_chunks(
+        ReaddyData(
+            timestep=0.1,
+            path_to_readdy_h5="simulariumio/tests/data/readdy/test.h5",
+            display_data=data_with_display_data.display_data,
+        ),
+        chunked_path,
+        chunk_n_frames=chunk_n_frames,
+        progress_callback=progress.append,
+        callback_interval=-1,
+    )
+    assert output_names == [f"{chunked_path}.simularium"]
+    assert progress and progress == sorted(progress)
+    assert 0.0 <= progress[0] and progress[-1] < 1.0
+    assert SimulariumBinaryReader.load_binary(
+        InputFileData(file_path=output_names[0])
+    ) == SimulariumBinaryReader.load_binary(
+        InputFileData(file_path=f"{save_path}.simularium")
+    )
@@ -503,3 +503,24 @@ def test_callback_fn():
         assert call_value > last_call_val
         assert call_value <= 1.0
         last_call_val = call_value
+
+
+def test_float32_dtype(tmp_path):
+    float32_data = SmoldynData(
+        smoldyn_file=InputFileData(
+            file_path="simulariumio/tests/data/smoldyn/example_data.txt"
+        ),
+        dtype=np.float32,
+    )
+    float32_converter = SmoldynConverter(float32_data)
+    agent_data = float32_converter._data.agent_data
+    assert agent_data.positions.dtype == np.float32
+    assert agent_data.radii.dtype == np.float32
+    assert agent_data.unique_ids.dtype == np.int32
+    assert agent_data.n_agents.dtype == np.int32
+    # binary files store 32-bit floats, so the output is the same
+    converter.save(str(tmp_path / "float64"))
+    float32_converter.save(str(tmp_path / "float32"))
+    with open(tmp_path / "float64.simularium", "rb") as float64_file:
+        with open(tmp_path / "float32.simularium", "rb") as float32_file:
+            assert float32_file.read() == float64_file.read()
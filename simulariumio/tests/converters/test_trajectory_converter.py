@@ -1,9 +1,19 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
+
+import numpy as np
 import pytest
 
 from simulariumio import TrajectoryConverter, JsonWriter, DisplayData
+from simulariumio.filters import (
+    EveryNthAgentFilter,
+    EveryNthTimestepFilter,
+    MultiplySpaceFilter,
+    MultiplyTimeFilter,
+    TranslateFilter,
+)
 from simulariumio.tests.conftest import (
     fiber_agents_type_mapping,
     minimal_custom_data,
@@ -1435,3 +1445,69 @@ def test_get_display_data_for_agent(key, expected_data):
     assert expected_data == TrajectoryConverter._get_display_data_for_agent(
         key, display_dict
     )
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        [
+            EveryNthTimestepFilter(n=2),
+            MultiplyTimeFilter(multiplier=2.0),
+            MultiplySpaceFilter(multiplier=3.0),
+        ],
+        [
+            EveryNthAgentFilter(n_per_type={}, default_n=2),
+            TranslateFilter(default_translation=np.array([1.0, 2.0, 3.0])),
+            MultiplySpaceFilter(multiplier=3.0),
+        ],
+        [
+            TranslateFilter(default_translation=np.array([1.0, 2.0, 3.0])),
+            MultiplySpaceFilter(multiplier=3.0),
+        ],
+        [],
+    ],
+)
+def test_filter_data_copy_on_write(filters):
+    data = mixed_agents()
+    data.plots = []
+    converter = TrajectoryConverter(data)
+    converter.add_number_of_agents_plot()
+    original_buffer_data = JsonWriter.format_trajectory_data(converter._data)
+    expected_data = copy.deepcopy(converter._data)
+    for f in filters:
+        expected_data = f.apply(expected_data)
+    expected_buffer_data = JsonWriter.format_trajectory_data(expected_data)
+    # filtering doesn't change the current data
+    for copy_on_write in [False, True]:
+        filtered_data = converter.filter_data(filters, copy_on_write=copy_on_write)
+        filtered_buffer_data = JsonWriter.format_trajectory_data(filtered_data)
+        assert filtered_buffer_data == expected_buffer_data
+        current_buffer_data = JsonWriter.format_trajectory_data(converter._data)
+        assert current_buffer_data == original_buffer_data
+    # filtering in place replaces the current data
+    filtered_data = converter.filter_data(filters, in_place=True)
+    assert filtered_data is converter._data
+    assert JsonWriter.format_trajectory_data(filtered_data) == expected_buffer_data
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        [EveryNthTimestepFilter(n=2)],
+        [MultiplyTimeFilter(multiplier=2.0, apply_to_plots=False)],
+        [],
+    ],
+)
+def test_filter_data_returns_independent_data(filters):
+    converter = TrajectoryConverter(mixed_agents())
+    box_size = np.copy(converter._data.meta_data.box_size)
+    positions = np.copy(converter._data.agent_data.positions)
+    filtered_data = converter.filter_data(filters)
+    assert not np.shares_memory(
+        filtered_data.agent_data.positions, converter._data.agent_data.positions
+    )
+    # modifying the filtered data doesn't change the current data
+    filtered_data.meta_data.box_size[0] = 999.0
+    filtered_data.agent_data.positions[:] = -1.0
+    assert np.array_equal(converter._data.meta_data.box_size, box_size)
+    assert np.array_equal(converter._data.agent_data.positions, positions)
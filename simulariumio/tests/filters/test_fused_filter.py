@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+
+import pytest
+import numpy as np
+
+from simulariumio import TrajectoryConverter, JsonWriter
+from simulariumio.filters import (
+    FusedFilter,
+    EveryNthTimestepFilter,
+    EveryNthAgentFilter,
+    EveryNthSubpointFilter,
+    TranslateFilter,
+    MultiplySpaceFilter,
+    MultiplyTimeFilter,
+    TransformSpatialAxesFilter,
+)
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+
+
+FILTERS = [
+    [
+        EveryNthTimestepFilter(n=2),
+        MultiplyTimeFilter(multiplier=2.0),
+        MultiplySpaceFilter(multiplier=3.0),
+    ],
+    [
+        TranslateFilter(
+            translation_per_type={"C": np.array([4.0, 5.0, 6.0])},
+            default_translation=np.array([1.0, 2.0, 3.0]),
+        ),
+        TransformSpatialAxesFilter(axes_mapping=["-Z", "+X", "-Y"]),
+        MultiplySpaceFilter(multiplier=0.5),
+        TranslateFilter(
+            translation_per_type={
+                "A": np.array([-1.0, 0.0, 1.0]),
+                "fiber": np.array([0.0, 10.0, 0.0]),
+            },
+        ),
+    ],
+    [
+        EveryNthAgentFilter(n_per_type={"B": 2}, default_n=1),
+        EveryNthAgentFilter(n_per_type={}, default_n=2),
+        TranslateFilter(default_translation=np.array([1.0, 2.0, 3.0])),
+        MultiplyTimeFilter(multiplier=0.1),
+    ],
+]
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        mixed_agents(),
+        fiber_agents(),
+        sphere_group_agents(),
+    ],
+)
+@pytest.mark.parametrize("filters", FILTERS)
+def test_fused_filter_matches_sequential(trajectory_data, filters):
+    data = copy.deepcopy(trajectory_data)
+    data.plots = []
+    converter = TrajectoryConverter(data)
+    converter.add_number_of_agents_plot()
+    expected_data = copy.deepcopy(converter._data)
+    for f in filters:
+        expected_data = f.apply(expected_data)
+    fused_data = converter.filter_data(filters, fuse=True)
+    assert JsonWriter.format_trajectory_data(
+        fused_data
+    ) == JsonWriter.format_trajectory_data(expected_data)
+
+
+def test_fused_filter_keeps_storage():
+    data = copy.deepcopy(fiber_agents())
+    data.plots = []
+    agent_data = data.agent_data
+    # types stored as type IDs and spatial arrays as float32
+    type_ids, type_names = agent_data.get_agent_type_ids()
+    agent_data.types = None
+    agent_data.type_ids = type_ids
+    agent_data.type_names = type_names
+    for name in ["viz_types", "positions", "radii", "rotations", "subpoints"]:
+        setattr(agent_data, name, getattr(agent_data, name).astype(np.float32))
+    expected_data = copy.deepcopy(data)
+    for f in FILTERS[1]:
+        expected_data = f.apply(expected_data)
+    fused_data = FusedFilter(FILTERS[1]).apply(data)
+    assert fused_data.agent_data._types is None
+    assert fused_data.agent_data.type_ids is not None
+    assert fused_data.agent_data.get_dtype() == np.float32
+    assert fused_data.agent_data.subpoints.dtype == np.float32
+    expected_buffer_data = JsonWriter.format_trajectory_data(expected_data)
+    expected_frames = expected_buffer_data["spatialData"]["bundleData"]
+    fused_buffer_data = JsonWriter.format_trajectory_data(fused_data)
+    fused_frames = fused_buffer_data["spatialData"]["bundleData"]
+    assert len(fused_frames) == len(expected_frames)
+    for fused_frame, expected_frame in zip(fused_frames, expected_frames):
+        assert np.allclose(fused_frame["data"], expected_frame["data"], rtol=1e-5)
+
+
+def test_fuse_filters():
+    filters = [
+        MultiplySpaceFilter(multiplier=3.0),
+        EveryNthSubpointFilter(n_per_type={}),
+        EveryNthTimestepFilter(n=2),
+        TranslateFilter(),
+        MultiplyTimeFilter(multiplier=2.0),
+    ]
+    fused = FusedFilter.fuse(filters)
+    assert len(fused) == 3
+    assert fused[0] is filters[0]
+    assert fused[1] is filters[1]
+    assert isinstance(fused[2], FusedFilter)
+    assert fused[2].filters == filters[2:]
+    with pytest.raises(ValueError):
+        FusedFilter(filters)
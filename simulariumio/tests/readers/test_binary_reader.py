@@ -1,14 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import numpy as np
 import pytest
 
 from simulariumio import (
+    AgentData,
     FileConverter,
     InputFileData,
     TrajectoryConverter,
     JsonWriter,
 )
+from simulariumio.readers import SimulariumBinaryReader, LazySimulariumBinaryReader
 from simulariumio.tests.conftest import binary_test_data, assert_buffers_equal
 
 
@@ -56,3 +59,62 @@ def test_binary_parsing(
             expected_converter._data
         )
         assert_buffers_equal(test_buffer_data, expected_buffer_data)
+
+
+@pytest.mark.parametrize(
+    "input_path, from_contents",
+    [
+        ("simulariumio/tests/data/binary/binary_test.binary", False),
+        ("simulariumio/tests/data/binary/binary_test.binary", True),
+        (
+            "simulariumio/tests/data/binary/50filaments_motor_linker_binary.binary",
+            False,
+        ),
+    ],
+)
+def test_lazy_binary_reader(input_path, from_contents):
+    if from_contents:
+        with open(input_path, "rb") as open_binary_file:
+            input_file = InputFileData(file_contents=open_binary_file.read())
+    else:
+        input_file = InputFileData(file_path=input_path)
+    expected_data = SimulariumBinaryReader.load_binary(input_file)
+    expected_frames = expected_data["spatialData"]["bundleData"]
+    with LazySimulariumBinaryReader(input_file) as reader:
+        assert reader.n_frames == expected_data["spatialData"]["bundleSize"]
+        assert reader.trajectory_info == expected_data["trajectoryInfo"]
+        assert reader.plot_data == expected_data["plotData"]
+        for frame_index, expected_frame in enumerate(expected_frames):
+            assert reader.frame_numbers[frame_index] == expected_frame["frameNumber"]
+            assert reader.times[frame_index] == expected_frame["time"]
+            assert reader.n_agents[frame_index] == expected_frame["nAgents"]
+            assert np.array_equal(
+                reader.frame(frame_index),
+                np.array(expected_frame["data"], dtype=np.float32),
+            )
+        frames = reader.frames(slice(1, None, 2))
+        assert len(frames) == len(expected_frames[1::2])
+        for frame, expected_frame in zip(frames, expected_frames[1::2]):
+            assert np.array_equal(frame, np.array(expected_frame["data"]))
+        with pytest.raises(IndexError):
+            reader.frame(reader.n_frames)
+
+
+@pytest.mark.parametrize(
+    "input_path",
+    [
+        "simulariumio/tests/data/binary/binary_test.binary",
+        "simulariumio/tests/data/binary/50filaments_motor_linker_binary.binary",
+    ],
+)
+def test_agent_data_from_binary_encoded_frames(input_path):
+    input_file = InputFileData(file_path=input_path)
+    test_agent_data = AgentData.from_buffer_data(
+        SimulariumBinaryReader.load_binary(
+            input_file, parse_spatial_data_as_binary=True
+        )
+    )
+    expected_agent_data = AgentData.from_buffer_data(
+        SimulariumBinaryReader.load_binary(input_file)
+    )
+    assert test_agent_data == expected_agent_data
@@ -0,0 +1,109 @@
+import copy
+
+import numpy as np
+import pytest
+
+from simulariumio import (
+    AgentData,
+    TrajectoryConverter,
+    JsonWriter,
+    DimensionData,
+    DisplayData,
+    DISPLAY_TYPE,
+)
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+
+
+def with_type_ids(agent_data: AgentData) -> AgentData:
+    """
+    Copy the agent data, storing its types as type_ids
+    """
+    result = copy.deepcopy(agent_data)
+    type_ids, type_names = result.get_agent_type_ids()
+    # reverse the type names so the type_ids aren't in order of appearance
+    result.types = None
+    result.type_ids = len(type_names) - 1 - type_ids
+    result.type_names = type_names[::-1]
+    return result
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        mixed_agents(),
+        fiber_agents(),
+        sphere_group_agents(),
+    ],
+)
+def test_type_ids_match_types(trajectory_data):
+    list_data = copy.deepcopy(trajectory_data)
+    list_data.plots = []
+    ids_data = copy.deepcopy(list_data)
+    ids_data.agent_data = with_type_ids(list_data.agent_data)
+    list_converter = TrajectoryConverter(list_data)
+    list_converter.add_number_of_agents_plot()
+    ids_converter = TrajectoryConverter(ids_data)
+    ids_converter.add_number_of_agents_plot()
+    assert ids_data.agent_data.type_ids is not None
+    assert JsonWriter.format_trajectory_data(
+        ids_data
+    ) == JsonWriter.format_trajectory_data(list_data)
+    assert ids_data.plots == list_data.plots
+    # the types list view is used once it's accessed
+    assert ids_data.agent_data.types == [
+        frame_types[: int(list_data.agent_data.n_agents[time_index])]
+        for time_index, frame_types in enumerate(list_data.agent_data.types)
+    ]
+    assert ids_data.agent_data.type_ids is None
+
+
+def test_type_ids_from_dimensions():
+    agent_data = AgentData.from_dimensions(
+        DimensionData(total_steps=2, max_agents=1), use_type_ids=True
+    )
+    agent_data.n_agents[:] = 1
+    agent_data.type_ids[0, 0] = agent_data.get_type_id("A")
+    agent_data = agent_data.check_increase_buffer_size(2, axis=1)
+    agent_data.n_agents[1] = 3
+    agent_data.type_ids[1, :3] = [
+        agent_data.get_type_id(type_name) for type_name in ["B", "A", "C"]
+    ]
+    assert agent_data.type_names == ["A", "B", "C"]
+    assert agent_data.type_name_for_agent(1, 2) == "C"
+    assert np.array_equal(agent_data.type_ids[:, :3], [[0, 0, 0], [1, 0, 2]])
+    assert agent_data.types == [["A"], ["B", "A", "C"]]
+
+
+@pytest.mark.parametrize(
+    "types, expected_type_ids, expected_names",
+    [
+        ([], np.zeros((0, 0)), []),
+        (
+            [["B", "A"], ["A", "", "C"], []],
+            [[0, 1, 0], [1, 0, 2], [0, 0, 0]],
+            ["B", "A", "C"],
+        ),
+        ([["", "C"], ["C", "B"]], [[0, 0], [0, 1]], ["C", "B"]),
+    ],
+)
+def test_type_ids_and_mapping_from_types(types, expected_type_ids, expected_names):
+    agent_data = AgentData.from_dimensions(
+        DimensionData(total_steps=len(types), max_agents=3)
+    )
+    agent_data.types = types
+    agent_data.display_data = {
+        type_name: DisplayData(name=type_name, display_type=DISPLAY_TYPE.SPHERE)
+        for type_name in ["A", "B", "C"]
+    }
+    type_ids, type_mapping = agent_data.get_type_ids_and_mapping()
+    assert np.array_equal(type_ids, expected_type_ids)
+    assert list(type_mapping) == [str(tid) for tid in range(len(expected_names))]
+    assert [type_mapping[tid]["name"] for tid in type_mapping] == expected_names
+    for tid, type_name in enumerate(expected_names):
+        assert type_mapping[str(tid)]["geometry"] == dict(
+            agent_data.display_data[type_name]
+        )
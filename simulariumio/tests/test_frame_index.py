@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from simulariumio import InputFileData, JsonWriter
+from simulariumio.frame_index import FrameIndex, parse_frames
+from simulariumio.cytosim import CytosimConverter, CytosimData, CytosimObjectInfo
+from simulariumio.cytosim.cytosim_converter import (
+    FRAME_START_PATTERN as CYTOSIM_FRAME_START_PATTERN,
+)
+from simulariumio.medyan import MedyanConverter, MedyanData
+from simulariumio.medyan.medyan_converter import (
+    FRAME_START_PATTERN as MEDYAN_FRAME_START_PATTERN,
+)
+from simulariumio.smoldyn import SmoldynConverter, SmoldynData
+from simulariumio.smoldyn.smoldyn_converter import (
+    FRAME_START_PATTERN as SMOLDYN_FRAME_START_PATTERN,
+)
+from simulariumio.springsalad import SpringsaladConverter, SpringsaladData
+from simulariumio.springsalad.springsalad_converter import (
+    FRAME_START_PATTERN as SPRINGSALAD_FRAME_START_PATTERN,
+)
+
+
+def first_line(lines, context):
+    return lines[0]
+
+
+@pytest.mark.parametrize(
+    "input_path, frame_start_pattern, separator_at_start, expected_first_lines",
+    [
+        (
+            (
+                "simulariumio/tests/data/cytosim/aster_pull3D_couples_actin"
+                "_solid_3_frames/fiber_points.txt"
+            ),
+            CYTOSIM_FRAME_START_PATTERN,
+            False,
+            ["% frame   0", "% frame   1", "% frame   2"],
+        ),
+        (
+            "simulariumio/tests/data/smoldyn/example_3D.txt",
+            SMOLDYN_FRAME_START_PATTERN,
+            False,
+            ["0 0", "0.01 0", "0.02 0"],
+        ),
+        (
+            "simulariumio/tests/data/springsalad/Simulation0_SIM_VIEW_Run0.txt",
+            SPRINGSALAD_FRAME_START_PATTERN,
+            False,
+            [
+                "SceneNumber\t0\tCurrentTime\t0.0",
+                "SceneNumber\t1\tCurrentTime\t0.10000000998802996",
+            ],
+        ),
+        (
+            "simulariumio/tests/data/medyan/snapshot.traj",
+            MEDYAN_FRAME_START_PATTERN,
+            True,
+            ["0 0 2 0 0 0 0", "1 1.000038293 2 3 1 0 0", "2 2.000139228 1 4 2 0 0"],
+        ),
+    ],
+)
+@pytest.mark.parametrize("block_n_bytes", [1, 64, 16 * 1024 * 1024])
+def test_frame_index(
+    input_path,
+    frame_start_pattern,
+    separator_at_start,
+    expected_first_lines,
+    block_n_bytes,
+):
+    with open(input_path, "r") as open_file:
+        contents = open_file.read()
+    for input_file in [
+        InputFileData(file_path=input_path),
+        InputFileData(file_contents=contents),
+    ]:
+        frame_index = FrameIndex.from_file(
+            input_file, frame_start_pattern, separator_at_start, block_n_bytes
+        )
+        assert frame_index.n_frames == len(expected_first_lines)
+        assert frame_index.n_bytes == len(contents.encode())
+        for frame_index_, expected_first_line in enumerate(expected_first_lines):
+            start, end = frame_index.frame_range(frame_index_)
+            assert contents.encode()[start:end].decode().startswith(expected_first_line)
+        for workers in [1, 2]:
+            first_lines = list(
+                parse_frames(
+                    input_file,
+                    frame_start_pattern,
+                    first_line,
+                    workers=workers,
+                    separator_at_start=separator_at_start,
+                    block_n_bytes=block_n_bytes,
+                )
+            )
+            assert first_lines == expected_first_lines
+
+
+@pytest.mark.parametrize(
+    "converter_type, get_input_data",
+    [
+        (
+            CytosimConverter,
+            lambda: CytosimData(
+                object_info={
+                    object_type: CytosimObjectInfo(
+                        cytosim_file=InputFileData(
+                            file_path=(
+                                "simulariumio/tests/data/cytosim/aster_pull3D_couples"
+                                f"_actin_solid_3_frames/{object_type}.txt"
+                            )
+                        ),
+                        position_indices=(
+                            [3, 4, 5] if object_type == "couples" else [2, 3, 4]
+                        ),
+                    )
+                    for object_type in ["fiber_points", "solids", "singles", "couples"]
+                },
+            ),
+        ),
+        (
+            SmoldynConverter,
+            lambda: SmoldynData(
+                smoldyn_file=InputFileData(
+                    file_path="simulariumio/tests/data/smoldyn/example_3D.txt"
+                )
+            ),
+        ),
+        (
+            SpringsaladConverter,
+            lambda: SpringsaladData(
+                sim_view_txt_file=InputFileData(
+                    file_path=(
+                        "simulariumio/tests/data/springsalad/"
+                        "Simulation0_SIM_VIEW_Run0.txt"
+                    )
+                ),
+                draw_bonds=True,
+            ),
+        ),
+        (
+            MedyanConverter,
+            lambda: MedyanData(
+                snapshot_file=InputFileData(
+                    file_path="simulariumio/tests/data/medyan/snapshot.traj"
+                ),
+                agents_with_endpoints=["linker0", "motor1"],
+            ),
+        ),
+    ],
+)
+def test_parallel_parsing_matches_serial(converter_type, get_input_data):
+    serial_data = converter_type(get_input_data())._data
+    parallel_data = converter_type(get_input_data(), workers=2)._data
+    assert JsonWriter.format_trajectory_data(
+        parallel_data
+    ) == JsonWriter.format_trajectory_data(serial_data)
@@ -54,3 +54,24 @@ def test_input_data_binary(file_to_read, is_binary):
         content = open_binary_file.read()
         file_data = InputFileData(file_contents=content)
         assert file_data._is_binary() == is_binary
+
+
+@pytest.mark.parametrize("block_n_bytes", [1, 7, 100, 16 * 1024 * 1024])
+@pytest.mark.parametrize("from_contents", [False, True])
+def test_iter_line_blocks(block_n_bytes, from_contents):
+    input_path = (
+        "simulariumio/tests/data/cytosim/aster_pull3D_couples_actin"
+        "_solid_3_frames/couples.txt"
+    )
+    with open(input_path, "r") as open_file:
+        contents = open_file.read()
+    input_file = (
+        InputFileData(file_contents=contents)
+        if from_contents
+        else InputFileData(file_path=input_path)
+    )
+    blocks = list(input_file.iter_line_blocks(block_n_bytes))
+    assert [line for lines, _ in blocks for line in lines] == contents.splitlines()
+    n_read = [n_read for _, n_read in blocks]
+    assert n_read == sorted(n_read)
+    assert n_read[-1] == input_file.get_size()
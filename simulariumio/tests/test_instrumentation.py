@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from simulariumio import Instrumentation, InputFileData, StageMetrics
+from simulariumio.filters import EveryNthTimestepFilter, TranslateFilter
+from simulariumio.smoldyn import SmoldynConverter, SmoldynData
+
+smoldyn_data = SmoldynData(
+    smoldyn_file=InputFileData(
+        file_path="simulariumio/tests/data/smoldyn/example_3D.txt"
+    )
+)
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_instrumentation_stages(tmp_path, binary):
+    events = []
+    with Instrumentation(
+        sink=lambda event, metrics: events.append((event, metrics.name)),
+        trace_memory=True,
+    ) as instrumentation:
+        converter = SmoldynConverter(smoldyn_data)
+        converter.filter_data(
+            [EveryNthTimestepFilter(n=2), TranslateFilter()], in_place=True
+        )
+        converter.save(str(tmp_path / "test"), binary=binary)
+    expected_stages = [
+        "parse",
+        "filter",
+        "filter",
+        "validation",
+        "type_mapping",
+        "file_io",
+        "frame_packing",
+    ]
+    # stages are listed in the order they end
+    assert [stage.name for stage in instrumentation.stages] == expected_stages
+    # each stage starts before it ends
+    for stage_name in set(expected_stages):
+        stage_events = [event for event, name in events if name == stage_name]
+        assert stage_events[0] == Instrumentation.STAGE_START
+        assert stage_events.count(Instrumentation.STAGE_START) == stage_events.count(
+            Instrumentation.STAGE_END
+        )
+    stages = {stage.name: stage for stage in instrumentation.stages}
+    n_timesteps = stages["parse"].n_frames
+    assert n_timesteps > 1
+    assert stages["parse"].details["converter"] == "SmoldynConverter"
+    assert stages["filter"].details["filter"] == "TranslateFilter"
+    assert stages["frame_packing"].n_frames == (n_timesteps + 1) // 2
+    for stage in instrumentation.stages:
+        assert stage.wall_time >= 0.0
+        assert stage.cpu_time >= 0.0
+        assert stage.peak_allocated_bytes >= 0
+    assert stages["parse"].peak_allocated_bytes > 0
+
+
+def test_instrumentation_inactive(tmp_path):
+    instrumentation = Instrumentation(sink=lambda event, metrics: None)
+    converter = SmoldynConverter(smoldyn_data)
+    converter.save(str(tmp_path / "test"))
+    assert instrumentation.stages == []
+
+
+def test_stage_metrics_to_dict():
+    metrics = StageMetrics("filter", 10, {"filter": "TranslateFilter"})
+    result = metrics.to_dict()
+    assert result["name"] == "filter"
+    assert result["n_frames"] == 10
+    assert result["details"] == {"filter": "TranslateFilter"}
+    assert result["peak_allocated_bytes"] is None
+    assert "10 frames" in str(metrics)
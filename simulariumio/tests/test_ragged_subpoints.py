@@ -0,0 +1,135 @@
+import copy
+
+import numpy as np
+import pytest
+
+from simulariumio import AgentData, JsonWriter, DimensionData
+from simulariumio.filters import (
+    EveryNthAgentFilter,
+    EveryNthSubpointFilter,
+    EveryNthTimestepFilter,
+    FusedFilter,
+    MultiplySpaceFilter,
+    TransformSpatialAxesFilter,
+    TranslateFilter,
+)
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+
+
+def with_ragged_subpoints(agent_data: AgentData) -> AgentData:
+    """
+    Copy the agent data, storing its subpoints as ragged subpoint_values
+    """
+    result = copy.deepcopy(agent_data)
+    n_subpoints = result.n_subpoints.astype(int)
+    offsets = np.cumsum(n_subpoints).reshape(n_subpoints.shape) - n_subpoints
+    values = result.subpoints[
+        np.arange(result.subpoints.shape[2]) < n_subpoints[:, :, np.newaxis]
+    ]
+    result.subpoints = None
+    result.subpoint_values = values.astype(float)
+    result.subpoint_offsets = offsets
+    return result
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        mixed_agents(),
+        fiber_agents(),
+        sphere_group_agents(),
+    ],
+)
+@pytest.mark.parametrize(
+    "filters",
+    [
+        [],
+        [MultiplySpaceFilter(multiplier=2.0)],
+        [TranslateFilter(default_translation=np.array([1.0, 2.0, 3.0]))],
+        [TransformSpatialAxesFilter(axes_mapping=["-Z", "+X", "-Y"])],
+        [EveryNthSubpointFilter(n_per_type={}, default_n=2)],
+        [EveryNthAgentFilter(n_per_type={}, default_n=2)],
+        [EveryNthTimestepFilter(n=2)],
+        [
+            FusedFilter(
+                [
+                    EveryNthTimestepFilter(n=2),
+                    TranslateFilter(default_translation=np.array([1.0, 2.0, 3.0])),
+                ]
+            )
+        ],
+    ],
+)
+def test_ragged_subpoints_match_dense(trajectory_data, filters):
+    dense_data = copy.deepcopy(trajectory_data)
+    dense_data.plots = []
+    ragged_data = copy.deepcopy(dense_data)
+    ragged_data.agent_data = with_ragged_subpoints(dense_data.agent_data)
+    assert (
+        ragged_data.agent_data.get_dimensions().max_subpoints
+        == dense_data.agent_data.get_dimensions().max_subpoints
+    )
+    for f in filters:
+        dense_data = f.apply(dense_data)
+        ragged_data = f.apply(ragged_data)
+    if filters:
+        assert ragged_data.agent_data.has_ragged_subpoints()
+    assert JsonWriter.format_trajectory_data(
+        ragged_data
+    ) == JsonWriter.format_trajectory_data(dense_data)
+
+
+def test_every_nth_subpoint_filter_keeps_ragged_dtype():
+    trajectory_data = copy.deepcopy(fiber_agents())
+    trajectory_data.plots = []
+    trajectory_data.agent_data = with_ragged_subpoints(trajectory_data.agent_data)
+    subpoint_values = trajectory_data.agent_data.subpoint_values
+    trajectory_data.agent_data.subpoint_values = subpoint_values.astype(np.float32)
+    _filter = EveryNthSubpointFilter(n_per_type={}, default_n=2)
+    filtered_data = _filter.apply(trajectory_data)
+    assert filtered_data.agent_data.has_ragged_subpoints()
+    assert filtered_data.agent_data.subpoint_values.dtype == np.float32
+
+
+def test_ragged_subpoints_from_dimensions():
+    agent_data = AgentData.from_dimensions(
+        DimensionData(total_steps=2, max_agents=2, max_subpoints=0),
+        ragged_subpoints=True,
+    )
+    agent_data.set_subpoints(0, 1, np.array([1.0, 2.0, 3.0]))
+    agent_data.set_subpoints(1, 0, np.arange(6.0))
+    agent_data.set_subpoints(0, 1, np.array([4.0, 5.0, 6.0]))
+    assert agent_data.get_dimensions().max_subpoints == 6
+    assert np.array_equal(agent_data.get_subpoints(0, 1), [4.0, 5.0, 6.0])
+    assert np.array_equal(agent_data.get_subpoints(1, 0), np.arange(6.0))
+    assert agent_data.get_subpoints(0, 0).shape == (0,)
+    agent_data = agent_data.check_increase_buffer_size(2, axis=1)
+    # the subpoints array view is used once it's accessed
+    subpoints = agent_data.subpoints
+    assert not agent_data.has_ragged_subpoints()
+    assert subpoints.shape[2] == 6
+    assert np.array_equal(subpoints[0, 1], [4.0, 5.0, 6.0, 0.0, 0.0, 0.0])
+    assert np.array_equal(subpoints[1, 0], np.arange(6.0))
+
+
+@pytest.mark.parametrize("ragged_subpoints", [False, True])
+def test_set_frame_subpoints(ragged_subpoints):
+    agent_data = AgentData.from_dimensions(
+        DimensionData(total_steps=1, max_agents=1, max_subpoints=6),
+        ragged_subpoints=ragged_subpoints,
+    )
+    agent_data.set_frame_subpoints(0, 0, np.array([3]), np.arange(3.0))
+    agent_data._resize(2, 3)
+    agent_data.set_frame_subpoints(1, 0, np.array([6, 0, 3]), np.arange(9.0))
+    agent_data._trim_subpoint_values()
+    assert agent_data.radii.shape == (2, 3)
+    assert np.array_equal(agent_data.n_subpoints, [[3, 0, 0], [6, 0, 3]])
+    assert np.array_equal(agent_data.get_subpoints(0, 0), np.arange(3.0))
+    assert np.array_equal(agent_data.get_subpoints(1, 0), np.arange(6.0))
+    assert np.array_equal(agent_data.get_subpoints(1, 2), [6.0, 7.0, 8.0])
+    if ragged_subpoints:
+        assert agent_data.subpoint_values.shape == (12,)
@@ -1,19 +1,34 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
+import json
+import struct
+import time
 import pytest
 from typing import List, Any
 
+import numpy as np
+
 from simulariumio import (
     TrajectoryConverter,
     BinaryWriter,
+    BinaryWriterSession,
+    InputFileData,
+    AgentData,
+    DimensionData,
+    MetaData,
+    TrajectoryData,
 )
+from simulariumio.exceptions import DataError
+from simulariumio.readers import SimulariumBinaryReader
 from simulariumio.writers.binary_values import BinaryValues
 from simulariumio.constants import (
     BINARY_SETTINGS,
     BINARY_BLOCK_TYPE,
     CURRENT_VERSION,
     DEFAULT_CAMERA_SETTINGS,
+    VALIDATION,
 )
 from simulariumio.tests.conftest import binary_test_data
 
@@ -984,3 +999,218 @@ def test_binary_writer(
         assert_binary_values_equal(
             chunk_index, binary_spatial_data, expected_spatial_data
         )
+
+
+def expected_binary_file_bytes(
+    chunk_index: int,
+    binary_headers: List[List[BinaryValues]],
+    trajectory_infos: List[Any],
+    binary_spatial_data: List[List[BinaryValues]],
+    plots: List[Any],
+) -> bytes:
+    result = b""
+    for block_index, binary_data in enumerate([binary_headers, binary_spatial_data]):
+        buffer, buffer_format = BinaryWriter._data_buffer_with_format(
+            chunk_index, binary_data
+        )
+        values_bytes = struct.pack(buffer_format, *buffer)
+        if block_index == 0:
+            result += values_bytes
+            json_bytes = json.dumps(trajectory_infos[chunk_index]).encode("utf-8")
+            padding = BinaryWriter._padding(len(json_bytes))
+            result += struct.pack(
+                "<ii",
+                BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
+                len(json_bytes) + padding + 8,
+            )
+            result += json_bytes + padding * b"\x00"
+        else:
+            result += struct.pack(
+                "<ii",
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                len(values_bytes) + 8,
+            )
+            result += values_bytes
+    json_bytes = json.dumps(
+        {"version": CURRENT_VERSION.PLOT_DATA, "data": plots}
+    ).encode("utf-8")
+    padding = BinaryWriter._padding(len(json_bytes))
+    result += struct.pack(
+        "<ii", BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value, len(json_bytes) + padding + 8
+    )
+    result += json_bytes + padding * b"\x00"
+    return result
+
+
+@pytest.mark.parametrize(
+    "max_bytes, expected_n_files",
+    [
+        (BINARY_SETTINGS.MAX_BYTES, 1),
+        (2000, 2),
+    ],
+)
+def test_binary_writer_save_streaming(tmp_path, max_bytes, expected_n_files):
+    converter = TrajectoryConverter(binary_test_data)
+    (
+        binary_headers,
+        trajectory_infos,
+        binary_spatial_data,
+    ) = BinaryWriter.format_trajectory_data(converter._data, max_bytes)
+    output_path = str(tmp_path / "test")
+    BinaryWriter.save(converter._data, output_path, True, max_bytes)
+    assert len(binary_headers) == expected_n_files
+    for chunk_index in range(expected_n_files):
+        output_name = (
+            f"{output_path}.simularium"
+            if expected_n_files < 2
+            else f"{output_path}_{chunk_index}.simularium"
+        )
+        with open(output_name, "rb") as saved_file:
+            saved_bytes = saved_file.read()
+        assert saved_bytes == expected_binary_file_bytes(
+            chunk_index,
+            binary_headers,
+            trajectory_infos,
+            binary_spatial_data,
+            converter._data.plots,
+        )
+
+
+@pytest.mark.parametrize(
+    "max_bytes, max_frames_per_file, expected_n_files",
+    [
+        (BINARY_SETTINGS.MAX_BYTES, 10000, 1),
+        (BINARY_SETTINGS.MAX_BYTES, 2, 2),
+        (2000, 4, 2),
+    ],
+)
+def test_binary_writer_session(
+    tmp_path, max_bytes, max_frames_per_file, expected_n_files
+):
+    converter = TrajectoryConverter(binary_test_data)
+    agent_data = converter._data.agent_data
+    session_path = str(tmp_path / "session")
+    with BinaryWriterSession(
+        converter._data,
+        session_path,
+        max_bytes=max_bytes,
+        max_frames_per_file=max_frames_per_file,
+    ) as session:
+        for time_index in range(agent_data.total_timesteps()):
+            session.append_frame(agent_data, time_index)
+    assert len(session.output_names) == expected_n_files
+    # the frames read back match the frames saved all at once
+    save_path = str(tmp_path / "save")
+    BinaryWriter.save(converter._data, save_path, True)
+    expected_data = SimulariumBinaryReader.load_binary(
+        InputFileData(file_path=f"{save_path}.simularium")
+    )
+    expected_frames = expected_data["spatialData"]["bundleData"]
+    frame_index = 0
+    for output_name in session.output_names:
+        assert output_name.startswith(session_path)
+        test_data = SimulariumBinaryReader.load_binary(
+            InputFileData(file_path=output_name)
+        )
+        assert test_data["plotData"] == expected_data["plotData"]
+        test_info = test_data["trajectoryInfo"]
+        expected_info = expected_data["trajectoryInfo"]
+        n_frames = len(test_data["spatialData"]["bundleData"])
+        assert test_info.keys() == expected_info.keys()
+        for key in expected_info:
+            if key == "totalSteps":
+                assert test_info[key] == n_frames
+            elif key == "timeStepSize" and n_frames < 2:
+                assert test_info[key] == 0.0
+            elif key == "typeMapping":
+                # each file's type mapping has the types appended so far
+                for type_id in test_info[key]:
+                    assert test_info[key][type_id] == expected_info[key][type_id]
+            else:
+                assert test_info[key] == expected_info[key]
+        for test_frame in test_data["spatialData"]["bundleData"]:
+            expected_frame = expected_frames[frame_index]
+            assert test_frame["time"] == expected_frame["time"]
+            assert test_frame["nAgents"] == expected_frame["nAgents"]
+            assert test_frame["data"] == expected_frame["data"]
+            frame_index += 1
+    assert frame_index == len(expected_frames)
+
+
+def test_binary_writer_session_many_frames(tmp_path):
+    n_frames = 300
+    n_agents = 200
+    agent_data = AgentData.from_dimensions(
+        DimensionData(total_steps=n_frames, max_agents=n_agents)
+    )
+    agent_data.times = np.arange(n_frames, dtype=float)
+    agent_data.n_agents[:] = n_agents
+    agent_data.unique_ids[:] = np.arange(n_agents)
+    agent_data.types = [
+        [f"type{agent_index % 5}" for agent_index in range(n_agents)]
+        for time_index in range(n_frames)
+    ]
+    agent_data.positions[:] = np.random.uniform(size=(n_frames, n_agents, 3))
+    trajectory_data = TrajectoryData(
+        meta_data=MetaData(box_size=np.array([10.0, 10.0, 10.0])),
+        agent_data=agent_data,
+    )
+    start_time = time.perf_counter()
+    with BinaryWriterSession(
+        trajectory_data, str(tmp_path / "session"), max_frames_per_file=100
+    ) as session:
+        for time_index in range(n_frames):
+            session.append_frame(agent_data, time_index)
+    # each append takes a fixed amount of time, not one that grows with the frames
+    assert time.perf_counter() - start_time < 30.0
+    assert len(session.output_names) == 3
+    n_saved_frames = 0
+    for output_name in session.output_names:
+        test_data = SimulariumBinaryReader.load_binary(
+            InputFileData(file_path=output_name)
+        )
+        n_saved_frames += len(test_data["spatialData"]["bundleData"])
+    assert n_saved_frames == n_frames
+
+
+@pytest.mark.parametrize(
+    "max_bytes, expected_n_files",
+    [
+        (BINARY_SETTINGS.MAX_BYTES, 1),
+        (2000, 2),
+    ],
+)
+def test_binary_writer_save_parallel(tmp_path, max_bytes, expected_n_files):
+    converter = TrajectoryConverter(binary_test_data)
+    serial_path = str(tmp_path / "serial")
+    parallel_path = str(tmp_path / "parallel")
+    BinaryWriter.save(converter._data, serial_path, True, max_bytes)
+    BinaryWriter.save(converter._data, parallel_path, True, max_bytes, workers=2)
+    for chunk_index in range(expected_n_files):
+        suffix = "" if expected_n_files < 2 else f"_{chunk_index}"
+        with open(f"{serial_path}{suffix}.simularium", "rb") as serial_file:
+            with open(f"{parallel_path}{suffix}.simularium", "rb") as parallel_file:
+                assert parallel_file.read() == serial_file.read()
+
+
+@pytest.mark.parametrize(
+    "validation, expected_error",
+    [
+        (VALIDATION.FULL, "found duplicate ID"),
+        (VALIDATION.FAST, None),
+        (VALIDATION.OFF, None),
+        ("thorough", "validation must be one of"),
+    ],
+)
+def test_binary_writer_validation(tmp_path, validation, expected_error):
+    test_data = copy.deepcopy(binary_test_data)
+    # duplicate agent ID in the second frame
+    test_data.agent_data.unique_ids[1][1] = 0.0
+    output_path = str(tmp_path / "test")
+    if expected_error is None:
+        BinaryWriter.save(test_data, output_path, True, validation=validation)
+        with open(f"{output_path}.simularium", "rb") as test_file:
+            assert len(test_file.read()) > 0
+        return
+    with pytest.raises(DataError, match=expected_error):
+        BinaryWriter.save(test_data, output_path, True, validation=validation)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+
+import pytest
+
+from simulariumio import JsonWriter
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        mixed_agents(),
+        fiber_agents(),
+        sphere_group_agents(),
+    ],
+)
+@pytest.mark.parametrize("draw_fiber_points", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_json_writer_save_streaming(
+    tmp_path, trajectory_data, draw_fiber_points, workers
+):
+    data = copy.deepcopy(trajectory_data)
+    data.agent_data.draw_fiber_points = draw_fiber_points
+    output_path = str(tmp_path / "test")
+    JsonWriter.save(data, output_path, True, workers=workers)
+    with open(f"{output_path}.simularium") as saved_file:
+        saved_text = saved_file.read()
+    assert saved_text == json.dumps(JsonWriter.format_trajectory_data(data))
@@ -3,7 +3,7 @@
 
 import json
 import logging
-from typing import List, Dict, Callable
+from typing import Any, List, Dict, Callable
 import copy
 import time
 import numpy as np
@@ -19,10 +19,11 @@ from .data_objects import (
     TrajectoryData,
     DisplayData,
 )
-from .filters import Filter
+from .filters import Filter, FusedFilter
 from .exceptions import UnsupportedPlotTypeError
 from .writers import JsonWriter, BinaryWriter
-from .constants import DISPLAY_TYPE
+from .instrumentation import instrument_stage
+from .constants import DISPLAY_TYPE, VALIDATION
 
 ###############################################################################
 
@@ -81,6 +82,16 @@ class TrajectoryConverter:
             self.progress_callback(percent_complete)
             self.last_report_time = current_time
 
+    def _read_instrumented(self, input_data: Any) -> TrajectoryData:
+        """
+        Read the input data with the converter's _read(),
+        measured as the "parse" stage if there is an active Instrumentation
+        """
+        with instrument_stage("parse", converter=type(self).__name__) as stage:
+            result = self._read(input_data)
+            stage.n_frames = result.agent_data.total_timesteps()
+        return result
+
     @staticmethod
     def _get_display_type_name_from_raw(
         raw_type_name: str, display_data: Dict[str, DisplayData]
@@ -170,15 +181,34 @@ class TrajectoryConverter:
             The title for the y-axis of the plot
             Default: "Number of agents"
         """
-        n_agents = {}
-        for time_index in range(self._data.agent_data.times.size):
-            for agent_index in range(int(self._data.agent_data.n_agents[time_index])):
-                type_name = self._data.agent_data.types[time_index][agent_index]
-                if "#" in type_name:
-                    type_name = type_name.split("#")[0]
-                if type_name not in n_agents:
-                    n_agents[type_name] = np.zeros_like(self._data.agent_data.times)
-                n_agents[type_name][time_index] += 1
+        agent_data = self._data.agent_data
+        type_ids, type_names = agent_data.get_agent_type_ids()
+        total_steps = min(agent_data.times.size, type_ids.shape[0])
+        is_agent = (
+            np.arange(type_ids.shape[1]) < agent_data.n_agents[:total_steps, np.newaxis]
+        )
+        time_indices, agent_indices = np.nonzero(is_agent)
+        # count types with the same name before "#" together
+        plot_names = [type_name.split("#")[0] for type_name in type_names]
+        unique_plot_names, plot_name_indices = np.unique(
+            np.array(plot_names, dtype=object), return_inverse=True
+        )
+        agent_plot_name_indices = plot_name_indices[
+            type_ids[time_indices, agent_indices].astype(int)
+        ]
+        counts = np.zeros(
+            (unique_plot_names.shape[0], agent_data.times.size),
+            dtype=agent_data.times.dtype,
+        )
+        np.add.at(counts, (agent_plot_name_indices, time_indices), 1)
+        # add the types in the order they first appear
+        unique_indices, first_indices = np.unique(
+            agent_plot_name_indices, return_index=True
+        )
+        n_agents = {
+            unique_plot_names[plot_name_index]: counts[plot_name_index]
+            for plot_name_index in unique_indices[np.argsort(first_indices)]
+        }
         self.add_plot(
             ScatterPlotData(
                 title=plot_title,
@@ -190,13 +220,58 @@ class TrajectoryConverter:
             )
         )
 
-    def filter_data(self, filters: List[Filter]) -> TrajectoryData:
+    def filter_data(
+        self,
+        filters: List[Filter],
+        in_place: bool = False,
+        fuse: bool = False,
+        copy_on_write: bool = False,
+    ) -> TrajectoryData:
         """
-        Return the simularium data with the given filter applied
+        Return the simularium data with the given filters applied.
+        Unless in_place is requested, the current data is not modified.
+
+        Parameters
+        ----------
+        filters: List[Filter]
+            the filters to apply, in order
+        in_place: bool (optional)
+            apply the filters to the current data without copying it?
+            The current data is replaced with the filtered data
+            Default: False
+        fuse: bool (optional)
+            apply each run of consecutive timestep, agent, space and time
+            filters in one pass over the frames with a FusedFilter?
+            Default: False
+        copy_on_write: bool (optional)
+            instead of deep copying the current data before filtering,
+            apply filters that don't modify data in place to a copy
+            that shares the current arrays, and only deep copy the data
+            before the first filter that does modify it?
+            Returned arrays may alias the converter's, so they must
+            not be modified while the converter is in use
+            Default: False
         """
-        filtered_data = copy.deepcopy(self._data)
+        if fuse:
+            filters = FusedFilter.fuse(filters)
+        if in_place or copy_on_write:
+            filtered_data = self._data
+        else:
+            filtered_data = copy.deepcopy(self._data)
+        is_copied = in_place or filtered_data is not self._data
         for f in filters:
-            filtered_data = f.apply(filtered_data)
+            if f.mutates_data and not is_copied:
+                filtered_data = copy.deepcopy(filtered_data)
+                is_copied = True
+            elif filtered_data is self._data and not in_place:
+                filtered_data = copy.copy(filtered_data)
+            with instrument_stage("filter", filter=type(f).__name__) as stage:
+                filtered_data = f.apply(filtered_data)
+                stage.n_frames = filtered_data.agent_data.total_timesteps()
+        if in_place:
+            self._data = filtered_data
+        elif filtered_data is self._data:
+            filtered_data = copy.copy(filtered_data)
         return filtered_data
 
     def to_JSON(self):
@@ -219,7 +294,14 @@ class TrajectoryConverter:
         """
         JsonWriter.save_plot_data(self._data.plots, output_path)
 
-    def save(self, output_path: str, binary: bool = True, validate_ids: bool = True):
+    def save(
+        self,
+        output_path: str,
+        binary: bool = True,
+        validate_ids: bool = True,
+        workers: int = 1,
+        validation: str = VALIDATION.FAST,
+    ):
         """
         Save the current simularium data in .simularium JSON format
         at the output path
@@ -234,8 +316,29 @@ class TrajectoryConverter:
         validate_ids: bool
             additional validation to check agent ID size?
             Default = True
+        workers: int (optional)
+            how many processes to use to pack the frames in parallel
+            Default = 1
+        validation: str (optional)
+            how much to check the data before saving:
+            "full" also checks that agent IDs are unique in each frame,
+            "fast" checks agent ID size and that subpoints
+            match each agent's display type, "off" skips the checks
+            Default = "fast"
         """
         if binary:
-            BinaryWriter.save(self._data, output_path, validate_ids)
+            BinaryWriter.save(
+                self._data,
+                output_path,
+                validate_ids,
+                workers=workers,
+                validation=validation,
+            )
         else:
-            JsonWriter.save(self._data, output_path, validate_ids)
+            JsonWriter.save(
+                self._data,
+                output_path,
+                validate_ids,
+                workers=workers,
+                validation=validation,
+            )
@@ -12,10 +12,17 @@ from ..data_objects import (
     AgentData,
     TrajectoryData,
 )
-from ..constants import BINARY_SETTINGS, BINARY_BLOCK_TYPE, CURRENT_VERSION
+from ..constants import (
+    BINARY_SETTINGS,
+    BINARY_BLOCK_TYPE,
+    CURRENT_VERSION,
+    VALIDATION,
+)
+from ..instrumentation import AccumulatedStage
 from .writer import Writer
 from .binary_chunk import BinaryChunk
 from .binary_values import BinaryValues
+from .frame_pool import FramePool
 
 ###############################################################################
 
@@ -161,9 +168,11 @@ class BinaryWriter(Writer):
         traj_info_n_bytes: int,
         spatial_data_n_bytes: int,
         plot_data_n_bytes: int,
+        block_offsets: List[int] = None,
     ) -> BinaryValues:
         """
-        Return the binary header values and format
+        Return the binary header values and format,
+        the blocks are written in order unless block_offsets are given
         """
         header_n_bytes = BinaryWriter._header_n_bytes()
         header_format = (
@@ -172,11 +181,12 @@ class BinaryWriter(Writer):
         )
         block_types = BINARY_SETTINGS.DEFAULT_BLOCK_TYPES
         block_n_bytes = [traj_info_n_bytes, spatial_data_n_bytes, plot_data_n_bytes]
-        block_offsets = [
-            header_n_bytes,
-            header_n_bytes + block_n_bytes[0],
-            header_n_bytes + block_n_bytes[0] + block_n_bytes[1],
-        ]
+        if block_offsets is None:
+            block_offsets = [
+                header_n_bytes,
+                header_n_bytes + block_n_bytes[0],
+                header_n_bytes + block_n_bytes[0] + block_n_bytes[1],
+            ]
         return BinaryValues(
             values=(
                 [bytes(BINARY_SETTINGS.FILE_IDENTIFIER, "utf-8")]
@@ -376,13 +386,109 @@ class BinaryWriter(Writer):
             outfile.write(databytes)
         return len(databytes) + block_header_length
 
+    @staticmethod
+    def _write_spatial_data_block(
+        chunk: BinaryChunk,
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+        frame_buffers_n_values: List[int],
+        file_name: str,
+        frame_pool: FramePool = None,
+        frame_packing: AccumulatedStage = None,
+        file_io: AccumulatedStage = None,
+    ) -> int:
+        """
+        Write the spatial data block for a chunk to a file,
+        packing and writing one frame at a time
+        so only one frame buffer is held in memory.
+        If a frame_pool is provided, the frames are packed by its workers
+        and written at their offsets from the spatial data header,
+        which is all measured as frame_packing
+        Return number of bytes written
+        """
+        if frame_packing is None:
+            frame_packing = AccumulatedStage("frame_packing")
+        if file_io is None:
+            file_io = AccumulatedStage("file_io")
+        spatial_header = BinaryWriter._spatial_data_header(chunk)
+        with file_io.measure(), open(file_name, "ab") as outfile:
+            # write block type and size
+            outfile.write(
+                struct.pack(
+                    "<ii",
+                    BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                    chunk.n_bytes,
+                )
+            )
+            # write spatial data header with frame offsets and lengths
+            outfile.write(
+                struct.pack(spatial_header.format_string, *spatial_header.values)
+            )
+            if frame_pool is not None:
+                # reserve space for the frames, the workers fill it in
+                block_offset = outfile.tell() - (
+                    BINARY_SETTINGS.BYTES_PER_VALUE * len(spatial_header.values)
+                    + BINARY_SETTINGS.BYTES_PER_VALUE
+                    * BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+                )
+                outfile.truncate(block_offset + chunk.n_bytes)
+                frame_offsets = spatial_header.values[
+                    BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES :: 2
+                ]
+        if frame_pool is not None:
+            with frame_packing.measure():
+                frame_pool.write_binary_frames(
+                    file_name,
+                    [
+                        (
+                            chunk.get_global_index(chunk_frame_index),
+                            chunk_frame_index,
+                            block_offset + frame_offset,
+                        )
+                        for chunk_frame_index, frame_offset in enumerate(frame_offsets)
+                    ],
+                )
+            return chunk.n_bytes
+        with open(file_name, "ab") as outfile:
+            # write each frame
+            for chunk_frame_index in range(chunk.n_frames):
+                global_frame_index = chunk.get_global_index(chunk_frame_index)
+                # pack values directly as little-endian float32
+                with frame_packing.measure():
+                    frame_buffer, _, _ = Writer._get_frame_buffer_array(
+                        global_frame_index,
+                        agent_data,
+                        type_ids,
+                        frame_buffers_n_values[global_frame_index],
+                        dtype=np.dtype("<f4"),
+                    )
+                with file_io.measure():
+                    outfile.write(
+                        struct.pack(
+                            "<IfI",
+                            int(chunk_frame_index),
+                            float(agent_data.times[global_frame_index]),
+                            int(agent_data.n_agents[global_frame_index]),
+                        )
+                    )
+                    outfile.write(frame_buffer.tobytes())
+        return chunk.n_bytes
+
     @staticmethod
     def save(
-        trajectory_data: TrajectoryData, output_path: str, validate_ids: bool
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        validate_ids: bool,
+        max_bytes: int = BINARY_SETTINGS.MAX_BYTES,
+        workers: int = 1,
+        validation: str = VALIDATION.FAST,
     ) -> None:
         """
         Save the simularium data in .simularium binary format
-        at the output path
+        at the output path.
+        The headers and frame offsets are calculated before writing,
+        then the spatial data is streamed to the file one frame at a time,
+        or packed in parallel and written at each frame's offset
         Parameters
         ----------
         trajectory_data: TrajectoryData
@@ -391,53 +497,93 @@ class BinaryWriter(Writer):
             where to save the file
         validate_ids: bool
             additional validation to check agent ID size?
+        max_bytes: int (optional)
+            the max size of each file, data will be split
+            into multiple files if needed
+            Default: BINARY_SETTINGS.MAX_BYTES
+        workers: int (optional)
+            how many processes to use to pack the frames,
+            the agent data is shared with them through shared memory
+            Default: 1
+        validation: str (optional)
+            how much to check the data before saving,
+            "full", "fast", or "off", see VALIDATION
+            Default: "fast"
         """
-        if validate_ids:
-            Writer._validate_ids(trajectory_data)
-        (
-            binary_headers,
-            trajectory_infos,
-            binary_spatial_data,
-        ) = BinaryWriter.format_trajectory_data(trajectory_data)
+        Writer._validate(trajectory_data, validate_ids, validation)
+        print("Converting Trajectory Data to Binary -------------")
+        agent_data = trajectory_data.agent_data
+        frame_buffers_n_values = BinaryWriter._frame_buffers_n_values(trajectory_data)
+        type_ids, type_mapping = agent_data.get_type_ids_and_mapping()
+        file_chunks, traj_info_n_bytes, plot_data_n_bytes = BinaryWriter._chunk_files(
+            trajectory_data, type_mapping, frame_buffers_n_values, max_bytes
+        )
         print("Writing Binary -------------")
-        for chunk_index in range(len(binary_spatial_data)):
-            # determine filename(s)
-            if len(binary_headers) < 2:
-                output_name = f"{output_path}.simularium"
-            else:
-                output_name = f"{output_path}_{chunk_index}.simularium"
-            # binary header
-            header_buffer, header_format = BinaryWriter._data_buffer_with_format(
-                chunk_index, binary_headers
-            )
-            with open(output_name, "wb") as outfile:
-                outfile.write(struct.pack(header_format, *header_buffer))
-            # trajectory info
-            BinaryWriter._write_block(
-                json.dumps(trajectory_infos[chunk_index]),
-                BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
-                output_name,
-            )
-            # spatial data
-            (
-                spatial_data_buffer,
-                spatial_format,
-            ) = BinaryWriter._data_buffer_with_format(chunk_index, binary_spatial_data)
-            BinaryWriter._write_block(
-                spatial_data_buffer,
-                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
-                output_name,
-                spatial_format,
-            )
-            # plot data
-            BinaryWriter._write_block(
-                json.dumps(
-                    {
-                        "version": CURRENT_VERSION.PLOT_DATA,
-                        "data": trajectory_data.plots,
-                    }
-                ),
-                BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
-                output_name,
-            )
-            print(f"saved to {output_name}")
+        frame_pool = (
+            FramePool(agent_data, type_ids, type_mapping, workers)
+            if workers > 1
+            else None
+        )
+        n_frames = agent_data.total_timesteps()
+        try:
+            with AccumulatedStage(
+                "frame_packing", n_frames=n_frames, workers=workers
+            ) as frame_packing, AccumulatedStage(
+                "file_io", n_frames=n_frames, n_files=len(file_chunks)
+            ) as file_io:
+                for chunk_index, file_chunk in enumerate(file_chunks):
+                    # determine filename(s)
+                    if len(file_chunks) < 2:
+                        output_name = f"{output_path}.simularium"
+                    else:
+                        output_name = f"{output_path}_{chunk_index}.simularium"
+                    with file_io.measure():
+                        # binary header
+                        binary_header = BinaryWriter._binary_header(
+                            traj_info_n_bytes,
+                            file_chunk.n_bytes,
+                            plot_data_n_bytes,
+                        )
+                        with open(output_name, "wb") as outfile:
+                            outfile.write(
+                                struct.pack(
+                                    binary_header.format_string, *binary_header.values
+                                )
+                            )
+                        # trajectory info
+                        BinaryWriter._write_block(
+                            json.dumps(
+                                Writer._get_trajectory_info(
+                                    trajectory_data, file_chunk.n_frames, type_mapping
+                                )
+                            ),
+                            BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
+                            output_name,
+                        )
+                    # spatial data
+                    BinaryWriter._write_spatial_data_block(
+                        file_chunk,
+                        agent_data,
+                        type_ids,
+                        frame_buffers_n_values,
+                        output_name,
+                        frame_pool,
+                        frame_packing,
+                        file_io,
+                    )
+                    # plot data
+                    with file_io.measure():
+                        BinaryWriter._write_block(
+                            json.dumps(
+                                {
+                                    "version": CURRENT_VERSION.PLOT_DATA,
+                                    "data": trajectory_data.plots,
+                                }
+                            ),
+                            BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
+                            output_name,
+                        )
+                    print(f"saved to {output_name}")
+        finally:
+            if frame_pool is not None:
+                frame_pool.close()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import logging
+import os
+import struct
+from typing import Any, BinaryIO, Dict, List
+
+import numpy as np
+
+from ..data_objects import AgentData, TrajectoryData
+from ..constants import (
+    BINARY_SETTINGS,
+    BINARY_BLOCK_TYPE,
+    CURRENT_VERSION,
+    VALIDATION,
+)
+from ..exceptions import DataError
+from .writer import Writer
+from .binary_writer import BinaryWriter
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class BinaryWriterSession:
+    trajectory_data: TrajectoryData
+    output_path: str
+    validate_ids: bool
+    max_bytes: int
+    max_frames_per_file: int
+    validation: str
+    output_names: List[str]
+
+    def __init__(
+        self,
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        validate_ids: bool = True,
+        max_bytes: int = BINARY_SETTINGS.MAX_BYTES,
+        max_frames_per_file: int = 10000,
+        validation: str = VALIDATION.FAST,
+    ):
+        """
+        This object writes a .simularium binary file incrementally,
+        one frame at a time as a running simulation produces them.
+        Space for the spatial data header and frame offset table
+        is reserved when each file is opened, frames are appended
+        as they arrive, and the header, offset table, trajectory info,
+        and plot data are written when the file is closed.
+        When the next frame would make a file larger than max_bytes,
+        or the reserved offset table is full, the file is closed
+        and a new one is started, named like the files
+        written by BinaryWriter.save
+
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the meta data, units, plots, and agent display data to save.
+            Its agent data is only used for display data,
+            the frames are appended with append_frame().
+            The plots are written when each file is closed,
+            but their size is measured when the session is opened
+        output_path: str
+            where to save the file(s)
+        validate_ids: bool (optional)
+            additional validation to check agent ID size?
+            Default: True
+        max_bytes: int (optional)
+            the max size of each file, frames will be written
+            to a new file if needed
+            Default: BINARY_SETTINGS.MAX_BYTES
+        max_frames_per_file: int (optional)
+            the number of frames to reserve space for
+            in the frame offset table of each file,
+            frames will be written to a new file if needed
+            Default: 10000
+        validation: str (optional)
+            how much to check each frame before writing it,
+            "full", "fast", or "off", see VALIDATION
+            Default: "fast"
+        """
+        self.trajectory_data = trajectory_data
+        self.output_path = output_path
+        self.validate_ids = validate_ids
+        self.max_bytes = max_bytes
+        self.max_frames_per_file = max_frames_per_file
+        self.validation = validation
+        self.output_names = []
+        self._file = None
+
+    def open(self):
+        """
+        Start writing the first file
+        """
+        if self._file is not None:
+            raise DataError("Binary writer session is already open")
+        print("Writing Binary -------------")
+        self.output_names = []
+        self._type_id_mapping = {}
+        self._type_mapping = {}
+        self._first_times = []
+        self._plot_data_n_bytes = BinaryWriter._plot_data_length(
+            self.trajectory_data.plots
+        )
+        self._open_file(f"{self.output_path}.simularium")
+
+    def _spatial_header_capacity_n_bytes(self) -> int:
+        """
+        Get the number of bytes reserved for the spatial data block header,
+        including the frame offset table
+        """
+        return BINARY_SETTINGS.BYTES_PER_VALUE * (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME
+            * self.max_frames_per_file
+        )
+
+    def _open_file(self, output_name: str):
+        """
+        Open a new file and reserve space for the headers
+        """
+        self.output_names.append(output_name)
+        self._file = open(output_name, "wb")
+        self._file.write(
+            bytes(
+                BinaryWriter._header_n_bytes() + self._spatial_header_capacity_n_bytes()
+            )
+        )
+        self._frame_n_bytes = []
+        self._frames_n_bytes = 0
+        self._traj_info_n_bytes = 0
+        self._traj_info_key = None
+
+    def _trajectory_info(self, total_steps: int) -> Dict[str, Any]:
+        """
+        Get the trajectoryInfo for a file with the given number of frames,
+        using the types seen so far
+        """
+        # only the agent data is changed, the units are read but not copied
+        info_data = TrajectoryData(
+            meta_data=self.trajectory_data.meta_data,
+            agent_data=copy.copy(self.trajectory_data.agent_data),
+            time_units=self.trajectory_data.time_units,
+            spatial_units=self.trajectory_data.spatial_units,
+            plots=self.trajectory_data.plots,
+        )
+        # the time step size is 0 until a second frame is appended
+        info_data.agent_data.times = np.array(
+            (self._first_times + [0.0, 0.0])[:1] * 2
+            if len(self._first_times) < 2
+            else self._first_times
+        )
+        return Writer._get_trajectory_info(info_data, total_steps, self._type_mapping)
+
+    def _max_traj_info_n_bytes(self) -> int:
+        """
+        Get the size of the trajectory info block if the file were full,
+        only measured again when the types or time step size change
+        """
+        key = (len(self._type_mapping), len(self._first_times))
+        if key != self._traj_info_key:
+            traj_info_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
+                BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+            ) + len(json.dumps(self._trajectory_info(self.max_frames_per_file)))
+            self._traj_info_n_bytes = traj_info_n_bytes + BinaryWriter._padding(
+                traj_info_n_bytes
+            )
+            self._traj_info_key = key
+        return self._traj_info_n_bytes
+
+    def _type_ids(self, agent_data: AgentData, time_indices: List[int]) -> np.ndarray:
+        """
+        Get the type IDs for the agent data at the given timesteps,
+        one row per timestep, numbering new types
+        in the order they first appear across the whole session.
+        Only the given timesteps' types are looked up,
+        so appending one frame at a time doesn't repeat work
+        """
+        agent_type_ids, is_agent, type_names = agent_data._get_frame_agent_type_ids(
+            time_indices
+        )
+        agent_type_ids = np.where(is_agent, agent_type_ids, 0)
+        session_type_ids = np.zeros(len(type_names))
+        for frame_index in range(len(time_indices)):
+            frame_type_ids = agent_type_ids[frame_index][is_agent[frame_index]]
+            unique_type_ids, first_indices = np.unique(
+                frame_type_ids, return_index=True
+            )
+            for type_index in unique_type_ids[np.argsort(first_indices)]:
+                type_name = type_names[type_index]
+                if len(type_name) == 0 or type_name in self._type_id_mapping:
+                    continue
+                display_data = agent_data.display_data.get(
+                    type_name,
+                    self.trajectory_data.agent_data.display_data.get(type_name),
+                )
+                if display_data is None:
+                    raise DataError(
+                        f"Please provide DisplayData for agent type {type_name}"
+                    )
+                tid = len(self._type_id_mapping)
+                self._type_id_mapping[type_name] = tid
+                self._type_mapping[str(tid)] = {
+                    "name": type_name,
+                    "geometry": dict(display_data),
+                }
+        for type_index, type_name in enumerate(type_names):
+            if type_name in self._type_id_mapping:
+                session_type_ids[type_index] = self._type_id_mapping[type_name]
+        return session_type_ids[agent_type_ids]
+
+    def append_frame(self, agent_data: AgentData, time_index: int = None):
+        """
+        Append a frame of agent data to the current file,
+        starting a new file first if needed
+
+        Parameters
+        ----------
+        agent_data: AgentData
+            the agent data for the frame(s)
+        time_index: int (optional)
+            which timestep in the agent data to append.
+            If None, all the timesteps are appended in order
+            Default: None
+        """
+        if self._file is None:
+            raise DataError("Binary writer session is not open")
+        time_indices = (
+            list(range(agent_data.total_timesteps()))
+            if time_index is None
+            else [time_index]
+        )
+        Writer._validate_agent_data(
+            agent_data, self.validate_ids, self.validation, time_indices
+        )
+        type_ids = self._type_ids(agent_data, time_indices)
+        for frame_index, index in enumerate(time_indices):
+            if len(self._first_times) < 2:
+                self._first_times.append(float(agent_data.times[index]))
+            # this frame's type IDs, viewed at every timestep without copying
+            frame_type_ids = np.broadcast_to(
+                type_ids[frame_index],
+                (agent_data.n_agents.shape[0], type_ids.shape[1]),
+            )
+            frame_buffer, _, _ = Writer._get_frame_buffer_array(
+                index, agent_data, frame_type_ids, dtype=np.dtype("<f4")
+            )
+            frame_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
+                BINARY_SETTINGS.FRAME_HEADER_N_VALUES + frame_buffer.shape[0]
+            )
+            self._check_start_new_file(frame_n_bytes)
+            self._file.write(
+                struct.pack(
+                    "<IfI",
+                    len(self._frame_n_bytes),
+                    float(agent_data.times[index]),
+                    int(agent_data.n_agents[index]),
+                )
+            )
+            self._file.write(frame_buffer.tobytes())
+            self._frame_n_bytes.append(frame_n_bytes)
+            self._frames_n_bytes += frame_n_bytes
+
+    def _check_start_new_file(self, frame_n_bytes: int):
+        """
+        If the frame won't fit in the current file, close it and open another
+        """
+        other_n_bytes = (
+            BinaryWriter._header_n_bytes()
+            + self._spatial_header_capacity_n_bytes()
+            + self._max_traj_info_n_bytes()
+            + self._plot_data_n_bytes
+        )
+        if other_n_bytes + frame_n_bytes > self.max_bytes:
+            raise Exception(
+                f"Frame {len(self._frame_n_bytes)} is too large for a simularium "
+                f"file ({frame_n_bytes} bytes), try filtering out some data."
+            )
+        if len(self._frame_n_bytes) < 1:
+            return
+        if (
+            len(self._frame_n_bytes) < self.max_frames_per_file
+            and other_n_bytes + self._frames_n_bytes + frame_n_bytes <= self.max_bytes
+        ):
+            return
+        self._close_file()
+        if len(self.output_names) < 2:
+            # the first file is renamed once the output is split
+            first_name = f"{self.output_path}_0.simularium"
+            os.replace(self.output_names[0], first_name)
+            self.output_names[0] = first_name
+        self._open_file(f"{self.output_path}_{len(self.output_names)}.simularium")
+
+    @staticmethod
+    def _write_spatial_data_header(
+        outfile: BinaryIO, block_offset: int, frame_n_bytes: List[int]
+    ) -> int:
+        """
+        Write the spatial data block header and frame offset table
+        at the block offset, directly before the frames
+        Return the length of the block
+        """
+        n_frames = len(frame_n_bytes)
+        n_header_values = (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * n_frames
+        )
+        frame_offsets = np.cumsum(
+            [BINARY_SETTINGS.BYTES_PER_VALUE * n_header_values] + frame_n_bytes
+        )
+        block_n_bytes = int(frame_offsets[-1])
+        frame_offsets_and_lengths = np.zeros(2 * n_frames, dtype=int)
+        frame_offsets_and_lengths[0::2] = frame_offsets[:-1]
+        frame_offsets_and_lengths[1::2] = frame_n_bytes
+        outfile.seek(block_offset)
+        outfile.write(
+            struct.pack(
+                f"<ii{n_header_values - BINARY_SETTINGS.BLOCK_HEADER_N_VALUES}I",
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                block_n_bytes,
+                CURRENT_VERSION.SPATIAL_DATA,
+                n_frames,
+                *frame_offsets_and_lengths.tolist(),
+            )
+        )
+        return block_n_bytes
+
+    def _close_file(self):
+        """
+        Write the headers and JSON blocks and close the current file
+        """
+        output_name = self.output_names[-1]
+        header_n_bytes = BinaryWriter._header_n_bytes()
+        # the reserved space is filled from the end,
+        # so the offset table is directly before the frames
+        n_unused_frames = self.max_frames_per_file - len(self._frame_n_bytes)
+        spatial_data_offset = header_n_bytes + (
+            BINARY_SETTINGS.BYTES_PER_VALUE
+            * BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME
+            * n_unused_frames
+        )
+        spatial_data_n_bytes = BinaryWriterSession._write_spatial_data_header(
+            self._file, spatial_data_offset, self._frame_n_bytes
+        )
+        self._file.close()
+        self._file = None
+        traj_info_offset = spatial_data_offset + spatial_data_n_bytes
+        traj_info_n_bytes = BinaryWriter._write_block(
+            json.dumps(self._trajectory_info(len(self._frame_n_bytes))),
+            BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
+            output_name,
+        )
+        plot_data_n_bytes = BinaryWriter._write_block(
+            json.dumps(
+                {
+                    "version": CURRENT_VERSION.PLOT_DATA,
+                    "data": self.trajectory_data.plots,
+                }
+            ),
+            BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
+            output_name,
+        )
+        binary_header = BinaryWriter._binary_header(
+            traj_info_n_bytes,
+            spatial_data_n_bytes,
+            plot_data_n_bytes,
+            block_offsets=[
+                traj_info_offset,
+                spatial_data_offset,
+                traj_info_offset + traj_info_n_bytes,
+            ],
+        )
+        with open(output_name, "r+b") as outfile:
+            outfile.write(
+                struct.pack(binary_header.format_string, *binary_header.values)
+            )
+
+    def close(self):
+        """
+        Finish writing the current file
+        """
+        if self._file is None:
+            return
+        self._close_file()
+        for output_name in self.output_names:
+            print(f"saved to {output_name}")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
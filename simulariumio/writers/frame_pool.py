@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from ..data_objects import AgentData, DisplayData
+from .writer import Writer
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# AgentData arrays that are shared with the worker processes
+SHARED_ARRAY_NAMES = [
+    "times",
+    "n_agents",
+    "viz_types",
+    "unique_ids",
+    "positions",
+    "radii",
+    "rotations",
+    "n_subpoints",
+]
+
+# set in each worker process by _init_worker
+_worker_agent_data: AgentData = None
+_worker_type_ids: np.ndarray = None
+_worker_shared_memory: List[shared_memory.SharedMemory] = []
+
+
+def _attach_array(
+    shared_memory_name: str, shape: Tuple[int, ...], dtype: str
+) -> np.ndarray:
+    """
+    Get a numpy array view of a shared memory block
+    created by another process
+    """
+    block = shared_memory.SharedMemory(name=shared_memory_name)
+    _worker_shared_memory.append(block)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _init_worker(
+    array_specs: Dict[str, Tuple[str, Tuple[int, ...], str]],
+    type_names: List[str],
+    display_data: Dict[str, DisplayData],
+    draw_fiber_points: bool,
+    n_timesteps: int,
+):
+    """
+    Attach to the shared AgentData arrays in a worker process
+    """
+    global _worker_agent_data, _worker_type_ids
+    arrays = {
+        name: _attach_array(*array_spec) for name, array_spec in array_specs.items()
+    }
+    _worker_type_ids = arrays["type_ids"]
+    _worker_agent_data = AgentData(
+        times=arrays["times"],
+        n_agents=arrays["n_agents"],
+        viz_types=arrays["viz_types"],
+        unique_ids=arrays["unique_ids"],
+        types=None,
+        positions=arrays["positions"],
+        radii=arrays["radii"],
+        rotations=arrays["rotations"],
+        subpoints=arrays.get("subpoints"),
+        display_data=display_data,
+        draw_fiber_points=draw_fiber_points,
+        n_timesteps=n_timesteps,
+        type_ids=arrays["type_ids"],
+        type_names=type_names,
+        subpoint_values=arrays.get("subpoint_values"),
+        subpoint_offsets=arrays.get("subpoint_offsets"),
+    )
+    _worker_agent_data.n_subpoints = arrays["n_subpoints"]
+
+
+def _write_binary_frames(file_name: str, frames: List[Tuple[int, int, int]]) -> int:
+    """
+    Pack each frame and write it at its offset in the file,
+    frames are (global frame index, frame index in the file, offset in bytes)
+    Return the number of frames written
+    """
+    with open(file_name, "r+b") as outfile:
+        for global_frame_index, chunk_frame_index, file_offset in frames:
+            frame_buffer, _, _ = Writer._get_frame_buffer_array(
+                global_frame_index,
+                _worker_agent_data,
+                _worker_type_ids,
+                dtype=np.dtype("<f4"),
+            )
+            outfile.seek(file_offset)
+            outfile.write(
+                struct.pack(
+                    "<IfI",
+                    int(chunk_frame_index),
+                    float(_worker_agent_data.times[global_frame_index]),
+                    int(_worker_agent_data.n_agents[global_frame_index]),
+                )
+            )
+            outfile.write(frame_buffer.tobytes())
+    return len(frames)
+
+
+def _json_frames(time_indices: List[int]) -> List[str]:
+    """
+    Pack each frame and serialize it as a bundleData JSON item
+    """
+    result = []
+    for time_index in time_indices:
+        frame_buffer, _, _ = Writer._get_frame_buffer_array(
+            time_index, _worker_agent_data, _worker_type_ids
+        )
+        result.append(
+            json.dumps(
+                {
+                    "frameNumber": time_index,
+                    "time": float(_worker_agent_data.times[time_index]),
+                    "data": frame_buffer.tolist(),
+                }
+            )
+        )
+    return result
+
+
+class FramePool:
+    workers: int
+
+    def __init__(
+        self,
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+        type_mapping: Dict[str, Any],
+        workers: int,
+    ):
+        """
+        This object packs frames of AgentData in a pool of worker processes.
+        The AgentData arrays and the type IDs are copied into shared memory
+        once, so each worker reads them without pickling the data
+
+        Parameters
+        ----------
+        agent_data: AgentData
+            the agent data to pack
+        type_ids: np.ndarray
+            the type ID for each agent at each timestep,
+            from AgentData.get_type_ids_and_mapping
+        type_mapping: Dict[str, Any]
+            the type mapping from AgentData.get_type_ids_and_mapping
+        workers: int
+            how many worker processes to use
+        """
+        self.workers = workers
+        self._shared_memory = []
+        arrays = {name: getattr(agent_data, name) for name in SHARED_ARRAY_NAMES}
+        if agent_data.has_ragged_subpoints():
+            arrays["subpoint_values"] = agent_data.subpoint_values
+            arrays["subpoint_offsets"] = agent_data.subpoint_offsets
+        else:
+            arrays["subpoints"] = agent_data.subpoints
+        arrays["type_ids"] = type_ids
+        array_specs = {
+            name: self._share_array(np.asarray(array)) for name, array in arrays.items()
+        }
+        # type_ids are the IDs in the type_mapping, so index its names
+        type_names = [
+            type_mapping[str(type_id)]["name"] for type_id in range(len(type_mapping))
+        ]
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                array_specs,
+                type_names,
+                agent_data.display_data,
+                agent_data.draw_fiber_points,
+                agent_data.n_timesteps,
+            ),
+        )
+
+    def _share_array(self, array: np.ndarray) -> Tuple[str, Tuple[int, ...], str]:
+        """
+        Copy an array into a new shared memory block
+        Return the block name, shape, and dtype to attach to it
+        """
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._shared_memory.append(block)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        return block.name, array.shape, array.dtype.str
+
+    def _batches(self, items: List[Any]) -> List[List[Any]]:
+        """
+        Split the items into contiguous batches,
+        a few for each worker to balance the load
+        """
+        n_batches = min(len(items), 4 * self.workers)
+        bounds = np.linspace(0, len(items), n_batches + 1).astype(int)
+        return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def write_binary_frames(
+        self, file_name: str, frames: List[Tuple[int, int, int]]
+    ) -> None:
+        """
+        Pack frames and write them at their offsets in the file,
+        the rest of the file should already be written
+        """
+        batches = self._batches(frames)
+        for _ in self._executor.map(
+            _write_binary_frames, [file_name] * len(batches), batches
+        ):
+            pass
+
+    def json_frames(self, time_indices: List[int]) -> Iterator[str]:
+        """
+        Pack frames and yield each one serialized as JSON, in order
+        """
+        for frames in self._executor.map(_json_frames, self._batches(time_indices)):
+            for frame in frames:
+                yield frame
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory
+        """
+        self._executor.shutdown()
+        for block in self._shared_memory:
+            block.close()
+            block.unlink()
+        self._shared_memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
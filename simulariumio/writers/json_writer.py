@@ -3,7 +3,7 @@
 
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 
 import numpy as np
 
@@ -11,8 +11,10 @@ from ..data_objects import (
     AgentData,
     TrajectoryData,
 )
-from ..constants import V1_SPATIAL_BUFFER_STRUCT, CURRENT_VERSION, VALUES_PER_3D_POINT
+from ..constants import CURRENT_VERSION, VALIDATION
+from ..instrumentation import AccumulatedStage
 from .writer import Writer
+from .frame_pool import FramePool
 
 ###############################################################################
 
@@ -23,17 +25,19 @@ log = logging.getLogger(__name__)
 
 class JsonWriter(Writer):
     @staticmethod
-    def _get_spatial_bundle_data_subpoints(
+    def _iter_spatial_bundle_data(
         agent_data: AgentData,
         type_ids: np.ndarray,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Return the spatialData's bundleData for a simulation
-        of agents with subpoints, packing buffer with jagged data is slower
+        Yield each frame of the spatialData's bundleData for a simulation
         """
-        bundle_data: List[Dict[str, Any]] = []
         uids = {}
-        used_unique_IDs = list(np.unique(agent_data.unique_ids))
+        used_unique_IDs = (
+            list(np.unique(agent_data.unique_ids))
+            if agent_data.draw_fiber_points
+            else []
+        )
         total_steps = (
             agent_data.n_timesteps
             if agent_data.n_timesteps >= 0
@@ -47,85 +51,26 @@ class JsonWriter(Writer):
             frame_data["data"], uids, used_unique_IDs = Writer._get_frame_buffer(
                 time_index, agent_data, type_ids, -1, uids, used_unique_IDs
             )
-            bundle_data.append(frame_data)
-        return bundle_data
+            yield frame_data
 
     @staticmethod
-    def _get_spatial_bundle_data_no_subpoints(
+    def _get_spatial_bundle_data(
         agent_data: AgentData,
         type_ids: np.ndarray,
     ) -> List[Dict[str, Any]]:
         """
         Return the spatialData's bundleData for a simulation
-        of agents without subpoints, using list slicing for speed
         """
-        bundle_data: List[Dict[str, Any]] = []
-        max_n_agents = int(np.amax(agent_data.n_agents, 0))
-        ix_positions = np.empty((VALUES_PER_3D_POINT * max_n_agents,), dtype=int)
-        ix_rotations = np.empty((VALUES_PER_3D_POINT * max_n_agents,), dtype=int)
-        buffer_struct = V1_SPATIAL_BUFFER_STRUCT
-        for i in range(max_n_agents):
-            ix_positions[
-                VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)
-            ] = np.arange(
-                i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.POSX_INDEX,
-                i * (buffer_struct.MIN_VALUES_PER_AGENT)
-                + buffer_struct.POSX_INDEX
-                + VALUES_PER_3D_POINT,
-            )
-            ix_rotations[
-                VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)
-            ] = np.arange(
-                i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.ROTX_INDEX,
-                i * (buffer_struct.MIN_VALUES_PER_AGENT)
-                + buffer_struct.ROTX_INDEX
-                + VALUES_PER_3D_POINT,
-            )
-        frame_buf = np.zeros((buffer_struct.MIN_VALUES_PER_AGENT) * max_n_agents)
-        total_steps = (
-            agent_data.n_timesteps
-            if agent_data.n_timesteps >= 0
-            else len(agent_data.times)
-        )
-        for time_index in range(total_steps):
-            frame_data = {}
-            frame_data["frameNumber"] = time_index
-            frame_data["time"] = float(agent_data.times[time_index])
-            n_agents = int(agent_data.n_agents[time_index])
-            local_buf = frame_buf[: (buffer_struct.MIN_VALUES_PER_AGENT) * n_agents]
-            local_buf[
-                buffer_struct.VIZ_TYPE_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.viz_types[time_index, :n_agents]
-            local_buf[
-                buffer_struct.UID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.unique_ids[time_index, :n_agents]
-            local_buf[
-                buffer_struct.TID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = type_ids[time_index, :n_agents]
-            local_buf[
-                ix_positions[: VALUES_PER_3D_POINT * n_agents]
-            ] = agent_data.positions[time_index, :n_agents].flatten()
-            local_buf[
-                ix_rotations[: VALUES_PER_3D_POINT * n_agents]
-            ] = agent_data.rotations[time_index, :n_agents].flatten()
-            local_buf[
-                buffer_struct.R_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.radii[time_index, :n_agents]
-            frame_data["data"] = local_buf.tolist()
-            bundle_data.append(frame_data)
-        return bundle_data
+        return list(JsonWriter._iter_spatial_bundle_data(agent_data, type_ids))
 
     @staticmethod
-    def format_trajectory_data(trajectory_data: TrajectoryData) -> Dict[str, Any]:
+    def _format_trajectory_data_without_bundle_data(
+        trajectory_data: TrajectoryData,
+    ) -> Tuple[Dict[str, Any], np.ndarray]:
         """
         Return the data shaped for Simularium JSON
-        Parameters
-        ----------
-        trajectory_data: TrajectoryData
-            the data to format
+        with an empty spatialData bundleData, and the type IDs
         """
-        print("Converting Trajectory Data to JSON -------------")
-        trajectory_data.agent_data._check_subpoints_match_display_type()
         simularium_data = {}
         # trajectory info
         total_steps = (
@@ -138,37 +83,52 @@ class JsonWriter(Writer):
             trajectory_data, total_steps, type_mapping
         )
         # spatial data
-        spatialData = {
+        simularium_data["spatialData"] = {
             "version": CURRENT_VERSION.SPATIAL_DATA,
             "msgType": 1,
             "bundleStart": 0,
             "bundleSize": total_steps,
+            "bundleData": [],
         }
-        if np.amax(trajectory_data.agent_data.n_subpoints) > 0:
-            spatialData["bundleData"] = JsonWriter._get_spatial_bundle_data_subpoints(
-                trajectory_data.agent_data, type_ids
-            )
-        else:
-            spatialData[
-                "bundleData"
-            ] = JsonWriter._get_spatial_bundle_data_no_subpoints(
-                trajectory_data.agent_data, type_ids
-            )
-        simularium_data["spatialData"] = spatialData
         # plot data
         simularium_data["plotData"] = {
             "version": CURRENT_VERSION.PLOT_DATA,
             "data": trajectory_data.plots,
         }
+        return simularium_data, type_ids
+
+    @staticmethod
+    def format_trajectory_data(trajectory_data: TrajectoryData) -> Dict[str, Any]:
+        """
+        Return the data shaped for Simularium JSON
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the data to format
+        """
+        print("Converting Trajectory Data to JSON -------------")
+        trajectory_data.agent_data._check_subpoints_match_display_type()
+        (
+            simularium_data,
+            type_ids,
+        ) = JsonWriter._format_trajectory_data_without_bundle_data(trajectory_data)
+        simularium_data["spatialData"]["bundleData"] = (
+            JsonWriter._get_spatial_bundle_data(trajectory_data.agent_data, type_ids)
+        )
         return simularium_data
 
     @staticmethod
     def save(
-        trajectory_data: TrajectoryData, output_path: str, validate_ids: bool
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        validate_ids: bool,
+        workers: int = 1,
+        validation: str = VALIDATION.FAST,
     ) -> None:
         """
         Save the simularium data in .simularium JSON format
-        at the output path
+        at the output path.
+        The spatial data is streamed to the file one frame at a time
         Parameters
         ----------
         trajectory_data: TrajectoryData
@@ -177,13 +137,79 @@ class JsonWriter(Writer):
             where to save the file
         validate_ids: bool (optional)
             additional validation to check agent ID size?
+        workers: int (optional)
+            how many processes to use to pack and serialize the frames,
+            the agent data is shared with them through shared memory.
+            Frames are packed in order in this process
+            if fiber points are drawn, since their IDs depend on earlier frames
+            Default: 1
+        validation: str (optional)
+            how much to check the data before saving,
+            "full", "fast", or "off", see VALIDATION
+            Default: "fast"
         """
-        if validate_ids:
-            Writer._validate_ids(trajectory_data)
-        json_data = JsonWriter.format_trajectory_data(trajectory_data)
+        Writer._validate(trajectory_data, validate_ids, validation)
+        print("Converting Trajectory Data to JSON -------------")
+        (
+            json_data,
+            type_ids,
+        ) = JsonWriter._format_trajectory_data_without_bundle_data(trajectory_data)
         print("Writing JSON -------------")
-        with open(f"{output_path}.simularium", "w+") as outfile:
-            json.dump(json_data, outfile)
+        # write each frame as it is packed, so only one frame is in memory,
+        # the bundleData list is the last item in the spatialData
+        spatial_data_json = json.dumps(json_data["spatialData"])
+        agent_data = trajectory_data.agent_data
+        frame_pool = (
+            FramePool(
+                agent_data,
+                type_ids,
+                json_data["trajectoryInfo"]["typeMapping"],
+                workers,
+            )
+            if workers > 1 and not agent_data.draw_fiber_points
+            else None
+        )
+        if frame_pool is not None:
+            frames_json = frame_pool.json_frames(
+                list(range(json_data["spatialData"]["bundleSize"]))
+            )
+        else:
+            frames_json = (
+                json.dumps(frame_data)
+                for frame_data in JsonWriter._iter_spatial_bundle_data(
+                    agent_data, type_ids
+                )
+            )
+        n_frames = json_data["spatialData"]["bundleSize"]
+        try:
+            with AccumulatedStage(
+                "frame_packing",
+                n_frames=n_frames,
+                workers=workers if frame_pool is not None else 1,
+            ) as frame_packing, AccumulatedStage(
+                "file_io", n_frames=n_frames, n_files=1
+            ) as file_io:
+                with open(f"{output_path}.simularium", "w+") as outfile:
+                    with file_io.measure():
+                        outfile.write('{"trajectoryInfo": ')
+                        outfile.write(json.dumps(json_data["trajectoryInfo"]))
+                        outfile.write(', "spatialData": ')
+                        outfile.write(spatial_data_json[: -len("]}")])
+                    for time_index, frame_json in enumerate(
+                        frame_packing.iterate(frames_json)
+                    ):
+                        with file_io.measure():
+                            if time_index > 0:
+                                outfile.write(", ")
+                            outfile.write(frame_json)
+                    with file_io.measure():
+                        outfile.write("]}")
+                        outfile.write(', "plotData": ')
+                        outfile.write(json.dumps(json_data["plotData"]))
+                        outfile.write("}")
+        finally:
+            if frame_pool is not None:
+                frame_pool.close()
         print(f"saved to {output_path}.simularium")
 
     @staticmethod
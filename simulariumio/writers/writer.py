@@ -4,7 +4,6 @@
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, List, Dict, Tuple
-import math
 
 import numpy as np
 
@@ -21,9 +20,11 @@ from ..constants import (
     VALUES_PER_3D_POINT,
     SUBPOINT_VALUES_PER_ITEM,
     MAX_AGENT_ID,
+    VALIDATION,
 )
 
 from ..exceptions import DataError
+from ..instrumentation import instrument_stage
 
 ###############################################################################
 
@@ -122,15 +123,14 @@ class Writer(ABC):
         Get the required size for a buffer to hold the given frame of AgentData
         """
         n_agents = int(agent_data.n_agents[time_index])
+        n_subpoints = agent_data.n_subpoints[time_index, :n_agents].astype(int)
+        n_subpoints = n_subpoints[n_subpoints > 0]
         buffer_size = (V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT) * n_agents
-        for agent_index in range(n_agents):
-            n_subpoints = int(agent_data.n_subpoints[time_index][agent_index])
-            if n_subpoints > 0:
-                buffer_size += n_subpoints
-                if agent_data.draw_fiber_points:
-                    buffer_size += (
-                        V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                    ) * max(math.ceil(n_subpoints / 6.0), 1)
+        buffer_size += int(np.sum(n_subpoints))
+        if agent_data.draw_fiber_points:
+            buffer_size += (V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT) * int(
+                np.sum(np.maximum(-(-n_subpoints // 6), 1))
+            )
         return buffer_size
 
     @staticmethod
@@ -145,100 +145,156 @@ class Writer(ABC):
         """
         Get a float buffer for one frame of AgentData
         """
+        result, uids, used_unique_IDs = Writer._get_frame_buffer_array(
+            time_index, agent_data, type_ids, buffer_size, uids, used_unique_IDs
+        )
+        return result.tolist(), uids, used_unique_IDs
+
+    @staticmethod
+    def _get_frame_buffer_array(
+        time_index: int,
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+        buffer_size: int = -1,
+        uids: Dict[int, int] = None,
+        used_unique_IDs: List[int] = None,
+        dtype: np.dtype = np.float64,
+    ) -> Tuple[np.ndarray, Dict[int, int], List[int]]:
+        """
+        Get a float buffer for one frame of AgentData as a numpy array
+        of the given dtype, agents are packed with numpy indexing using
+        offsets from a cumulative sum over each agent's number of values
+        """
         if buffer_size < 0:
             buffer_size = Writer._get_frame_buffer_size(time_index, agent_data)
         if uids is None:
             uids = {}
         if used_unique_IDs is None:
             used_unique_IDs = []
-        result = np.zeros(buffer_size)
+        result = np.zeros(buffer_size, dtype=dtype)
         n_agents = int(agent_data.n_agents[time_index])
-        i = 0
-        for agent_index in range(n_agents):
-            # add agent
-            result[i + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX] = agent_data.viz_types[
-                time_index, agent_index
-            ]
-            result[i + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX] = agent_data.unique_ids[
-                time_index, agent_index
-            ]
-            result[i + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX] = type_ids[
-                time_index, agent_index
-            ]
-            result[
-                i
-                + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX : i
-                + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX
-                + VALUES_PER_3D_POINT
-            ] = agent_data.positions[time_index, agent_index]
+        if n_agents < 1:
+            return result, uids, used_unique_IDs
+        buffer_struct = V1_SPATIAL_BUFFER_STRUCT
+        n_subpoints = np.maximum(
+            agent_data.n_subpoints[time_index, :n_agents].astype(int), 0
+        )
+        # optionally draw spheres at every other fiber point
+        n_fiber_spheres = np.zeros(n_agents, dtype=int)
+        if agent_data.draw_fiber_points and np.any(n_subpoints > 0):
+            fiber_type_names = set(
+                type_name
+                for type_name, display_data in agent_data.display_data.items()
+                if display_data.display_type == DISPLAY_TYPE.FIBER
+            )
+            if agent_data.type_ids is not None:
+                is_fiber_type = np.array(
+                    [
+                        type_name in fiber_type_names
+                        for type_name in agent_data.type_names
+                    ],
+                    dtype=bool,
+                )
+                draws_fiber_points = is_fiber_type[
+                    agent_data.type_ids[time_index, :n_agents].astype(int)
+                ]
+            else:
+                draws_fiber_points = np.array(
+                    [
+                        type_name in fiber_type_names
+                        for type_name in agent_data.types[time_index][:n_agents]
+                    ]
+                )
+            n_fiber_points = n_subpoints // SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
+            n_fiber_spheres = np.where(
+                draws_fiber_points & (n_subpoints > 0), (n_fiber_points + 1) // 2, 0
+            )
+        # offset of each agent in the buffer
+        agent_n_values = (
+            buffer_struct.MIN_VALUES_PER_AGENT * (1 + n_fiber_spheres) + n_subpoints
+        )
+        agent_offsets = np.zeros(n_agents, dtype=int)
+        agent_offsets[1:] = np.cumsum(agent_n_values)[:-1]
+        # add agents
+        result[agent_offsets + buffer_struct.VIZ_TYPE_INDEX] = agent_data.viz_types[
+            time_index, :n_agents
+        ]
+        result[agent_offsets + buffer_struct.UID_INDEX] = agent_data.unique_ids[
+            time_index, :n_agents
+        ]
+        result[agent_offsets + buffer_struct.TID_INDEX] = type_ids[
+            time_index, :n_agents
+        ]
+        xyz = np.arange(VALUES_PER_3D_POINT)
+        result[agent_offsets[:, np.newaxis] + buffer_struct.POSX_INDEX + xyz] = (
+            agent_data.positions[time_index, :n_agents]
+        )
+        result[agent_offsets[:, np.newaxis] + buffer_struct.ROTX_INDEX + xyz] = (
+            agent_data.rotations[time_index, :n_agents]
+        )
+        result[agent_offsets + buffer_struct.R_INDEX] = agent_data.radii[
+            time_index, :n_agents
+        ]
+        result[agent_offsets + buffer_struct.NSP_INDEX] = n_subpoints
+        # add subpoints
+        total_subpoints = int(np.sum(n_subpoints))
+        if total_subpoints > 0:
+            subpoint_agent_indices = np.repeat(np.arange(n_agents), n_subpoints)
+            subpoint_offsets = np.cumsum(n_subpoints) - n_subpoints
+            subpoint_indices = (
+                np.arange(total_subpoints) - subpoint_offsets[subpoint_agent_indices]
+            )
             result[
-                i
-                + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX : i
-                + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX
-                + VALUES_PER_3D_POINT
-            ] = agent_data.rotations[time_index, agent_index]
-            result[i + V1_SPATIAL_BUFFER_STRUCT.R_INDEX] = agent_data.radii[
-                time_index, agent_index
+                agent_offsets[subpoint_agent_indices]
+                + buffer_struct.SP_INDEX
+                + subpoint_indices
+            ] = agent_data.get_subpoint_values(
+                time_index, subpoint_agent_indices, subpoint_indices
+            )
+        # add spheres at fiber points
+        total_fiber_spheres = int(np.sum(n_fiber_spheres))
+        if total_fiber_spheres > 0:
+            sphere_agent_indices = np.repeat(np.arange(n_agents), n_fiber_spheres)
+            sphere_indices = (
+                np.arange(total_fiber_spheres)
+                - (np.cumsum(n_fiber_spheres) - n_fiber_spheres)[sphere_agent_indices]
+            )
+            sphere_offsets = (
+                agent_offsets[sphere_agent_indices]
+                + buffer_struct.MIN_VALUES_PER_AGENT * (1 + sphere_indices)
+                + n_subpoints[sphere_agent_indices]
+            )
+            # fiber point index for each sphere is every other point
+            fiber_point_indices = 2 * sphere_indices
+            # unique instance IDs
+            raw_uids = (
+                100 * (agent_data.unique_ids[time_index, sphere_agent_indices] + 1)
+                + fiber_point_indices
+            )
+            sphere_uids = np.zeros(total_fiber_spheres)
+            for sphere_index, raw_uid in enumerate(raw_uids.tolist()):
+                if raw_uid not in uids:
+                    uid = raw_uid
+                    while uid in used_unique_IDs:
+                        uid += 100
+                    uids[raw_uid] = uid
+                    used_unique_IDs.append(uid)
+                sphere_uids[sphere_index] = uids[raw_uid]
+            result[sphere_offsets + buffer_struct.VIZ_TYPE_INDEX] = VIZ_TYPE.DEFAULT
+            result[sphere_offsets + buffer_struct.UID_INDEX] = sphere_uids
+            result[sphere_offsets + buffer_struct.TID_INDEX] = type_ids[
+                time_index, sphere_agent_indices
             ]
-            n_subpoints = int(agent_data.n_subpoints[time_index][agent_index])
-            result[i + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX] = n_subpoints
-            if n_subpoints > 0:
-                # add subpoints
-                sp_start_index = i + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                result[
-                    sp_start_index : sp_start_index + n_subpoints
-                ] = agent_data.subpoints[time_index][agent_index][:n_subpoints]
-                i += (V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT) + n_subpoints
-                # optionally draw spheres at points
-                if agent_data.draw_fiber_points:
-                    type_name = agent_data.types[time_index][agent_index]
-                    if type_name not in agent_data.display_data:
-                        continue
-                    display_type = agent_data.display_data[type_name].display_type
-                    if display_type != DISPLAY_TYPE.FIBER:
-                        continue
-                    n_fiber_points = math.floor(
-                        n_subpoints
-                        / float(SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER))
-                    )
-                    for p in range(n_fiber_points):
-                        # every other fiber point
-                        if p % 2 != 0:
-                            continue
-                        # unique instance ID
-                        raw_uid = (
-                            100 * (agent_data.unique_ids[time_index, agent_index] + 1)
-                            + p
-                        )
-                        if raw_uid not in uids:
-                            uid = raw_uid
-                            while uid in used_unique_IDs:
-                                uid += 100
-                            uids[raw_uid] = uid
-                            used_unique_IDs.append(uid)
-                        # add sphere
-                        result[
-                            i + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
-                        ] = VIZ_TYPE.DEFAULT
-                        result[i + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX] = uids[raw_uid]
-                        result[i + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX] = type_ids[
-                            time_index, agent_index
-                        ]
-                        first_subpoint_index = VALUES_PER_3D_POINT * p
-                        result[
-                            i
-                            + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX : i
-                            + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX
-                            + VALUES_PER_3D_POINT
-                        ] = agent_data.subpoints[time_index][agent_index][
-                            first_subpoint_index : first_subpoint_index
-                            + VALUES_PER_3D_POINT
-                        ]
-                        result[i + V1_SPATIAL_BUFFER_STRUCT.R_INDEX] = 0.5
-                        i += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-            else:
-                i += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-        return result.tolist(), uids, used_unique_IDs
+            first_subpoint_indices = VALUES_PER_3D_POINT * fiber_point_indices
+            result[sphere_offsets[:, np.newaxis] + buffer_struct.POSX_INDEX + xyz] = (
+                agent_data.get_subpoint_values(
+                    time_index,
+                    sphere_agent_indices[:, np.newaxis],
+                    first_subpoint_indices[:, np.newaxis] + xyz,
+                )
+            )
+            result[sphere_offsets + buffer_struct.R_INDEX] = 0.5
+        return result, uids, used_unique_IDs
 
     @staticmethod
     def _check_agent_ids_are_unique_per_frame(buffer_data: Dict[str, Any]) -> bool:
@@ -247,46 +303,144 @@ class Writer(ABC):
         """
         bundle_data = buffer_data["spatialData"]["bundleData"]
         for time_index in range(len(bundle_data)):
-            data = bundle_data[time_index]["data"]
-            agent_index = 1
-            uids = []
-            get_n_subpoints = False
-            while agent_index < len(data):
-                # get the number of subpoints
-                # in order to correctly increment index
-                if get_n_subpoints:
-                    agent_index += int(
-                        data[agent_index]
-                        + (
-                            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                            + 1
-                            - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                        )
-                    )
-                    get_n_subpoints = False
-                    continue
-                # there should be a unique ID at this index, check for duplicate
-                uid = data[agent_index]
-                if uid in uids:
-                    raise Exception(
-                        f"found duplicate ID {uid} in frame {time_index} "
-                        f"at index {agent_index}"
-                    )
-                uids.append(uid)
-                agent_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX - 1
-                get_n_subpoints = True
+            frame_buffer = AgentData._frame_buffer_as_numpy_array(
+                bundle_data[time_index]["data"]
+            )
+            uid_indices = (
+                AgentData._get_agent_start_indices(frame_buffer)
+                + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+            )
+            duplicate_index = Writer._first_duplicate_index(frame_buffer[uid_indices])
+            if duplicate_index >= 0:
+                agent_index = uid_indices[duplicate_index]
+                raise Exception(
+                    f"found duplicate ID {frame_buffer[agent_index]} "
+                    f"in frame {time_index} at index {agent_index}"
+                )
         return True
 
+    @staticmethod
+    def _first_duplicate_index(values: np.ndarray) -> int:
+        """
+        Get the index of the first value that is the same as an earlier value,
+        or -1 if the values are unique
+        """
+        _, first_indices = np.unique(values, return_index=True)
+        if first_indices.shape[0] == values.shape[0]:
+            return -1
+        is_duplicate = np.ones(values.shape[0], dtype=bool)
+        is_duplicate[first_indices] = False
+        return int(np.argmax(is_duplicate))
+
+    @staticmethod
+    def _check_agent_ids_are_unique(
+        agent_data: AgentData, time_indices: List[int] = None
+    ) -> None:
+        """
+        For each frame (or each of the given frames),
+        check that none of the unique agent IDs overlap,
+        using the AgentData arrays
+        """
+        if time_indices is None:
+            time_indices = np.arange(agent_data.total_timesteps())
+        time_indices = np.asarray(time_indices, dtype=int)
+        n_agents = agent_data.n_agents[time_indices].astype(int)
+        max_agents = int(np.amax(n_agents)) if time_indices.shape[0] > 0 else 0
+        if max_agents < 2:
+            return
+        unique_ids = agent_data.unique_ids[time_indices, :max_agents].astype(float)
+        # padding past each frame's agents sorts to the end and isn't compared
+        unique_ids = np.where(
+            np.arange(max_agents) < n_agents[:, np.newaxis], unique_ids, np.inf
+        )
+        sorted_ids = np.sort(unique_ids, axis=1)
+        is_duplicate = (sorted_ids[:, 1:] == sorted_ids[:, :-1]) & np.isfinite(
+            sorted_ids[:, 1:]
+        )
+        if not np.any(is_duplicate):
+            return
+        frame_index = int(np.argmax(np.any(is_duplicate, axis=1)))
+        time_index = int(time_indices[frame_index])
+        agent_index = Writer._first_duplicate_index(
+            unique_ids[frame_index, : n_agents[frame_index]]
+        )
+        raise DataError(
+            f"found duplicate ID {agent_data.unique_ids[time_index, agent_index]} "
+            f"in frame {time_index} at agent index {agent_index}"
+        )
+
     @staticmethod
     def _validate_ids(trajectory_data: TrajectoryData) -> None:
         """
         Check if agent unique IDs are valid 32 bit integers
         returns a message identifying violating agent ID
         """
-        agent_unique_ids = trajectory_data.agent_data.unique_ids
-        for uid in np.ndarray.flatten(agent_unique_ids):
-            if uid > MAX_AGENT_ID:
-                raise DataError(f"Agent IDs is larger than a 32 bit integer: {uid} ")
+        Writer._validate_agent_ids(trajectory_data.agent_data)
+
+    @staticmethod
+    def _validate_agent_ids(
+        agent_data: AgentData, time_indices: List[int] = None
+    ) -> None:
+        """
+        Check if agent unique IDs at each timestep (or each of the given
+        timesteps) are valid 32 bit integers
+        """
+        agent_unique_ids = np.ndarray.flatten(
+            agent_data.unique_ids
+            if time_indices is None
+            else agent_data.unique_ids[np.asarray(time_indices, dtype=int)]
+        )
+        if agent_unique_ids.size < 1:
+            return
+        is_too_large = agent_unique_ids > MAX_AGENT_ID
+        if np.any(is_too_large):
+            uid = agent_unique_ids[np.argmax(is_too_large)]
+            raise DataError(f"Agent IDs is larger than a 32 bit integer: {uid} ")
+
+    @staticmethod
+    def _validate(
+        trajectory_data: TrajectoryData,
+        validate_ids: bool,
+        validation: str = VALIDATION.FAST,
+    ) -> None:
+        """
+        Check the data before saving.
+        "off" skips the checks, "fast" checks agent ID size
+        (if validate_ids) and that subpoints match each agent's display type,
+        "full" also checks that agent IDs are unique in each frame.
+        Default DisplayData is added for types without it at every level
+        """
+        Writer._validate_agent_data(
+            trajectory_data.agent_data, validate_ids, validation
+        )
+
+    @staticmethod
+    def _validate_agent_data(
+        agent_data: AgentData,
+        validate_ids: bool,
+        validation: str = VALIDATION.FAST,
+        time_indices: List[int] = None,
+    ) -> None:
+        """
+        Check the agent data at each timestep (or each of the given timesteps)
+        before saving, see _validate
+        """
+        if validation not in VALIDATION.LEVELS:
+            raise DataError(
+                f"validation must be one of {VALIDATION.LEVELS}, found {validation}"
+            )
+        n_frames = (
+            agent_data.total_timesteps() if time_indices is None else len(time_indices)
+        )
+        with instrument_stage("validation", n_frames=n_frames, level=validation):
+            if validation == VALIDATION.OFF:
+                agent_data._add_default_display_data(time_indices)
+                return
+            if validate_ids:
+                Writer._validate_agent_ids(agent_data, time_indices)
+            agent_data._check_subpoints_match_display_type(time_indices)
+            if validation == VALIDATION.FULL:
+                Writer._check_agent_ids_are_unique(agent_data, time_indices)
 
     @staticmethod
     def _check_type_matches_subpoints(
@@ -331,7 +485,9 @@ class Writer(ABC):
                 int(trajectory_data.agent_data.n_agents[time_index])
             ):
                 inconsistent_type = Writer._check_type_matches_subpoints(
-                    trajectory_data.agent_data.types[time_index][agent_index],
+                    trajectory_data.agent_data.type_name_for_agent(
+                        time_index, agent_index
+                    ),
                     n_subpoints[time_index][agent_index],
                     trajectory_data.agent_data.viz_types[time_index][agent_index],
                     display_data,